@@ -1,12 +1,45 @@
 # src/api.py  (adjust import paths if your package name differs)
 from fastapi import FastAPI, Request, HTTPException
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
 from acp_sdk import MessagePart, Message
 from typing import List
+from contextlib import asynccontextmanager, nullcontext
 import asyncio
 
 from src.beeai_agents.agent import company_profile          # <- your existing file
+from src.beeai_agents.utils.metrics import render_prometheus
+from src.beeai_agents.utils.usage import track_usage
+from src.beeai_agents.utils.cache import refresh_cache
+from src.beeai_agents.utils.logs import configure_logging, bind_request_id
+from src.beeai_agents.utils.loop_monitor import monitor_event_loop
+from src.beeai_agents.utils.offload import shutdown_executor
+from src.beeai_agents.utils.profiling import start_profile, ProfileRejected
+from src.beeai_agents.utils.tracing import collect_spans
+from src.beeai_agents.utils.utils import close_pds_client, parse_jurisdictions, pds_jurisdictions
+from src.beeai_agents.utils.warmup import is_ready, readiness, warm_up
+from src.beeai_agents.utils.wire import encode_body
 
-app = FastAPI()
+configure_logging()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    warmup = asyncio.create_task(warm_up())  # in the background: /ready answers 503 until it finishes
+    try:
+        async with monitor_event_loop():
+            yield
+    finally:
+        warmup.cancel()
+        await close_pds_client()
+        shutdown_executor()
+
+app = FastAPI(lifespan=lifespan)
+
+@app.middleware("http")
+async def request_id_middleware(request: Request, call_next):
+    request_id = bind_request_id(request.headers.get("x-request-id"))
+    response = await call_next(request)
+    response.headers["X-Request-ID"] = request_id
+    return response
 
 @app.post("/query")
 async def query_endpoint(req: Request):
@@ -15,15 +48,49 @@ async def query_endpoint(req: Request):
     if not company:
         raise HTTPException(400, detail="Field 'company' is required")
 
+    # optional "jurisdictions": ["DE", "NY"] or "auto" (default PDS_JURISDICTIONS)
+    try:
+        jurisdictions = parse_jurisdictions(body.get("jurisdictions"))
+    except ValueError as exc:
+        raise HTTPException(400, detail=str(exc))
+
     # Wrap text into ACP Message format expected by company_profile
     msg_in: List[Message] = [Message(parts=[MessagePart(content=company)])]
 
+    # Opt-in profiling: ?profile=<PROFILE_TOKEN> or X-Profile-Token header
+    try:
+        profiler = start_profile(
+            req.headers.get("x-profile-token") or req.query_params.get("profile"),
+            label=company,
+            output=req.headers.get("x-profile-output") or req.query_params.get("profile_output", "file"),
+        )
+    except ProfileRejected as exc:
+        raise HTTPException(exc.status_code, detail=exc.detail)
+
     chunks: List[str] = []
-    async for part in company_profile(msg_in, context=None):
-        if isinstance(part, MessagePart):
-            chunks.append(part.content)
+    # optional "refresh": true recomputes (and re-caches) the profile, searches and generations
+    with track_usage() as usage, collect_spans() as spans, (profiler or nullcontext()), \
+            pds_jurisdictions(jurisdictions), (refresh_cache() if body.get("refresh") else nullcontext()):
+        async for part in company_profile(msg_in, context=None):
+            if isinstance(part, MessagePart):
+                chunks.append(part.content)
+
+    result = {"answer": "".join(chunks)}
+    if body.get("include_usage"):
+        result["usage"] = usage.to_dict()
+    if profiler:
+        result["profile"] = profiler.report(spans)
+    # orjson (or msgpack for `Accept: application/msgpack`), compressed as the client accepts
+    content, headers = encode_body(result, req.headers.get("accept"), req.headers.get("accept-encoding"))
+    return Response(content, headers=headers)
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    return render_prometheus()
 
-    return {"answer": "".join(chunks)}
+@app.get("/ready")
+async def ready():
+    return JSONResponse(readiness(), status_code=200 if is_ready() else 503)
 
 @app.post("/")
 async def root():
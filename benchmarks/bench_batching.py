@@ -0,0 +1,92 @@
+# bench_batching.py – chat-model throughput and latency with and without micro-batching
+#
+#   python -m benchmarks.bench_batching --prompts 400 --concurrency 50 --windows 0,2,5,20 [--chat 300,0.3]
+#
+# Starts the chat-model fake and sends --prompts short prompts from
+# --concurrency concurrent callers, first straight through (LLM_BATCH=0), then
+# through a MicroBatcher for every flush window in --windows (ms; batches of
+# at most --max-batch). Reports throughput, per-call latency percentiles and the
+# mean batch size for each run.
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from typing import Awaitable, Callable
+
+from .common import REPO_ROOT, print_table, summarize
+from .fakes import Latency, serve_fakes
+
+sys.path.insert(0, str(REPO_ROOT / "src"))
+
+
+async def _drive(call: Callable[[str], Awaitable[dict]], prompts: int, concurrency: int) -> tuple[list[float], float]:
+    latencies: list[float] = []
+    counter = iter(range(prompts))
+
+    async def worker() -> None:
+        for i in counter:
+            started = time.perf_counter()
+            await call(f"Rephrase in one sentence: item {i} is registered in Delaware.")
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, time.perf_counter() - started
+
+
+async def run(args: argparse.Namespace) -> dict:
+    async with serve_fakes(Latency(50), Latency.parse(args.chat), Latency(50)) as fake_env:
+        os.environ.update(fake_env)
+        from beeai_agents.utils import utils
+        from beeai_agents.utils.batching import MicroBatcher
+
+        class CountingBatcher(MicroBatcher):
+            def __init__(self, **kwargs):
+                super().__init__(**kwargs)
+                self.sizes: list[int] = []
+
+            async def _send(self, batch) -> None:
+                self.sizes.append(len(batch))
+                await super()._send(batch)
+
+        await utils.chat_model()
+        await utils._complete("warm up")
+        results: dict = {}
+        latencies, wall = await _drive(utils._complete, args.prompts, args.concurrency)
+        results["unbatched"] = {"throughput_rps": args.prompts / wall, "latency_ms": summarize(latencies)}
+        for window in args.windows:
+            batcher = CountingBatcher(send_one=utils._complete, window=window / 1000, max_size=args.max_batch)
+            latencies, wall = await _drive(batcher.submit, args.prompts, args.concurrency)
+            results[f"batched window={window:g}ms"] = {
+                "throughput_rps": args.prompts / wall, "latency_ms": summarize(latencies),
+                "mean_batch": statistics.fmean(batcher.sizes) if batcher.sizes else 0.0,
+            }
+        return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Chat-model calls with and without the micro-batcher.")
+    parser.add_argument("--prompts", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--windows", default="0,2,5,20", help="comma-separated flush windows in ms")
+    parser.add_argument("--max-batch", type=int, default=8)
+    parser.add_argument("--chat", default="300,0.3", help="chat fake latency: median_ms[,sigma[,error_rate]]")
+    parser.add_argument("--json", dest="json_out", help="also write the results as JSON")
+    args = parser.parse_args()
+    args.windows = [float(w) for w in args.windows.split(",")]
+
+    results = asyncio.run(run(args))
+    print_table("per-call latency", {name: r["latency_ms"] for name, r in results.items()})
+    print(f"\n{'':<28}{'req/s':>10}{'mean batch':>12}")
+    for name, r in results.items():
+        print(f"{name:<28}{r['throughput_rps']:>10.1f}{r.get('mean_batch', 1.0):>12.1f}")
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as fh:
+            json.dump(results, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+# bench_offload.py – event-loop lag while large PDS payloads are decoded / post-processed
+#
+#   python -m benchmarks.bench_offload --size 10000
+#
+# Runs each job inline, on the thread pool and on the process pool while a
+# probe task sleeps 1 ms in a loop, and reports the job's wall time next to
+# the worst and p99 lateness of the probe (what every other in-flight request
+# would have seen).
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+from .bench_pds_parse import synthetic_body
+from .common import REPO_ROOT, percentile
+
+sys.path.insert(0, str(REPO_ROOT / "src"))
+os.environ.setdefault("CHAT_MODEL", "openai:bench")
+os.environ.setdefault("OPENAI_API_KEY", "bench")
+
+from beeai_agents.utils import offload  # noqa: E402
+from beeai_agents.utils.pds_parse import decode_search  # noqa: E402
+from beeai_agents.utils.records import Company  # noqa: E402
+from beeai_agents.utils.utils import collect_officers, dedupe_addresses  # noqa: E402
+
+MODES = ("none", "thread", "process")
+
+
+async def _probe(lags: list[float], stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        await asyncio.sleep(0.001)
+        lags.append((time.perf_counter() - t0 - 0.001) * 1000)
+
+
+async def _post_process(data: dict) -> None:
+    company = await offload.run_cpu(Company.from_search, data)
+    await offload.run_cpu(dedupe_addresses, company.addresses)
+    await offload.run_cpu(collect_officers, company.directors)
+
+
+async def measure(job) -> dict[str, float]:
+    lags: list[float] = []
+    stop = asyncio.Event()
+    probe = asyncio.create_task(_probe(lags, stop))
+    await asyncio.sleep(0.05)
+    lags.clear()
+    t0 = time.perf_counter()
+    await job()
+    wall = (time.perf_counter() - t0) * 1000
+    stop.set()
+    await probe
+    return {"ms": wall, "max_lag_ms": max(lags, default=0.0), "p99_lag_ms": percentile(lags, 99)}
+
+
+async def run(size: int) -> dict:
+    body = synthetic_body(size)
+    data = decode_search(body)
+    jobs = {
+        "decode (full)": lambda: offload.run_cpu(decode_search, body, False),
+        "decode (projected)": lambda: offload.run_cpu(decode_search, body, True),
+        "records+dedupe+officers": lambda: _post_process(data),
+    }
+    results: dict[str, dict] = {}
+    for mode in MODES:
+        offload.OFFLOAD_EXECUTOR = mode
+        if mode != "none":
+            await offload.run_cpu(len, "warm-up")          # start the pool outside the measurement
+        for name, job in jobs.items():
+            results.setdefault(name, {})[mode] = await measure(job)
+        offload.shutdown_executor()
+    return {"body_mib": len(body) / 2**20, "decoder": offload.JSON_DECODER, "results": results}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Event-loop lag with and without the offload executor.")
+    parser.add_argument("--size", type=int, default=10000, help="addresses / directors / bulky rows in the record")
+    parser.add_argument("--json", dest="json_out", help="also write the results as JSON")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args.size))
+    print(f"\nbody {report['body_mib']:.1f} MiB, decoder {report['decoder']}")
+    print(f"{'job':<26}{'executor':<10}{'ms':>10}{'max lag':>10}{'p99 lag':>10}")
+    for name, by_mode in report["results"].items():
+        for mode, r in by_mode.items():
+            print(f"{name:<26}{mode:<10}{r['ms']:>10.1f}{r['max_lag_ms']:>10.1f}{r['p99_lag_ms']:>10.1f}")
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as fh:
+            json.dump(report, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
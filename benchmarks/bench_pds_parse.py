@@ -0,0 +1,113 @@
+# bench_pds_parse.py – memory / latency of full vs streamed, projected PDS parsing
+#
+#   python -m benchmarks.bench_pds_parse --sizes 100,1000,10000
+#
+# Builds synthetic search responses around the rec_dump.json Company (N
+# addresses and directors, plus N entries in each of the bulky fields the
+# sections never read) and compares:
+#   full        – json.loads of the whole body (historical resp.json())
+#   full+proj   – json.loads, then keep only the projected Company
+#   stream      – ijson push parser, projected, stops after the Company hit
+#
+# "stall ms" is the longest uninterrupted stretch of parsing: the whole decode
+# for the json.loads modes, a single 64 KiB chunk for the streaming parser.
+import argparse
+import copy
+import gc
+import json
+import math
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable
+
+from .common import REPO_ROOT, load_record
+
+sys.path.insert(0, str(REPO_ROOT / "src"))
+
+from beeai_agents.utils.pds_parse import StreamingCompanyParser, parse_chunks, project_search  # noqa: E402
+
+BULKY = ("sources", "combinedsources", "certifications", "contactmethods")
+CHUNK = 64 * 1024
+
+
+def synthetic_body(n: int) -> bytes:
+    base = load_record()
+    rec = copy.deepcopy(base)
+    rec["addresses"] = [{**base["addresses"][i % len(base["addresses"])], "id": i} for i in range(n)]
+    rec["directors"] = [{**base["directors"][0], "id": i, "name": f"Person {i}"} for i in range(n)]
+    filler = {"source": "registry", "retrieved": "2024-01-01", "url": "https://example.invalid/" + "x" * 80,
+              "Census_Year": "2020", "notes": "lorem ipsum " * 10}
+    for field in BULKY:
+        rec[field] = [{**filler, "id": i} for i in range(n)]
+    hits = [{"kind": "Person", "name": f"Noise {i}", "sources": [filler] * 20} for i in range(3)]
+    tail = [{"kind": "Company", "name": f"Other {i}", "sources": [filler] * n} for i in range(2)]
+    return json.dumps({"result": hits + [rec] + tail, "total": 6}).encode()
+
+
+def _chunks(body: bytes):
+    return (body[i:i + CHUNK] for i in range(0, len(body), CHUNK))
+
+
+def modes(body: bytes) -> dict[str, Callable[[], Any]]:
+    return {
+        "full": lambda: json.loads(body),
+        "full+proj": lambda: project_search(json.loads(body)),
+        "stream": lambda: parse_chunks(_chunks(body)),
+    }
+
+
+def longest_slice(body: bytes) -> float:
+    """Longest single feed() call in ms – the worst event-loop stall when streaming."""
+    parser, worst = StreamingCompanyParser(), 0.0
+    for chunk in _chunks(body):
+        t0 = time.perf_counter()
+        done = parser.feed(chunk)
+        worst = max(worst, time.perf_counter() - t0)
+        if done:
+            break
+    return worst * 1000
+
+
+def measure(fn: Callable[[], Any], repeat: int) -> dict[str, float]:
+    best = math.inf
+    for _ in range(repeat):
+        gc.collect()
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    gc.collect()
+    tracemalloc.start()
+    result = fn()
+    gc.collect()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return {"ms": best * 1000, "peak_mib": peak / 2**20, "retained_mib": retained / 2**20}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Full vs streamed, projected PDS response parsing.")
+    parser.add_argument("--sizes", default="100,1000,10000")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", dest="json_out", help="also write the results as JSON")
+    args = parser.parse_args()
+
+    results = {}
+    print(f"\n{'n':>7}{'body MiB':>10}  {'mode':<11}{'ms':>10}{'stall ms':>10}{'peak MiB':>10}{'kept MiB':>10}")
+    for n in (int(s) for s in args.sizes.split(",")):
+        body = synthetic_body(n)
+        for name, fn in modes(body).items():
+            r = measure(fn, args.repeat)
+            # a full decode blocks the loop for its whole duration; streaming only per chunk
+            r["stall_ms"] = longest_slice(body) if name == "stream" else r["ms"]
+            results.setdefault(n, {})[name] = r
+            print(f"{n:>7}{len(body) / 2**20:>10.2f}  {name:<11}{r['ms']:>10.2f}{r['stall_ms']:>10.2f}"
+                  f"{r['peak_mib']:>10.2f}{r['retained_mib']:>10.2f}")
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as fh:
+            json.dump(results, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+# bench_postprocess.py – microbenchmarks and scaling check for record post-processing
+#
+#   python -m benchmarks.bench_postprocess --sizes 10,100,1000,10000,100000
+#
+# Generates synthetic Company records (rec_dump.json-shaped addresses and
+# directors, with realistic duplicate / suppressed / foreign mixes), times every
+# CPU stage the agents run on them, measures peak allocation with tracemalloc
+# and flags stages whose run time grows faster than linearly. Also reports the
+# memory retained per address / director as raw dicts vs normalised records.
+import argparse
+import copy
+import gc
+import json
+import math
+import os
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable
+
+from .common import REPO_ROOT, load_record
+
+sys.path.insert(0, str(REPO_ROOT / "src"))
+# the post-processing helpers never call the model; don't require watsonx credentials
+os.environ.setdefault("CHAT_MODEL", "openai:bench")
+os.environ.setdefault("OPENAI_API_KEY", "bench")
+
+from beeai_agents.utils.records import Company  # noqa: E402
+from beeai_agents.utils.regions import footprint_summary, region_counts  # noqa: E402
+from beeai_agents.utils.utils import (  # noqa: E402
+    collect_officers, dedupe_addresses, format_addr, format_officer, is_us,
+)
+
+COUNTRIES = ["US"] * 17 + ["GB", "DE", "FR", "IN", "CN", "JP", "BR", "ZA", "AU", "CA", "SG", "AE", "MX", "NL"]
+STREETS = ["Tysons Blvd", "Main St", "Broadway", "Market St", "Elm Ave", "Park Ave", "Oak Dr", "Pine Rd", "5th Ave"]
+CITIES = [("Mclean", "VA", "22102", 38.93, -77.21), ("New York", "NY", "10001", 40.75, -73.99),
+          ("Austin", "TX", "73301", 30.27, -97.74), ("Chicago", "IL", "60601", 41.88, -87.62),
+          ("Seattle", "WA", "98101", 47.61, -122.33), ("Boston", "MA", "02108", 42.36, -71.06)]
+FIRST = ["Anna", "John", "Maria", "Wei", "Olga", "James", "Priya", "Ahmed", "Sofia", "David", "Elena", "Mark"]
+LAST = ["Smith", "Stepanov", "Garcia", "Chen", "Kumar", "Novak", "Brown", "Ivanova", "Müller", "Khan", "Lee"]
+REL_TYPES = ["DIRECTED_BY", "OFFICER_OF", "MANAGED_BY", "AGENT_OF"]
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Synthetic data
+# ──────────────────────────────────────────────────────────────────────────────
+def synthetic_company(n_addresses: int, n_directors: int, seed: int = 7) -> dict:
+    rnd = random.Random(seed)
+    base = load_record()
+    addr_tpl = base["addresses"][0]
+    dir_tpl = base["directors"][0]
+
+    addresses: list[dict] = []
+    for i in range(n_addresses):
+        if addresses and rnd.random() < 0.3:             # ~30 % re-listed duplicates (case / format drift)
+            dup = copy.copy(rnd.choice(addresses))
+            roll = rnd.random()
+            if roll < 0.3:
+                dup["addressLine"] = dup["addressLine"].upper()
+            elif roll < 0.6:                             # "Ste 12, 1750 Main St" form of "1750 Main St Suite 12"
+                street, _, unit = dup["addressLine"].partition(" Suite ")
+                dup["addressLine"] = f"Ste {unit}, {street}" if unit else street
+            elif dup["latitude"] is not None:            # same site, separately geocoded
+                dup["latitude"] += rnd.uniform(-5e-5, 5e-5)
+            addresses.append(dup)
+            continue
+        a = copy.copy(addr_tpl)
+        city, region, postal, lat, lon = rnd.choice(CITIES)
+        a.update({
+            "id": i, "addressLine": f"{rnd.randint(1, 9999)} {rnd.choice(STREETS)} Suite {rnd.randint(1, 2000)}",
+            "city": city, "region": region, "postal": postal, "country": rnd.choice(COUNTRIES),
+            "latitude": lat + rnd.uniform(-0.05, 0.05), "longitude": lon + rnd.uniform(-0.05, 0.05),
+            "suppress": rnd.random() < 0.05,
+        })
+        if rnd.random() < 0.03:
+            a["addressLine"] = "No Address Line Given"
+        addresses.append(a)
+
+    directors: list[dict] = []
+    for i in range(n_directors):
+        if directors and rnd.random() < 0.25:
+            directors.append(copy.copy(rnd.choice(directors)))
+            continue
+        d = copy.copy(dir_tpl)
+        first, last = rnd.choice(FIRST), rnd.choice(LAST)
+        d.update({
+            "id": i, "name": f"{first} {last} {i}", "firstName": first, "lastName": last,
+            "primaryName": {**dir_tpl["primaryName"], "fullName": f"{first} {last} {i}"},
+            "dateOfBirth": f"{rnd.randint(1940, 1995)}-01-01" if rnd.random() < 0.4 else "",
+            "relType": rnd.choice(REL_TYPES),
+        })
+        directors.append(d)
+
+    return {**base, "addresses": addresses, "directors": directors}
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Stages – each mirrors a step of key_addresses / key_officers
+# ──────────────────────────────────────────────────────────────────────────────
+def _buckets(clean: list) -> tuple[list[str], str]:
+    us = [a.pretty for a in clean if is_us(a)][:3]
+    intl = footprint_summary(region_counts(a.country for a in clean if a.country and not is_us(a)))
+    return us, intl
+
+
+def stages(rec: dict) -> dict[str, Callable[[], Any]]:
+    company = Company.from_pds(rec)
+    addrs, directors = company.addresses, company.directors
+    clean = dedupe_addresses(addrs)
+    return {
+        "from_pds": lambda: Company.from_pds(rec),
+        "format_addr": lambda: [format_addr(a) for a in addrs],
+        "is_us": lambda: [is_us(a) for a in addrs],
+        "dedupe_addresses": lambda: dedupe_addresses(addrs),
+        "us_intl_buckets": lambda: _buckets(clean),
+        "format_officer": lambda: [format_officer(d) for d in directors],
+        "collect_officers": lambda: collect_officers(directors),
+    }
+
+
+def measure(fn: Callable[[], Any], repeat: int) -> tuple[float, int]:
+    """(best wall time in ms over `repeat` runs, peak traced allocation in bytes)."""
+    best = math.inf
+    for _ in range(repeat):
+        gc.collect()
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    gc.collect()
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best * 1000, peak
+
+
+def retained_per_record(rec: dict) -> tuple[float, float]:
+    """Bytes retained per address + director: as parsed PDS dicts vs as records."""
+    n = len(rec["addresses"]) + len(rec["directors"])
+    payload = json.dumps(rec).encode()
+    out = []
+    for build in (json.loads, lambda b: Company.from_pds(json.loads(b))):
+        gc.collect()
+        tracemalloc.start()
+        kept = build(payload)
+        gc.collect()
+        size, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del kept
+        out.append(size / n)
+    return out[0], out[1]
+
+
+def growth_exponent(sizes: list[int], times: list[float]) -> float:
+    """Least-squares slope of log(time) vs log(n) – ~1.0 is linear."""
+    pts = [(math.log(n), math.log(t)) for n, t in zip(sizes, times) if n >= 1000 and t > 0]
+    if len(pts) < 2:
+        return float("nan")
+    mx = sum(x for x, _ in pts) / len(pts)
+    my = sum(y for _, y in pts) / len(pts)
+    return sum((x - mx) * (y - my) for x, y in pts) / sum((x - mx) ** 2 for x, _ in pts)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Microbenchmarks for address / officer post-processing.")
+    parser.add_argument("--sizes", default="10,100,1000,10000,100000",
+                        help="comma-separated address and director counts")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--max-exponent", type=float, default=1.2,
+                        help="flag stages whose log-log growth exponent exceeds this")
+    parser.add_argument("--json", type=Path, help="also write the results as JSON")
+    args = parser.parse_args()
+    sizes = [int(s) for s in args.sizes.split(",")]
+
+    results: dict[str, dict[int, dict[str, float]]] = {}
+    for n in sizes:
+        rec = synthetic_company(n, n)
+        for name, fn in stages(rec).items():
+            ms, peak = measure(fn, args.repeat if n < 100_000 else max(1, args.repeat // 2))
+            results.setdefault(name, {})[n] = {"ms": ms, "us_per_item": ms * 1000 / n, "peak_kib": peak / 1024}
+
+    print(f"\n{'stage':<20}{'n':>9}{'ms':>12}{'µs/item':>10}{'peak KiB':>12}")
+    flagged = []
+    for name, by_n in results.items():
+        for n, r in by_n.items():
+            print(f"{name:<20}{n:>9}{r['ms']:>12.2f}{r['us_per_item']:>10.2f}{r['peak_kib']:>12.1f}")
+        exp = growth_exponent(list(by_n), [r["ms"] for r in by_n.values()])
+        mark = "  ← super-linear" if exp > args.max_exponent else ""
+        print(f"{'':<20}{'growth exponent':>21} {exp:.2f}{mark}")
+        if exp > args.max_exponent:
+            flagged.append(name)
+
+    as_dict, as_record = retained_per_record(synthetic_company(1000, 1000))
+    print(f"\nretained per address/director: {as_dict:.0f} B as dict, {as_record:.0f} B as record")
+
+    if args.json:
+        args.json.write_text(json.dumps({"results": results, "flagged": flagged,
+                                         "bytes_per_record": {"dict": as_dict, "record": as_record}}, indent=2),
+                             encoding="utf-8")
+    if flagged:
+        print(f"\nSuper-linear stages: {', '.join(flagged)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
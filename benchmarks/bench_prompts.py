@@ -0,0 +1,118 @@
+# bench_prompts.py – per-section prompt size before and after token budgeting
+#
+#   python -m benchmarks.bench_prompts --directors 5,20,200 [--budget key_officers=300]
+#
+# Builds the key_officers and key_addresses prompts for synthetic companies
+# twice: with the previous templates (long instruction blocks, sample
+# paragraph, "Officer Of"-style lines) and with the budgeted builder, and
+# prints the token count of each (untrimmed and as sent).
+import argparse
+import json
+import os
+import sys
+
+from .bench_postprocess import synthetic_company
+from .common import REPO_ROOT
+
+sys.path.insert(0, str(REPO_ROOT / "src"))
+os.environ.setdefault("CHAT_MODEL", "openai:bench")
+os.environ.setdefault("OPENAI_API_KEY", "bench")
+
+from beeai_agents.agents.addresses_agent import addresses_prompt  # noqa: E402
+from beeai_agents.agents.key_officers_agent import officers_prompt  # noqa: E402
+from beeai_agents.utils import prompts  # noqa: E402
+from beeai_agents.utils.officers import OFFICERS_CHUNK, rank_officers, resolve_officers  # noqa: E402
+from beeai_agents.utils.records import Company  # noqa: E402
+from beeai_agents.utils.regions import footprint_summary, region_counts  # noqa: E402
+from beeai_agents.utils.utils import collect_officers, dedupe_addresses  # noqa: E402
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Previous templates, verbatim
+# ──────────────────────────────────────────────────────────────────────────────
+_LEGACY_EXAMPLE = """
+        **Key Officers**
+        ONEREP LLC was first established in Eastern Europe in 2015 and incorporated in
+        the US in October 2018. The Founder & CEO, Dzmitry Shelest …  The current CTO,
+        Mikalai Shershan …  The SVP of Strategic Partnerships, Mark Kapczynski …
+        """.strip()
+
+
+def legacy_officers_prompt(company_name: str, directors) -> str:
+    lines = []
+    for p in resolve_officers(rank_officers(directors)):
+        dob = f", born {p.date_of_birth}" if p.date_of_birth else ""
+        lines.append(f"{p.name or 'Unnamed individual'}{dob} – " + ", ".join(r.replace("_", " ").title() for r in p.roles))
+    lines = list(dict.fromkeys(lines))[:OFFICERS_CHUNK]
+    system_guard = f"""
+        **Key Officers-{company_name}
+        Begin with the bold heading **Key Officers-{company_name}**.
+
+        You are writing the **Key Officers – {company_name}** paragraph for an analyst
+        report.
+
+        • Base every statement **only** on the officers supplied.
+        • Do **not** copy wording from the sample – it is illustrative only.
+        • Do **not** invent biographies or commentary that is not present in the data.
+        """.strip()
+    return (f"{system_guard}\n### Sample (format ONLY – do not repeat wording):\n{_LEGACY_EXAMPLE}\n\n"
+            "### Write the paragraph for the following officers:\n" + "\n".join(f"• {o}" for o in lines))
+
+
+def legacy_addresses_prompt(us_addrs: list[str], intl_block: str) -> str:
+    system_guard = """
+            Begin the paragraph with the bold heading of following text **Key Addresses**.
+
+            • Quote up to **three** illustrative U.S. addresses verbatim.
+            • Add 1-2 concise sentences that describe the international footprint
+            from the per-region counts I supply (e.g. “Europe, Asia-Pacific and Africa”).
+            • Base every statement strictly on the data provided – no invented sites.
+            """.strip()
+    us_block = "; ".join(us_addrs) if us_addrs else "None"
+    return (system_guard + "\n\n### Data\n" + f"• U.S. addresses: {us_block}\n\n\n"
+            + f"• Non-U.S. sites by region: {intl_block}")
+
+
+def run(sizes: list[int]) -> list[dict]:
+    rows = []
+    for n in sizes:
+        company = Company.from_pds(synthetic_company(n, n))
+        officers = collect_officers(company.directors)
+        clean = dedupe_addresses(company.addresses)
+        us = [a.pretty for a in clean if a.is_us][:3]
+        intl = footprint_summary(region_counts(a.country for a in clean if a.country and not a.is_us))
+        # the single-call officers prompt only ever carries ≤ OFFICERS_CHUNK officers
+        cases = {
+            "key_officers": (legacy_officers_prompt("OneRep", company.directors),
+                             officers_prompt("OneRep", officers[:OFFICERS_CHUNK])),
+            "key_addresses": (legacy_addresses_prompt(us, intl), addresses_prompt(us, intl)),
+        }
+        for section, (legacy, built) in cases.items():
+            rows.append({"section": section, "n": n, "legacy": prompts.count_tokens(legacy),
+                         "untrimmed": built.untrimmed_tokens, "sent": built.tokens,
+                         "budget": prompts.budget_for(section), "dropped_lines": built.dropped_lines})
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Prompt tokens per section, previous templates vs budgeted builder.")
+    parser.add_argument("--directors", default="5,20,200", help="comma-separated director / address counts")
+    parser.add_argument("--budget", default="", help='override budgets, e.g. "key_officers=300"')
+    parser.add_argument("--json", dest="json_out", help="also write the results as JSON")
+    args = parser.parse_args()
+    prompts.PROMPT_BUDGETS.update(prompts._parse_budgets(args.budget))
+    prompts.load_tokenizer()
+
+    rows = run([int(s) for s in args.directors.split(",")])
+    print(f"\ntokenizer {prompts.tokenizer_name()}")
+    print(f"{'section':<16}{'n':>7}{'legacy':>9}{'untrimmed':>11}{'sent':>7}{'budget':>8}{'dropped':>9}{'saved':>8}")
+    for r in rows:
+        saved = 1 - r["sent"] / r["legacy"] if r["legacy"] else 0.0
+        print(f"{r['section']:<16}{r['n']:>7}{r['legacy']:>9}{r['untrimmed']:>11}{r['sent']:>7}{r['budget']:>8}"
+              f"{r['dropped_lines']:>9}{saved:>8.0%}")
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as fh:
+            json.dump({"tokenizer": prompts.tokenizer_name(), "rows": rows}, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
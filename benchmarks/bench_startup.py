@@ -0,0 +1,130 @@
+# bench_startup.py – cold-start cost: import time and time to first response
+#
+#   python -m benchmarks.bench_startup --runs 3 [--budget-ms 1500] [--root /path/to/other/checkout]
+#
+# Imports `api` in fresh interpreters under `-X importtime` and reports the
+# total and the most expensive modules, then starts `uvicorn api:app` against
+# the local fakes and measures how long a new process takes to accept
+# connections, to report ready and to answer its first /query. Exits non-zero
+# when the median import time exceeds --budget-ms.
+import argparse
+import asyncio
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+from .common import REPO_ROOT
+from .fakes import Latency, free_port, serve_fakes
+
+_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)")
+
+
+def import_profile(root: Path, module: str) -> tuple[float, list[tuple[str, float, float]]]:
+    """(total ms, [(module, cumulative ms, self ms) for each module `module` imports directly]) for one fresh import."""
+    # like the fakes: any chat model that needs no credentials to construct
+    env = {"CHAT_MODEL": "openai:bench", "OPENAI_API_KEY": "bench", **os.environ, "LITELLM_LOCAL_MODEL_COST_MAP": "True"}
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          cwd=root, env=env, capture_output=True, text=True, check=True)
+    # -X importtime prints a module after everything it imports, indented by depth
+    children: list[tuple[str, float, float]] = []
+    for line in proc.stderr.splitlines():
+        m = _LINE.match(line)
+        if not m:
+            continue
+        self_us, cum_us, depth, name = int(m.group(1)), int(m.group(2)), len(m.group(3)) // 2, m.group(4)
+        if depth == 1:
+            children.append((name, cum_us / 1000, self_us / 1000))
+        elif depth == 0:
+            if name == module:
+                return cum_us / 1000, sorted(children, key=lambda c: -c[1])
+            children = []
+    raise RuntimeError(f"{module} not found in the -X importtime output")
+
+
+async def _first_response(root: Path, fake_env: dict[str, str]) -> dict[str, float]:
+    """
+    For a new process, ms from spawn until it accepts connections, until
+    /ready says so (same as listening for checkouts without /ready) and until
+    the first /query is answered, plus that /query's own latency.
+    """
+    port = free_port()
+    url = f"http://127.0.0.1:{port}"
+    env = {**os.environ, **fake_env, "TRACE_EXPORTER": "none", "LOG_LEVEL": "WARNING"}
+    started = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, "-m", "uvicorn", "api:app", "--host", "127.0.0.1", "--port", str(port),
+                             "--no-access-log"], cwd=root, env=env)
+    try:
+        async with httpx.AsyncClient(timeout=120) as client:
+            while True:
+                if proc.poll() is not None:
+                    raise RuntimeError(f"api exited with code {proc.returncode}")
+                try:
+                    if (await client.post(f"{url}/")).status_code == 200:
+                        break
+                except httpx.TransportError:
+                    await asyncio.sleep(0.01)
+            listening = time.perf_counter()
+            while (await client.get(f"{url}/ready")).status_code == 503:
+                await asyncio.sleep(0.01)
+            ready = time.perf_counter()
+            resp = await client.post(f"{url}/query", json={"company": "OneRep"})
+            resp.raise_for_status()
+            answered = time.perf_counter()
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+    return {"listening_ms": (listening - started) * 1000, "ready_ms": (ready - started) * 1000,
+            "first_response_ms": (answered - started) * 1000, "first_query_ms": (answered - ready) * 1000}
+
+
+async def time_to_first_response(root: Path, runs: int) -> list[dict[str, float]]:
+    async with serve_fakes(Latency(150), Latency(900), Latency(400)) as fake_env:
+        return [await _first_response(root, fake_env) for _ in range(runs)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Import time and time to first response of a cold api process.")
+    parser.add_argument("--root", type=Path, default=REPO_ROOT, help="checkout to measure (default: this one)")
+    parser.add_argument("--module", default="api")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=12, help="modules to list")
+    parser.add_argument("--budget-ms", type=float, default=1500.0, help="fail when the median import exceeds this")
+    parser.add_argument("--no-serve", action="store_true", help="only measure the import")
+    parser.add_argument("--json", dest="json_out", help="also write the results as JSON")
+    args = parser.parse_args()
+
+    import_profile(args.root, args.module)                      # warm the bytecode / file caches
+    profiles = [import_profile(args.root, args.module) for _ in range(args.runs)]
+    totals = [total for total, _ in profiles]
+    median = statistics.median(totals)
+    print(f"\nimport {args.module}: median {median:.0f} ms over {args.runs} runs ({', '.join(f'{t:.0f}' for t in totals)})")
+    print(f"{'imported by ' + args.module:<48}{'cumulative ms':>14}{'self ms':>10}")
+    for name, cum_ms, self_ms in profiles[-1][1][:args.top]:
+        print(f"{name:<48}{cum_ms:>14.1f}{self_ms:>10.1f}")
+
+    report: dict = {"import_ms": totals, "import_median_ms": median, "budget_ms": args.budget_ms}
+    if not args.no_serve:
+        samples = asyncio.run(time_to_first_response(args.root, args.runs))
+        print()
+        for key, label in (("listening_ms", "accepting connections"), ("ready_ms", "ready"),
+                           ("first_response_ms", "first /query answered"), ("first_query_ms", "first /query latency")):
+            report[key] = [s[key] for s in samples]
+            print(f"{label:<28}{statistics.median(report[key]):>8.0f} ms (median)")
+
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as fh:
+            json.dump(report, fh, indent=2)
+    if median > args.budget_ms:
+        print(f"\nimport of {args.module} took {median:.0f} ms, over the {args.budget_ms:.0f} ms budget")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
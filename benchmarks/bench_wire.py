@@ -0,0 +1,116 @@
+# bench_wire.py – bytes on the wire and serialization time per format and coding
+#
+#   python -m benchmarks.bench_wire --directors 20,200,2000 [--repeat 50]
+#
+# For a PDS search response (synthetic rec_dump.json-shaped companies) and a
+# /query answer (with usage and a span profile attached), measures:
+#   • serialization: stdlib json (what FastAPI used) vs the JSON encoder and
+#     msgpack now used by /query – encoded size and time;
+#   • compression: identity / gzip / br / zstd at the levels utils/wire.py
+#     uses – bytes on the wire and compress time, plus decompress time.
+# Codings whose package is not installed are skipped.
+import argparse
+import gzip
+import json
+import os
+import statistics
+import sys
+import time
+from typing import Any, Callable
+
+from .bench_postprocess import synthetic_company
+from .common import REPO_ROOT
+
+sys.path.insert(0, str(REPO_ROOT / "src"))
+os.environ.setdefault("CHAT_MODEL", "openai:bench")
+os.environ.setdefault("OPENAI_API_KEY", "bench")
+
+from beeai_agents.utils import wire  # noqa: E402
+from beeai_agents.utils.offload import JSON_DECODER, dumps  # noqa: E402
+
+
+def _median_ms(fn: Callable[[], Any], repeat: int) -> tuple[float, Any]:
+    """(median ms, last result) of `repeat` calls."""
+    times, out = [], None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        out = fn()
+        times.append((time.perf_counter() - started) * 1000)
+    return statistics.median(times), out
+
+
+def _decompressors() -> dict[str, Callable[[bytes], bytes]]:
+    out: dict[str, Callable[[bytes], bytes]] = {"gzip": gzip.decompress}
+    if wire.brotli is not None:
+        out["br"] = wire.brotli.decompress
+    if wire.zstandard is not None:
+        out["zstd"] = wire.zstandard.ZstdDecompressor().decompress
+    return out
+
+
+def query_answer(n: int) -> dict:
+    """A /query result of roughly the size a profile of `n` officers produces."""
+    paragraph = "The company operates through several subsidiaries and registered agents. " * 6
+    return {
+        "answer": "\n\n".join(f"**Section {i}**\n{paragraph}" for i in range(4 + n // 50)),
+        "usage": {"sections": {s: {"prompt_tokens": 900, "completion_tokens": 180, "cost_usd": 0.0012}
+                               for s in ("executive_summary", "key_addresses", "key_officers", "octagon_holdings")}},
+        "profile": {"spans": [{"name": f"span.{i}", "ms": 12.5 + i, "attributes": {"section": "key_officers"}}
+                              for i in range(20 + n // 10)]},
+    }
+
+
+def payloads(sizes: list[int]) -> list[tuple[str, Any]]:
+    out: list[tuple[str, Any]] = []
+    for n in sizes:
+        out.append((f"pds search n={n}", {"result": [{"kind": "Person", "name": "noise"}, synthetic_company(n, n)]}))
+        out.append((f"/query n={n}", query_answer(n)))
+    return out
+
+
+def run(sizes: list[int], repeat: int) -> list[dict]:
+    rows = []
+    decompress = _decompressors()
+    for label, obj in payloads(sizes):
+        encoders: dict[str, Callable[[], bytes]] = {
+            "json (stdlib)": lambda: json.dumps(obj).encode(),
+            f"{JSON_DECODER} (wire)": lambda: dumps(obj),
+        }
+        if wire.msgpack is not None:
+            encoders["msgpack"] = lambda: wire.msgpack.packb(obj, use_bin_type=True)
+        for fmt, encode in encoders.items():
+            encode_ms, body = _median_ms(encode, repeat)
+            rows.append({"payload": label, "format": fmt, "encoding": "identity", "bytes": len(body),
+                         "encode_ms": encode_ms, "compress_ms": 0.0, "decompress_ms": 0.0})
+            if fmt == "json (stdlib)":
+                continue
+            for coding in wire.CODECS:
+                compress_ms, packed = _median_ms(lambda: wire.compress(body, coding), repeat)
+                decompress_ms, _ = _median_ms(lambda: decompress[coding](packed), repeat)
+                rows.append({"payload": label, "format": fmt, "encoding": coding, "bytes": len(packed),
+                             "encode_ms": encode_ms, "compress_ms": compress_ms, "decompress_ms": decompress_ms})
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Wire size and serialization time per format and content coding.")
+    parser.add_argument("--directors", default="20,200,2000", help="comma-separated director / address counts")
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--json", dest="json_out", help="also write the results as JSON")
+    args = parser.parse_args()
+
+    rows = run([int(s) for s in args.directors.split(",")], args.repeat)
+    print(f"\n{'payload':<20}{'format':<16}{'coding':<10}{'bytes':>10}{'vs json':>9}"
+          f"{'encode ms':>11}{'compress ms':>13}{'decompress ms':>15}")
+    baseline: dict[str, int] = {}
+    for r in rows:
+        base = baseline.setdefault(r["payload"], r["bytes"])
+        print(f"{r['payload']:<20}{r['format']:<16}{r['encoding']:<10}{r['bytes']:>10}{r['bytes'] / base:>9.0%}"
+              f"{r['encode_ms']:>11.3f}{r['compress_ms']:>13.3f}{r['decompress_ms']:>15.3f}")
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as fh:
+            json.dump(rows, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
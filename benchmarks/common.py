@@ -0,0 +1,39 @@
+# common.py – small helpers shared by the benchmark scripts
+import json
+import math
+import statistics
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+REC_DUMP = REPO_ROOT / "rec_dump.json"
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Nearest-rank percentile (q in 0–100); 0.0 for an empty list."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = max(0, min(len(ordered) - 1, math.ceil(q / 100 * len(ordered)) - 1))
+    return ordered[k]
+
+
+def summarize(values: list[float]) -> dict[str, float]:
+    return {
+        "n": len(values),
+        "mean": statistics.fmean(values) if values else 0.0,
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99),
+        "max": max(values, default=0.0),
+    }
+
+
+def print_table(title: str, rows: dict[str, dict[str, float]], unit: str = "ms") -> None:
+    print(f"\n{title}")
+    print(f"{'':<28}{'n':>7}{'mean':>10}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}   ({unit})")
+    for name, s in rows.items():
+        print(f"{name:<28}{s['n']:>7}{s['mean']:>10.1f}{s['p50']:>10.1f}{s['p95']:>10.1f}{s['p99']:>10.1f}{s['max']:>10.1f}")
+
+
+def load_record(path: Path = REC_DUMP) -> dict:
+    return json.loads(Path(path).read_text(encoding="utf-8"))
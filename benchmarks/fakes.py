@@ -0,0 +1,174 @@
+# fakes.py – local stand-ins for PDS, the watsonx chat model and the Octagon gateway
+#
+# Each fake is a tiny FastAPI app with a configurable latency distribution and
+# error rate. The chat fake speaks the OpenAI chat-completions protocol, so the
+# service can be pointed at it with CHAT_MODEL=openai:<name> + OPENAI_API_BASE.
+import asyncio
+import copy
+import json
+import random
+import socket
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse
+
+from .common import load_record
+
+
+@dataclass
+class Latency:
+    """Service time in ms: `median` with log-normal spread `sigma` (0 → constant)."""
+    median: float = 50.0
+    sigma: float = 0.0
+    error_rate: float = 0.0
+
+    def sample(self) -> float:
+        if self.sigma <= 0:
+            return self.median / 1000
+        return random.lognormvariate(0, self.sigma) * self.median / 1000
+
+    async def wait_or_fail(self) -> JSONResponse | None:
+        await asyncio.sleep(self.sample())
+        if self.error_rate and random.random() < self.error_rate:
+            return JSONResponse({"error": "injected failure"}, status_code=503)
+        return None
+
+    @classmethod
+    def parse(cls, spec: str) -> "Latency":
+        """'median[,sigma[,error_rate]]', e.g. '800,0.4,0.01'."""
+        parts = [float(p) for p in spec.split(",")] if spec else []
+        return cls(*parts)
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# PDS – POST /companies/search returns a rec_dump.json-style Company record
+# ──────────────────────────────────────────────────────────────────────────────
+def pds_app(latency: Latency, record: dict | None = None, home: str | None = None) -> FastAPI:
+    """`home`: only searches with this stateProvince find the company (all do when None)."""
+    app = FastAPI()
+    app.add_middleware(GZipMiddleware, minimum_size=1024)   # so compressed transfers can be measured
+    template = record or load_record()
+
+    @app.post("/companies/search")
+    async def search(request: Request):
+        if (failure := await latency.wait_or_fail()) is not None:
+            return failure
+        if home and request.query_params.get("stateProvince") != home:
+            return JSONResponse({"result": [{"kind": "Person", "name": "noise"}]})
+        rec = copy.copy(template)
+        rec["name"] = request.query_params.get("companyName", rec.get("name"))
+        # real searches also return non-Company hits ahead of the match
+        return JSONResponse({"result": [{"kind": "Person", "name": "noise"}, rec]})
+
+    return app
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Chat model – OpenAI-compatible /v1/chat/completions with usage numbers
+# ──────────────────────────────────────────────────────────────────────────────
+def chat_app(latency: Latency, completion_tokens: int = 120) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/v1/chat/completions")
+    async def completions(request: Request):
+        body = await request.json()
+        if (failure := await latency.wait_or_fail()) is not None:
+            return failure
+        prompt = "".join(str(m.get("content", "")) for m in body.get("messages", []))
+        heading = prompt.split("**")[1] if prompt.count("**") >= 2 else "Section"
+        text = f"**{heading}**\n" + " ".join(["lorem"] * completion_tokens)
+        return {
+            "id": "chatcmpl-fake", "object": "chat.completion", "created": 0, "model": body.get("model"),
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": text}}],
+            "usage": {"prompt_tokens": len(prompt) // 4, "completion_tokens": completion_tokens,
+                      "total_tokens": len(prompt) // 4 + completion_tokens},
+        }
+
+    return app
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Octagon – OpenAI Responses API for the ticker and holdings agents
+# ──────────────────────────────────────────────────────────────────────────────
+HOLDINGS_ROWS = [
+    {"date": "2024-12-31", "investorsHolding": 4210, "numberOf13Fshares": 9_800_000_000,
+     "totalInvested": 2_300_000_000_000, "ownershipPercent": 61.3, "newPositions": 310,
+     "increasedPositions": 1900, "reducedPositions": 1700, "closedPositions": 120, "putCallRatio": 0.81},
+    {"date": "2024-09-30", "investorsHolding": 4105, "numberOf13Fshares": 9_700_000_000,
+     "totalInvested": 2_100_000_000_000, "ownershipPercent": 60.8, "newPositions": 290,
+     "increasedPositions": 1850, "reducedPositions": 1750, "closedPositions": 140, "putCallRatio": 0.77},
+]
+
+
+def octagon_app(latency: Latency, public_ratio: float = 1.0) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/v1/responses")
+    async def responses(request: Request):
+        body = await request.json()
+        if (failure := await latency.wait_or_fail()) is not None:
+            return failure
+        if body.get("model") == "octagon-stock-data-agent":
+            text = "FAKE" if random.random() < public_ratio else "PRIVATE"
+        else:
+            text = json.dumps(HOLDINGS_ROWS)
+        return {
+            "id": "resp_fake", "object": "response", "created_at": 0, "model": body.get("model"),
+            "status": "completed", "parallel_tool_calls": False, "tool_choice": "auto", "tools": [],
+            "output": [{"type": "message", "id": "msg_fake", "role": "assistant", "status": "completed",
+                        "content": [{"type": "output_text", "text": text, "annotations": []}]}],
+            "usage": {"input_tokens": len(str(body.get("input", ""))) // 4, "output_tokens": len(text) // 4,
+                      "total_tokens": (len(str(body.get("input", ""))) + len(text)) // 4,
+                      "input_tokens_details": {"cached_tokens": 0},
+                      "output_tokens_details": {"reasoning_tokens": 0}},
+        }
+
+    return app
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Serving
+# ──────────────────────────────────────────────────────────────────────────────
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@asynccontextmanager
+async def serve(app: FastAPI, port: int | None = None) -> AsyncIterator[str]:
+    """Run `app` on 127.0.0.1 inside the current loop; yields its base URL."""
+    port = port or free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning",
+                                           access_log=False, lifespan="off"))
+    task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+    try:
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        server.should_exit = True
+        await task
+
+
+@asynccontextmanager
+async def serve_fakes(pds: Latency, chat: Latency, octagon: Latency,
+                      record: dict | None = None) -> AsyncIterator[dict[str, str]]:
+    """Start all three fakes; yields the env vars that point the service at them."""
+    async with serve(pds_app(pds, record)) as pds_url, \
+               serve(chat_app(chat)) as chat_url, \
+               serve(octagon_app(octagon)) as octagon_url:
+        yield {
+            "PDS_URL": pds_url,
+            "CHAT_MODEL": "openai:fake-granite",
+            "OPENAI_API_BASE": f"{chat_url}/v1",
+            "OPENAI_API_KEY": "fake",
+            "OCTAGON_BASE_URL": f"{octagon_url}/v1",
+            "OCTAGON_API_KEY": "fake",
+        }
@@ -0,0 +1,144 @@
+# load.py – end-to-end load benchmark for `POST /query` against local fakes
+#
+#   python -m benchmarks.load --requests 200 --concurrency 20 \
+#       --pds 120,0.3 --chat 900,0.4,0.01 --octagon 400,0.3
+#
+# Starts the PDS / chat-model / Octagon fakes in this process, launches
+# `uvicorn api:app` in a subprocess pointed at them, drives /query with a
+# closed-loop load generator and reports throughput plus p50/p95/p99 latency
+# for the whole request and for every traced section and upstream call.
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import httpx
+
+from .common import REPO_ROOT, load_record, print_table, summarize
+from .fakes import Latency, free_port, serve_fakes
+
+
+async def _wait_ready(url: str, proc: subprocess.Popen, timeout: float = 120.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            if proc.poll() is not None:
+                raise RuntimeError(f"api exited with code {proc.returncode}")
+            try:
+                if (await client.post(f"{url}/")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.2)
+    raise TimeoutError("api did not become ready")
+
+
+async def _drive(url: str, companies: list[str], total: int, concurrency: int) -> tuple[list[float], int, float]:
+    latencies: list[float] = []
+    errors = 0
+    counter = iter(range(total))
+
+    async def worker(client: httpx.AsyncClient) -> None:
+        nonlocal errors
+        for i in counter:
+            t0 = time.perf_counter()
+            try:
+                resp = await client.post(f"{url}/query", json={"company": companies[i % len(companies)]})
+                ok = resp.status_code == 200
+            except httpx.HTTPError:
+                ok = False
+            if ok:
+                latencies.append((time.perf_counter() - t0) * 1000)
+            else:
+                errors += 1
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(timeout=300, limits=limits) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        wall = time.perf_counter() - started
+    return latencies, errors, wall
+
+
+def _span_durations(trace_file: Path) -> dict[str, list[float]]:
+    by_name: dict[str, list[float]] = defaultdict(list)
+    if not trace_file.exists():
+        return by_name
+    for line in trace_file.read_text(encoding="utf-8").splitlines():
+        sp = json.loads(line)
+        by_name[sp["name"]].append((int(sp["endTimeUnixNano"]) - int(sp["startTimeUnixNano"])) / 1e6)
+    return by_name
+
+
+async def run(args: argparse.Namespace) -> dict:
+    record = load_record(args.record) if args.record else None
+    companies = [f"Company {i}" for i in range(args.companies)]
+    with tempfile.TemporaryDirectory() as tmp:
+        trace_file = Path(tmp) / "traces.jsonl"
+        async with serve_fakes(Latency.parse(args.pds), Latency.parse(args.chat),
+                               Latency.parse(args.octagon), record) as fake_env:
+            port = free_port()
+            # caching off unless asked for (--env CACHE_BACKEND=sqlite): repeated companies would be free
+            env = {**os.environ, "CACHE_BACKEND": "none", **fake_env, **dict(kv.split("=", 1) for kv in args.env),
+                   "TRACE_EXPORTER": "file", "TRACE_FILE": str(trace_file), "LOG_LEVEL": "WARNING"}
+            proc = subprocess.Popen(
+                [sys.executable, "-m", "uvicorn", "api:app", "--host", "127.0.0.1", "--port", str(port),
+                 "--workers", str(args.workers), "--no-access-log"],
+                cwd=REPO_ROOT, env=env,
+            )
+            url = f"http://127.0.0.1:{port}"
+            try:
+                await _wait_ready(url, proc)
+                if args.warmup:
+                    await _drive(url, companies, args.warmup, min(args.warmup, args.concurrency))
+                    trace_file.unlink(missing_ok=True)
+                latencies, errors, wall = await _drive(url, companies, args.requests, args.concurrency)
+            finally:
+                proc.terminate()
+                proc.wait(timeout=30)
+        spans = _span_durations(trace_file)
+
+    report = {
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "errors": errors,
+        "throughput_rps": len(latencies) / wall if wall else 0.0,
+        "query": summarize(latencies),
+        "spans": {name: summarize(v) for name, v in sorted(spans.items())},
+    }
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="End-to-end load benchmark for POST /query against local fakes.")
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=5, help="unmeasured requests before the run")
+    parser.add_argument("--companies", type=int, default=50, help="distinct company names to cycle through")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--pds", default="150,0.3", help="PDS latency: median_ms[,sigma[,error_rate]]")
+    parser.add_argument("--chat", default="900,0.4", help="chat-model latency: median_ms[,sigma[,error_rate]]")
+    parser.add_argument("--octagon", default="400,0.3", help="Octagon latency: median_ms[,sigma[,error_rate]]")
+    parser.add_argument("--record", type=Path, help="Company record served by the PDS fake (default rec_dump.json)")
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE",
+                        help="extra environment for the service under test (repeatable)")
+    parser.add_argument("--json", type=Path, help="also write the report as JSON")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    print(f"\n{report['requests']} requests @ concurrency {report['concurrency']}: "
+          f"{report['throughput_rps']:.2f} req/s, {report['errors']} errors")
+    print_table("End-to-end", {"POST /query": report["query"]})
+    print_table("Sections and upstream calls (from spans)", report["spans"])
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
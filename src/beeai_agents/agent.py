@@ -1,19 +1,38 @@
 import os
 import json
+import asyncio
 from collections.abc import AsyncGenerator
+from contextlib import asynccontextmanager
 
 from acp_sdk import MessagePart, Metadata
 from acp_sdk.models import Message
 from acp_sdk.server import Context, RunYield, RunYieldResume
 
 
-from .utils.utils import  server
+from .utils.utils import  close_pds_client, resolve_jurisdictions, server
+from .utils.cache import get_cache
+from .utils.tracing import span
+from .utils.logs import configure_logging, current_request_id, bind_request_id
+from .utils.loop_monitor import monitor_event_loop
+from .utils.offload import shutdown_executor
+from .utils.warmup import warm_up
 
 
-from .agents.addresses_agent import key_addresses
-from .agents.key_officers_agent import key_officers
-from .agents.executive_summary_agent import executive_summary
-from .agents.shareholders import octagon_holdings
+def section_agents() -> dict:
+    """
+    The section agents, imported (and registered with `server`) on first use
+    so that importing this module stays cheap for a cold instance.
+    """
+    from .agents.addresses_agent import key_addresses
+    from .agents.key_officers_agent import key_officers
+    from .agents.executive_summary_agent import executive_summary
+    from .agents.shareholders import octagon_holdings
+    return {
+        "executive_summary": executive_summary,
+        "key_addresses": key_addresses,
+        "key_officers": key_officers,
+        "octagon_holdings": octagon_holdings,
+    }
 
 
 
@@ -24,47 +43,59 @@ async def company_profile(
 ) -> AsyncGenerator[RunYield, RunYieldResume]:
 
     company_name = str(input[-1]).strip()
+    request_id = current_request_id() or bind_request_id()
 
     # --- helper to build the “user” message ----------------------------------
     def make_user_msg(text: str) -> Message:
         """Return an ACP Message equivalent to: {'role':'user', 'content': text}"""
         return Message(parts=[MessagePart(content=text)])
-    
-    # 1) run executive_summary ----------------------------------------------------
-    executive_summary_chunks: list[str] = []
-    async for part in executive_summary([make_user_msg(company_name)], context):
-        if isinstance(part, MessagePart):
-            executive_summary_chunks.append(part.content)           # MessagePart → grab its .content
-            
-    # 2) run key_addresses ----------------------------------------------------
-    addr_chunks: list[str] = []
-    async for part in key_addresses([make_user_msg(company_name)], context):
-        if isinstance(part, MessagePart):
-            addr_chunks.append(part.content)           # MessagePart → grab its .content
-
-    # 3) run key_officers -----------------------------------------------------
-    officer_chunks: list[str] = []
-    async for part in key_officers([make_user_msg(company_name)], context):
-        if isinstance(part, MessagePart):
-            officer_chunks.append(part.content)
-
-    # 3) run Octagon Holdings Agent -----------------------------------------------------
-    holdings_chunks: list[str] = []
-    async for part in octagon_holdings([make_user_msg(company_name)], context):
-        if isinstance(part, MessagePart):
-            holdings_chunks.append(part.content)
-            
-    # 4) stream combined result back to caller -------------------------------
-    combined = "\n\n".join(["".join(executive_summary_chunks),
-                            "".join(addr_chunks), 
-                            "".join(officer_chunks),
-                            "".join(holdings_chunks)
+
+    # --- helper to run one section agent under its own span ------------------
+    async def run_section(name: str, agent) -> str:
+        chunks: list[str] = []
+        with span(f"section.{name}", {"section": name}) as sp:
+            async for part in agent([make_user_msg(company_name)], context):
+                if isinstance(part, MessagePart):
+                    chunks.append(part.content)           # MessagePart → grab its .content
+            sp.set_attribute("section.output_chars", sum(map(len, chunks)))
+        return "".join(chunks)
+
+    # 1) executive summary, 2) key addresses, 3) key officers, 4) Octagon holdings – independent of each other, so
+    # they run concurrently: a profile takes as long as its slowest section, and the sections that search PDS for
+    # the same company share one search (single-flight cache)
+    async def build() -> list[str]:
+        return list(await asyncio.gather(*(run_section(name, agent) for name, agent in section_agents().items())))
+
+    # a section that failed calls skip_store(), so degraded profiles are never cached
+    with span("company_profile", {"company": company_name, "request.id": request_id}):
+        executive_summary_text, addr_text, officer_text, holdings_text = await get_cache("profile").get_or_compute(
+            (company_name, resolve_jurisdictions()), build)
+
+    # stream combined result back to caller -------------------------------
+    combined = "\n\n".join([executive_summary_text,
+                            addr_text,
+                            officer_text,
+                            holdings_text
                             ])
     yield MessagePart(content=combined)
 
 
+@asynccontextmanager
+async def lifespan(app):
+    await warm_up()                          # the ACP server only accepts runs once this returns
+    try:
+        async with monitor_event_loop():
+            yield
+    finally:
+        await close_pds_client()
+        shutdown_executor()
+
+
 def run() -> None:  # local dev helper
-    server.run(host=os.getenv("HOST", "127.0.0.1"), port=int(os.getenv("PORT", 8080)))
+    configure_logging()
+    section_agents()                         # the ACP server lists every section agent
+    server.lifespan = lifespan
+    server.run(host=os.getenv("HOST", "127.0.0.1"), port=int(os.getenv("PORT", 8080)), configure_logger=False)
 
 
 if __name__ == "__main__":
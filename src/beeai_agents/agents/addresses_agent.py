@@ -5,19 +5,33 @@ import httpx
 from acp_sdk import MessagePart, Metadata
 from acp_sdk.models import Message
 from acp_sdk.server import Context, RunYield, RunYieldResume, Server
-from beeai_framework.backend.message import UserMessage
 
 
-from ..utils.utils import format_addr, is_us, server, chat_model, fetch_company_data_from_pds
+from ..utils.utils import dedupe_addresses, server, generate, fetch_company
+from ..utils.cache import skip_store
+from ..utils.offload import OFFLOAD_MIN_ITEMS, run_cpu
+from ..utils.regions import footprint_summary, region_counts
+from ..utils.prompts import Block, BuiltPrompt, build_prompt
 
 
-import logging, sys
-logging.basicConfig(
-    stream=sys.stdout, level=logging.INFO,
-    format="%(asctime)s %(levelname)s %(name)s :: %(message)s"
-)
+import logging
 log = logging.getLogger("key_addresses")
 
+ADDRESSES_GUARD = (
+    "Begin the paragraph with the bold heading **Key Addresses**.\n"
+    "• Quote up to three illustrative U.S. addresses verbatim.\n"
+    "• Add 1-2 concise sentences on the international footprint from the per-region counts "
+    "(e.g. “Europe, Asia-Pacific and Africa”).\n"
+    "• Base every statement strictly on the data provided – no invented sites."
+)
+
+
+def addresses_prompt(us_addrs: list[str], intl_block: str) -> BuiltPrompt:
+    return build_prompt(ADDRESSES_GUARD, [
+        Block("U.S. addresses", us_addrs or ["None"]),
+        Block("Non-U.S. sites by region", [intl_block]),
+    ], section="key_addresses")
+
 # ──────────────────────────────────────────────────────────────────────────────
 # Bee agent
 # ──────────────────────────────────────────────────────────────────────────────
@@ -31,63 +45,33 @@ async def key_addresses(
     • Ask the LLM to craft the “Key Addresses” paragraph
     • Stream that paragraph back to the user
     """
-    print("===>key_addresses method started===>")
     company_name = str(input[-1]).strip()
-    print("===>key_addresses started for===> :", company_name, flush=True)
+    log.debug("key_addresses started for %s", company_name)
 
     try:
-        
-        print("===>fetching company data from PDS===>", flush=True)
         log.info("Fetching company data for %s", company_name)
-        data = await fetch_company_data_from_pds(company_name)
-        print("===>fetched company data from PDS===>", flush=True)
+        company = await fetch_company(company_name)
         log.info("Fetched company data for %s", company_name)
-        rec = next(
-            (r for r in data.get("result", []) if r.get("kind") == "Company"),{},)
-        log.info("Found company data for %s", company_name)
-        print("===>rec length===>:", len(rec), flush=True)
-        log.info("Company data length: %s", len(rec))
-        # print("rec :", rec)
-        raw_addrs = rec.get("addresses", [{}])
-        print("===>raw_addrs length===>:", len(raw_addrs), flush=True)
+        addrs = company.addresses if company else ()
+        log.debug("addresses length: %d", len(addrs))
         # ── 1. Harvest usable addresses and deduplicate  ───────────────────────
-        clean_pairs: list[tuple[str, dict]] = []          # (pretty_addr , original_dict)
-        seen: set[str] = set()                            # case-insensitive key
-
-        for a in raw_addrs:
-            # ignore suppressed / blank / “No Address Line Given” rows
-            if a.get("suppress"):
-                continue
-            line = (a.get("addressLine") or a.get("Address_Line") or "")
-            if not line or "no address line" in line.lower():
-                continue
-
-            pretty = format_addr(a)                       # normalised printable string
-            key = pretty.lower()                         # de-dupe key (case-insensitive)
-            if key not in seen:
-                clean_pairs.append((pretty, a))
-                seen.add(key)
-        print("===>number of clean_pairs===>:", len(clean_pairs), flush=True)
-        if not clean_pairs:
+        clean = await run_cpu(dedupe_addresses, addrs, heavy=len(addrs) >= OFFLOAD_MIN_ITEMS)
+        log.debug("number of clean addresses: %d", len(clean))
+        if not clean:
             yield MessagePart(content =f"No addresses found.")
             return
 
         
         # ── 2. Build the U.S. and international buckets (now distinct) ─────────
-        us_addrs   = [p for p, meta in clean_pairs if is_us(meta)][:3]         # ≤ 3 distinct
-        intl_codes = {
-            (meta.get("country") or meta.get("Country") or "").upper()
-            for p, meta in clean_pairs if not is_us(meta)
-        }
+        us_addrs   = [a.pretty for a in clean if a.is_us][:3]         # ≤ 3 distinct
+        # one country code per non-U.S. site; rows without a country are not placeable
+        intl_sites = [a.country for a in clean if a.country and not a.is_us]
 
-        us_block   = "; ".join(us_addrs) if us_addrs else "None"
-        intl_block = ", ".join(sorted(intl_codes)) or "None"
+        intl_block = footprint_summary(region_counts(intl_sites))
+
+
+        log.debug("us addresses: %d, intl_block length: %d", len(us_addrs), len(intl_block))
 
-        
-        
-        print("===>us_block length===>:", len(us_block))
-        print("===>intl_block length===>:", len(intl_block))
-        
         # ── craft LLM prompt ──────────────────────────────────────────────────────
         sample = """
         **Key Addresses**
@@ -114,22 +98,7 @@ async def key_addresses(
         # • Base every statement only on the data supplied – no invented sites.
         # """.strip()
 
-        system_guard = f"""
-            Begin the paragraph with the bold heading of following text **Key Addresses**.
-
-            • Quote up to **three** illustrative U.S. addresses verbatim.  
-            • Add 1-2 concise sentences that describe the international footprint,
-            **grouping** the non-U.S. countries I supply into their continents
-            (e.g. “Europe, Asia-Pacific and Africa”). Do **not** list every country.  
-            • Base every statement strictly on the data provided – no invented sites.
-            """.strip()
-
-        prompt = (
-            system_guard
-            + "\n\n### Data\n"
-            + f"• U.S. addresses: {us_block}\n\n\n"
-            + f"• Non-U.S. country codes: {intl_block}"
-        )
+        prompt = addresses_prompt(us_addrs, intl_block)
         # prompt = (
         #     system_guard
         #     + "\n\n### Format sample (style only):\n"
@@ -140,16 +109,16 @@ async def key_addresses(
         # )
 
         
-        response = await chat_model.create(messages=[UserMessage(prompt)])
-        summary = response.get_text_content()
+        summary = await generate(prompt.text, section="key_addresses")
         yield MessagePart(content=summary)
 
 
     except Exception as exc:
         tb = traceback.format_exc()
-        # Log internally (prints to container logs / Cloud logging)
-        print("key_addresses error:", tb, flush=True)
-        
+        # Log internally (container logs / Cloud logging)
+        log.exception("key_addresses failed for %s", company_name)
+        skip_store()
+
         yield MessagePart(
             content=(
                 f"Sorry, I couldn’t fetch data for “{company_name}”.\n\n"
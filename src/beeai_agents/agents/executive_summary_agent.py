@@ -5,7 +5,6 @@ from collections.abc import AsyncGenerator
 from acp_sdk import MessagePart, Metadata
 from acp_sdk.models import Message
 from acp_sdk.server import Context, RunYield, RunYieldResume
-from beeai_framework.backend.message import UserMessage
 
 from ..utils.utils import  server
 
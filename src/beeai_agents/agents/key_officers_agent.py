@@ -1,13 +1,38 @@
-import traceback       
+import logging
+import traceback
 from collections.abc import AsyncGenerator
 
 
 from acp_sdk import MessagePart, Metadata
 from acp_sdk.models import Message
 from acp_sdk.server import Context, RunYield, RunYieldResume
-from beeai_framework.backend.message import UserMessage
 
-from ..utils.utils import  format_officer, fetch_company_data_from_pds, server, chat_model
+from ..utils.utils import  collect_officers, fetch_company, server, generate, generate_map_reduce
+from ..utils.cache import skip_store
+from ..utils.officers import OFFICERS_CHUNK, OFFICERS_MAX, chunked
+from ..utils.offload import OFFLOAD_MIN_ITEMS, run_cpu
+from ..utils.prompts import Block, BuiltPrompt, build_prompt
+
+log = logging.getLogger("key_officers")
+
+OMITTED_NOTE = "({n} further officers and directors are on record; mention this count, not their names.)"
+
+
+def officers_guard(company_name: str) -> str:
+    return (
+        f"Write the **Key Officers** paragraph of an analyst report on {company_name}.\n"
+        "Begin with the bold heading **Key Officers**, then 3-5 sentences on the most senior people and "
+        "their roles.\n"
+        "Use only the officers listed (name, birth date, roles); invent no biographies or commentary."
+    )
+
+
+def officers_prompt(company_name: str, officers: list[str]) -> BuiltPrompt:
+    """Single-call prompt for ≤ OFFICERS_CHUNK officers (after the OFFICERS_MAX cap)."""
+    officer_list = officers[:OFFICERS_MAX]
+    return build_prompt(officers_guard(company_name), [
+        Block("Officers", officer_list, omitted=len(officers) - len(officer_list), omitted_note=OMITTED_NOTE),
+    ], section="key_officers")
 
 
 @server.agent(name="key_officers", metadata=Metadata(ui={"type": "hands-off"}))
@@ -22,82 +47,60 @@ async def key_officers(
     """
     company_name = str(input[-1]).strip()
     try:
-        print("===>fetching company data from PDS===>")
-        data = await fetch_company_data_from_pds(company_name)
-        print("===>fetched company data from PDS===>")
-        rec = next((r for r in data.get("result", []) if r.get("kind") == "Company"), {})
+        log.debug("Fetching company data for %s", company_name)
+        company = await fetch_company(company_name)
+        log.debug("Fetched company data for %s", company_name)
 
-        raw_directors = rec.get("directors", [])  # <- every officer record
-        officers = {format_officer(director) for director in raw_directors if director}  # dedupe
+        directors = company.directors if company else ()  # <- every officer record
+        officers = await run_cpu(collect_officers, directors, heavy=len(directors) >= OFFLOAD_MIN_ITEMS)  # dedupe
 
         # ------------------------------------------------------------------ #
         # 1️⃣  NO DATA → ask the LLM to rely on its own knowledge            #
         # ------------------------------------------------------------------ #
         if not officers:
-            # prompt = (
-            #     f"You are writing the **Key Officers** – {company_name}** section of an "
-            #     "equity-research report.\n"
-                # "• Use your own knowledge to identify the current CEO and other C-suite "
-                # f"leaders of {company_name}.\n"
-                # "• In 3-4 sentences, state each person’s role and—briefly—their background.\n"
-                # "• If you are unsure who the executives are, say so clearly instead of guessing."
-            # )
-            prompt = f"""
-                You are writing the **Key Officers** section of an "
-                "equity-research report.\n"
-                
-                **Write exactly in this order:**
-                1. A heading line: **Key Officers**
-                2. Use your own knowledge to identify the current CEO and other C-suite "
-                f"leaders of {company_name}.\n"
-                "• In 3-4 sentences, state each person’s role and—briefly—their background.\n"
-                "• If you are unsure who the executives are, say so clearly instead of guessing."
-                """
-
-            resp = await chat_model.create(messages=[UserMessage(prompt)])
-            yield MessagePart(content=resp.get_text_content())
+            prompt = build_prompt(
+                f"Write the **Key Officers** paragraph of an equity-research report on {company_name}.\n"
+                "Begin with the bold heading **Key Officers**, then in 3-4 sentences name the current CEO and "
+                "other C-suite leaders with their roles and a brief background.\n"
+                "If you are unsure who the executives are, say so instead of guessing.",
+                [], section="key_officers",
+            )
+            yield MessagePart(content=await generate(prompt.text, section="key_officers"))
             return
 
-        # keep a stable order for the LLM
-        officer_list = list(officers)
+        # most relevant first (relType, recency); the long tail is only counted
+        officer_list = officers[:OFFICERS_MAX]
 
         # ── craft LLM prompt ──────────────────────────────────────────────────────
-        
-                # ── craft LLM prompt ──────────────────────────────────────────────────────
-        example = """
-        **Key Officers**
-        ONEREP LLC was first established in Eastern Europe in 2015 and incorporated in
-        the US in October 2018. The Founder & CEO, Dzmitry Shelest …  The current CTO,
-        Mikalai Shershan …  The SVP of Strategic Partnerships, Mark Kapczynski …
-        """.strip()
-
-        system_guard = f"""
-        **Key Officers-{company_name}
-        Begin with the bold heading **Key Officers-{company_name}**.
-
-        You are writing the **Key Officers – {company_name}** paragraph for an analyst
-        report.
-
-        • Base every statement **only** on the officers supplied.  
-        • Do **not** copy wording from the sample – it is illustrative only.  
-        • Do **not** invent biographies or commentary that is not present in the data.
-        """.strip()
-
-
-        prompt = (
-            f"{system_guard}\n"
-            "### Sample (format ONLY – do not repeat wording):\n"
-            f"{example}\n\n"
-            "### Write the paragraph for the following officers:\n"
-            + "\n".join(f"• {o}" for o in officer_list)
-        )
+        if len(officer_list) <= OFFICERS_CHUNK:
+            prompt = officers_prompt(company_name, officers)
+            summary = await generate(prompt.text, section="key_officers")
+            yield MessagePart(content=summary)
+            return
 
-        response = await chat_model.create(messages=[UserMessage(prompt)])
-        summary = response.get_text_content()
+        # ── long list → summarise chunks in parallel, then merge ──────────────
+        def map_prompt(chunk: list[str]) -> str:
+            return build_prompt(
+                f"Condense this part of the officer list of {company_name} into 2-3 factual sentences for an "
+                "analyst. Keep every name exactly as written with its role; add nothing that is not in the list.",
+                [Block("Officers", chunk, keep=len(chunk))], section="key_officers",
+            ).text
+
+        def reduce_prompt(notes: list[str]) -> str:
+            omitted = len(officers) - len(officer_list)
+            return build_prompt(
+                officers_guard(company_name) + ("\n" + OMITTED_NOTE.format(n=omitted) if omitted else ""),
+                [Block("Notes on the officers", notes, keep=len(notes))], section="key_officers",
+            ).text
+
+        chunks = chunked(officer_list, OFFICERS_CHUNK)
+        summary = await generate_map_reduce(chunks, map_prompt, reduce_prompt, section="key_officers")
         yield MessagePart(content=summary)
 
     except Exception as exc:
         tb = traceback.format_exc()
+        log.exception("key_officers failed for %s", company_name)
+        skip_store()
         yield MessagePart(
             content=(
                 f"Sorry, I couldn’t fetch data for “{company_name}”.\n\n"
@@ -1,26 +1,45 @@
 # shareholders.py  – Octagon holdings agent
-import os, json, re, textwrap, traceback
+import os, json, re, textwrap, logging
+import httpx
 from collections.abc import AsyncGenerator
 from pathlib import Path
 from typing import Any
 
-from openai import AsyncOpenAI
 from acp_sdk import MessagePart, Metadata
 from acp_sdk.models import Message
 from acp_sdk.server import Context, RunYield, RunYieldResume
-from beeai_framework.backend.message import UserMessage
 
-from ..utils.utils import server, chat_model
+from ..utils.utils import server, generate
+from ..utils.tracing import span
+from ..utils.cache import skip_store
+from ..utils.usage import record_octagon
+from ..utils.recording import upstream_transport
+from ..utils.prompts import Block, build_prompt
 from dotenv import load_dotenv, find_dotenv
 
+log = logging.getLogger("octagon_holdings")
+
 # ─── ENV / CLIENTS ───────────────────────────────────────────────────────
 load_dotenv(find_dotenv())
 OCTAGON_API_KEY = os.getenv("OCTAGON_API_KEY")
 
-octagon_client = AsyncOpenAI(
-    api_key=OCTAGON_API_KEY,
-    base_url="https://api-gateway.octagonagents.com/v1",
-)
+OCTAGON_BASE_URL = os.getenv("OCTAGON_BASE_URL", "https://api-gateway.octagonagents.com/v1")
+
+_octagon_client = None
+
+
+def get_octagon_client():
+    """AsyncOpenAI client for the Octagon gateway, built on first use (importing openai takes ~0.5 s)."""
+    global _octagon_client
+    if _octagon_client is None:
+        from openai import AsyncOpenAI
+        transport = upstream_transport("octagon")     # record / replay hook
+        _octagon_client = AsyncOpenAI(
+            api_key=OCTAGON_API_KEY,
+            base_url=OCTAGON_BASE_URL,
+            http_client=httpx.AsyncClient(transport=transport) if transport else None,
+        )
+    return _octagon_client
 
 # quick alias map
 NAME_TO_TICKER = {
@@ -30,6 +49,22 @@ NAME_TO_TICKER = {
 }
 
 # ─── HELPERS ─────────────────────────────────────────────────────────────
+async def octagon_call(model: str, query: str, section: str = "octagon_holdings") -> str:
+    """One traced, metered Octagon Responses call → concatenated output text."""
+    with span("octagon.responses", {"octagon.model": model, "octagon.input_chars": len(query)}) as sp:
+        resp = await get_octagon_client().responses.create(model=model, input=query)
+        tokens = 0
+        if resp.usage:
+            tokens = resp.usage.total_tokens
+            sp.set_attributes({
+                "llm.prompt_tokens": resp.usage.input_tokens,
+                "llm.completion_tokens": resp.usage.output_tokens,
+            })
+        record_octagon(section, model, tokens)
+        text = "".join(p.text for p in resp.output[0].content)
+        sp.set_attribute("octagon.output_chars", len(text))
+        return text
+
 def fmt(n: int | float | None) -> str:
     if n is None: return "n/a"
     if abs(n) >= 1_000_000_000: return f"{n/1_000_000_000:.1f} B"
@@ -49,15 +84,12 @@ async def lookup_ticker(company: str) -> str | None:
     query = (f"Return ONLY the primary stock-ticker symbol for the company "
              f"named '{company}'. If it is not publicly traded, reply 'PRIVATE'.")
     try:
-        resp = await octagon_client.responses.create(
-            model="octagon-stock-data-agent",
-            input=query,
-        )
-        symbol = "".join(p.text for p in resp.output[0].content).strip().upper()
+        symbol = (await octagon_call("octagon-stock-data-agent", query)).strip().upper()
         if symbol and symbol not in {"PRIVATE", "N/A"}:
             return symbol
     except Exception:
-        pass  # network / quota / etc.
+        log.warning("Ticker lookup failed for %s", company, exc_info=True)  # network / quota / etc.
+        skip_store()                                  # "not listed" would only be a guess
 
     return None
 
@@ -71,8 +103,8 @@ async def octagon_holdings(
     · Resolves a ticker, fetches Octagon 13-F holdings, and streams a
       **Key Shareholders** paragraph. Gracefully exits for private firms.
     """
-    print("=============3rd Jul: octagon_holdings agent has started=============>")
     company = str(input[-1]).strip()
+    log.debug("octagon_holdings started for %s", company)
     if not company:
         yield MessagePart(content="Please provide a company name or ticker symbol.")
         return
@@ -88,17 +120,15 @@ async def octagon_holdings(
                  f"for Q4 2024 (current) and Q3 2024 (previous). Respond in JSON.")
     rows =[]
     try:
-        resp = await octagon_client.responses.create(
-            model="octagon-holdings-agent",
-            input=oct_query,
-        )
-        raw = "".join(p.text for p in resp.output[0].content).strip()
+        raw = (await octagon_call("octagon-holdings-agent", oct_query)).strip()
         rows = json.loads(raw)
     except json.JSONDecodeError:
-        pass
+        log.warning("Octagon holdings reply for %s is not JSON", ticker)
+        skip_store()                                  # a garbled reply says nothing about the holdings
     except Exception as e:
         # Network/auth/quota issues. Log and keep `rows=[]`
-        traceback.print_exc()
+        log.exception("Octagon holdings query failed for %s", ticker)
+        skip_store()
     
     if not rows:
         yield MessagePart(
@@ -136,8 +166,7 @@ async def octagon_holdings(
         • Base every statement solely on the bullets. Avoid hype.
     """).strip()
 
-    prompt = system_guard + "\n\n### Data:\n" + "\n".join(f"• {b}" for b in bullets)
-    llm_resp = await chat_model.create(messages=[UserMessage(prompt)])
-    summary  = llm_resp.get_text_content()
+    prompt = build_prompt(system_guard, [Block("Data", bullets, keep=len(bullets))], section="octagon_holdings")
+    summary = await generate(prompt.text, section="octagon_holdings")
 
     yield MessagePart(content=summary)
@@ -0,0 +1,241 @@
+# batch.py – build company profiles for a list of companies ahead of time
+#
+#   uv run batch-profiles watchlist.txt --workers 4 --concurrency 8 --results profiles.jsonl
+#
+# The companies (one per line, a CSV with a `company` column, or a JSON array)
+# are shared out to --workers processes. Each runs its own event loop with at
+# most --concurrency profiles in flight, so upstream load is bounded by
+# workers × concurrency. Every finished company is appended (and fsync'ed) to
+# the --results journal, which is both the result store and the checkpoint:
+# a rerun skips the companies already built, and retries failed or degraded
+# ones. Profiles also land in the profile cache – CACHE_BACKEND defaults to
+# sqlite here, so a server sharing CACHE_PATH answers them without work.
+import argparse
+import asyncio
+import csv
+import json
+import logging
+import multiprocessing as mp
+import os
+import queue
+import sys
+import time
+from pathlib import Path
+from typing import Iterator
+
+BATCH_WORKERS     = int(os.getenv("BATCH_WORKERS", str(min(4, os.cpu_count() or 1))))
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "4"))        # profiles in flight per worker
+
+log = logging.getLogger("beeai_agents.batch")
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Input and journal
+# ──────────────────────────────────────────────────────────────────────────────
+def read_companies(path: Path) -> list[str]:
+    """Company names from a text file, a CSV (`company` column, else the first) or a JSON array; de-duplicated."""
+    text = sys.stdin.read() if str(path) == "-" else path.read_text(encoding="utf-8-sig")
+    if path.suffix == ".json":
+        names = [str(n) for n in json.loads(text)]
+    elif path.suffix == ".csv":
+        rows = list(csv.reader(text.splitlines()))
+        col = rows[0].index("company") if rows and "company" in rows[0] else 0
+        names = [row[col] for row in rows[1 if rows and "company" in rows[0] else 0:] if len(row) > col]
+    else:
+        names = [line for line in text.splitlines() if not line.lstrip().startswith("#")]
+    return list(dict.fromkeys(n.strip() for n in names if n.strip()))
+
+
+def read_journal(path: Path) -> Iterator[dict]:
+    """Entries of a results journal; a line torn by a crash is skipped."""
+    if not path.exists():
+        return
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(entry, dict) and "company" in entry:
+                yield entry
+
+
+class Journal:
+    """Append-only JSON Lines file; each entry is on disk before the next company is reported."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.done: set[str] = set()                      # the last entry for a company wins
+        for e in read_journal(path):
+            (self.done.add if e.get("status") == "ok" else self.done.discard)(e["company"])
+        self._fh = open(path, "a+b")
+        self._fh.seek(0, os.SEEK_END)
+        if self._fh.tell():
+            self._fh.seek(-1, os.SEEK_END)
+            if self._fh.read(1) != b"\n":                # finish a torn line so the next entry parses
+                self._fh.write(b"\n")
+
+    def append(self, entry: dict) -> None:
+        self._fh.write(json.dumps(entry, ensure_ascii=False).encode() + b"\n")
+        self._fh.flush()
+        os.fsync(self._fh.fileno())
+
+    def close(self) -> None:
+        self._fh.close()
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Worker process – one event loop, `concurrency` profiles at a time
+# ──────────────────────────────────────────────────────────────────────────────
+def _worker(tasks: "mp.Queue", results: "mp.Queue", concurrency: int, jurisdictions: str | None,
+            refresh: bool) -> None:
+    from .utils.logs import configure_logging
+    configure_logging()
+    try:
+        asyncio.run(_serve(tasks, results, concurrency, jurisdictions, refresh))
+    except KeyboardInterrupt:                            # Ctrl-C reaches the whole group; the loop has unwound
+        pass
+
+
+async def _serve(tasks: "mp.Queue", results: "mp.Queue", concurrency: int, jurisdictions: str | None,
+                 refresh: bool) -> None:
+    from .utils.offload import shutdown_executor
+    from .utils.prompts import load_tokenizer
+    from .utils.utils import close_pds_client
+    await asyncio.to_thread(load_tokenizer)              # before any prompt is counted
+    try:
+        await asyncio.gather(*(_consume(tasks, results, jurisdictions, refresh) for _ in range(concurrency)))
+    finally:
+        await close_pds_client()
+        shutdown_executor()
+
+
+async def _consume(tasks: "mp.Queue", results: "mp.Queue", jurisdictions: str | None, refresh: bool) -> None:
+    while (company := await asyncio.to_thread(tasks.get)) is not None:
+        entry = await build_profile(company, jurisdictions, refresh)
+        await asyncio.to_thread(results.put, entry)      # may block on the pipe while the parent catches up
+
+
+async def build_profile(company: str, jurisdictions: str | None = None, refresh: bool = False) -> dict:
+    """One journal entry: {"company", "status": ok | degraded | error, "seconds", "answer" | "error", "usage"}."""
+    from contextlib import nullcontext
+
+    from acp_sdk import Message, MessagePart
+
+    from .agent import company_profile
+    from .utils.cache import refresh_cache, watch_store
+    from .utils.logs import bind_request_id
+    from .utils.usage import track_usage
+    from .utils.utils import pds_jurisdictions
+
+    bind_request_id()
+    started = time.perf_counter()
+    entry: dict = {"company": company}
+    try:
+        chunks: list[str] = []
+        # a section that failed calls skip_store(): the profile is degraded, so the next run rebuilds it
+        with (track_usage() as usage, pds_jurisdictions(jurisdictions), watch_store() as outcome,
+              refresh_cache() if refresh else nullcontext()):
+            async for part in company_profile([Message(parts=[MessagePart(content=company)])], context=None):
+                if isinstance(part, MessagePart):
+                    chunks.append(part.content)
+        entry.update(status="ok" if outcome.store else "degraded", answer="".join(chunks),
+                     usage=usage.to_dict()["total"])
+    except Exception as exc:
+        log.warning("profile for %r failed", company, exc_info=True)
+        entry.update(status="error", error=repr(exc))
+    entry["seconds"] = round(time.perf_counter() - started, 3)
+    return entry
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# CLI
+# ──────────────────────────────────────────────────────────────────────────────
+def run_batch(companies: list[str], journal: Journal, workers: int, concurrency: int,
+              jurisdictions: str | None = None, refresh: bool = False) -> dict[str, int]:
+    """Build every company not yet in the journal; returns counts by status (`unfinished` if workers died)."""
+    todo = [c for c in companies if c not in journal.done]
+    counts = {"skipped": len(companies) - len(todo), "ok": 0, "degraded": 0, "error": 0}
+    if not todo:
+        return counts
+    ctx = mp.get_context("spawn")                        # no inherited loops, threads or SQLite handles
+    tasks, results = ctx.Queue(), ctx.Queue()
+    workers = max(1, min(workers, -(-len(todo) // max(1, concurrency))))
+    for company in todo:
+        tasks.put(company)
+    for _ in range(workers * concurrency):
+        tasks.put(None)
+    procs = [ctx.Process(target=_worker, args=(tasks, results, concurrency, jurisdictions, refresh),
+                         name=f"batch-{i}") for i in range(workers)]    # not daemonic: may start offload pools
+    for p in procs:
+        p.start()
+
+    started, finished, grace = time.perf_counter(), 0, 30.0
+    try:
+        while finished < len(todo):
+            try:
+                entry = results.get(timeout=1.0)
+            except queue.Empty:
+                if not any(p.is_alive() for p in procs):
+                    log.error("all workers exited with %d companies unfinished", len(todo) - finished)
+                    break
+                continue
+            journal.append(entry)
+            finished += 1
+            counts[entry["status"]] += 1
+            log.info("[%d/%d] %s: %s in %.1f s (%.2f/min)", finished, len(todo), entry["company"], entry["status"],
+                     entry["seconds"], finished / (time.perf_counter() - started) * 60)
+    except KeyboardInterrupt:
+        grace = 10.0
+        raise
+    finally:
+        # workers left to unwind release their cache leases; a killed one holds them for CACHE_LOCK_TIMEOUT
+        deadline = time.monotonic() + grace
+        for p in procs:
+            p.join(timeout=max(0.0, deadline - time.monotonic()))
+            if p.is_alive():
+                p.terminate()
+    counts["unfinished"] = len(todo) - finished
+    return counts
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Build company profiles for a list of companies, resumably.")
+    parser.add_argument("companies", type=Path, help="text (one per line), .csv or .json file; - for stdin")
+    parser.add_argument("--results", type=Path, default=Path("profiles.jsonl"),
+                        help="JSON Lines results journal; rerunning resumes from it")
+    parser.add_argument("--workers", type=int, default=BATCH_WORKERS, help="worker processes (BATCH_WORKERS)")
+    parser.add_argument("--concurrency", type=int, default=BATCH_CONCURRENCY,
+                        help="profiles in flight per worker (BATCH_CONCURRENCY)")
+    parser.add_argument("--jurisdictions", help='comma-separated codes or "auto" (default PDS_JURISDICTIONS)')
+    parser.add_argument("--refresh", action="store_true", help="rebuild instead of reusing cached profiles")
+    args = parser.parse_args(argv)
+
+    # set before any worker imports the cache module; every worker (and a server on CACHE_PATH) shares the file
+    os.environ.setdefault("CACHE_BACKEND", "sqlite")
+    from .utils.logs import configure_logging
+    from .utils.utils import parse_jurisdictions
+    configure_logging()
+    try:
+        parse_jurisdictions(args.jurisdictions)          # fail here, not once per company in the workers
+    except ValueError as exc:
+        parser.error(str(exc))
+
+    companies = read_companies(args.companies)
+    journal = Journal(args.results)
+    started = time.perf_counter()
+    try:
+        counts = run_batch(companies, journal, args.workers, args.concurrency, args.jurisdictions, args.refresh)
+    except KeyboardInterrupt:
+        log.warning("interrupted; rerun the same command to resume from %s", args.results)
+        sys.exit(130)
+    finally:
+        journal.close()
+    print(f"{len(companies)} companies in {time.perf_counter() - started:.1f} s: "
+          + ", ".join(f"{n} {status}" for status, n in counts.items() if n), file=sys.stderr)
+    if counts.get("error") or counts.get("degraded") or counts.get("unfinished"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+# batching.py – opt-in micro-batching of chat-model calls
+#
+#   LLM_BATCH=1  → generate() hands its prompt to a per-loop MicroBatcher that
+#                  collects prompts for up to LLM_BATCH_WINDOW_MS (or until
+#                  LLM_BATCH_MAX are waiting) and sends them as one batch
+#
+# A batch goes through `send_batch(items) → results` (in order) when the
+# backend has a multi-prompt call. The chat backends this service uses
+# (beeai_framework over litellm: watsonx chat, OpenAI-compatible endpoints)
+# have none, so generate() passes `send_one` instead: the batch's calls are
+# dispatched together, at most LLM_BATCH_CONCURRENCY at a time across all
+# batches of the batcher, and each waiting section is answered as soon as its
+# own call returns. Each call runs in its submitter's context (request id,
+# span parent, usage ledger), never in that of whoever filled the batch.
+import asyncio
+import contextvars
+import os
+import time
+import weakref
+from typing import Any, Awaitable, Callable, Generic, Sequence, TypeVar
+
+from .metrics import histogram
+from .tracing import span
+
+LLM_BATCH             = os.getenv("LLM_BATCH", "0") == "1"
+LLM_BATCH_WINDOW_MS   = float(os.getenv("LLM_BATCH_WINDOW_MS", "5"))
+LLM_BATCH_MAX         = int(os.getenv("LLM_BATCH_MAX", "8"))
+LLM_BATCH_CONCURRENCY = int(os.getenv("LLM_BATCH_CONCURRENCY", "64"))     # calls in flight per batcher
+
+BATCH_SIZE = histogram("beeai_llm_batch_size", "Prompts per micro-batch sent to the chat model.",
+                       buckets=(1, 2, 4, 8, 16, 32, 64))
+BATCH_WAIT = histogram("beeai_llm_batch_wait_seconds", "Time a prompt waited for its micro-batch to be sent.",
+                       buckets=(0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1))
+
+In = TypeVar("In")
+Out = TypeVar("Out")
+
+
+class MicroBatcher(Generic[In, Out]):
+    """Collects submit() calls into batches of ≤ max_size, flushed after `window` seconds at the latest."""
+
+    def __init__(self, send_batch: Callable[[list[In]], Awaitable[Sequence[Out | BaseException]]] | None = None,
+                 send_one: Callable[[In], Awaitable[Out]] | None = None,
+                 window: float = LLM_BATCH_WINDOW_MS / 1000, max_size: int = LLM_BATCH_MAX,
+                 concurrency: int = LLM_BATCH_CONCURRENCY, name: str = "llm"):
+        if (send_batch is None) == (send_one is None):
+            raise ValueError("pass exactly one of send_batch / send_one")
+        self.send_batch, self.send_one = send_batch, send_one
+        self.window, self.max_size, self.concurrency, self.name = window, max_size, concurrency, name
+        self._pending: list[tuple[In, asyncio.Future, float, contextvars.Context]] = []
+        self._gate = asyncio.Semaphore(max(1, concurrency))            # calls in flight, across batches
+        self._timer: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+    async def submit(self, item: In) -> Out:
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        self._pending.append((item, fut, time.perf_counter(), contextvars.copy_context()))
+        if len(self._pending) >= self.max_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        return await fut
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch = [p for p in self._pending if not p[1].cancelled()]     # callers that gave up are dropped
+        self._pending = []
+        if batch:
+            # a fresh context: the batch belongs to none of the callers (submit() or the timer) that flushed it
+            task = asyncio.get_running_loop().create_task(self._send(batch), context=contextvars.Context())
+            self._tasks.add(task)                                       # keep a reference until it is done
+            task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, batch: list[tuple[In, asyncio.Future, float, contextvars.Context]]) -> None:
+        now = time.perf_counter()
+        for _, _, queued, _ in batch:
+            BATCH_WAIT.observe(now - queued, batcher=self.name)
+        BATCH_SIZE.observe(len(batch), batcher=self.name)
+        try:
+            with span(f"{self.name}.batch", {"batch.size": len(batch)}):
+                if self.send_batch is not None:
+                    results = await self.send_batch([item for item, _, _, _ in batch])
+                    for (_, fut, _, _), result in zip(batch, results):
+                        _settle(fut, result)
+                else:
+                    await asyncio.gather(*(self._send_one(item, fut, ctx) for item, fut, _, ctx in batch))
+        except asyncio.CancelledError:
+            for _, fut, _, _ in batch:
+                fut.cancel()
+            raise
+        except Exception as exc:
+            for _, fut, _, _ in batch:
+                _settle(fut, exc)
+
+    async def _send_one(self, item: In, fut: asyncio.Future, ctx: contextvars.Context) -> None:
+        async with self._gate:
+            if fut.cancelled():
+                return
+            try:
+                result = await asyncio.get_running_loop().create_task(self.send_one(item), context=ctx)
+            except Exception as exc:
+                result = exc
+        _settle(fut, result)
+
+
+def _settle(fut: asyncio.Future, result: object) -> None:
+    if fut.done():
+        return
+    if isinstance(result, BaseException):
+        fut.set_exception(result)
+    else:
+        fut.set_result(result)
+
+
+_batchers: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, MicroBatcher]" = weakref.WeakKeyDictionary()
+
+
+def loop_batcher(send_one: Callable[[Any], Awaitable[Any]]) -> MicroBatcher:
+    """The running loop's chat-model batcher, created on first use."""
+    loop = asyncio.get_running_loop()
+    batcher = _batchers.get(loop)
+    if batcher is None:
+        batcher = _batchers[loop] = MicroBatcher(send_one=send_one)
+    return batcher
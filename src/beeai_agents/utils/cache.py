@@ -0,0 +1,328 @@
+# cache.py – TTL caches for PDS searches, LLM calls and whole profiles
+#
+#   CACHE_BACKEND=memory  → a per-process LRU only (default)
+#   CACHE_BACKEND=sqlite  → the per-process LRU in front of one SQLite file in
+#                           WAL mode (CACHE_PATH) shared by every worker
+#                           process on the host (`uvicorn --workers N`)
+#   CACHE_BACKEND=none    → no caching
+#
+# get_or_compute() is single-flight: concurrent callers for one key in a
+# process share one computation, and across processes a lease row in the
+# SQLite file lets one worker compute while the others wait for its result.
+# The file is bounded by CACHE_MAX_BYTES (expired, then least recently used
+# entries are evicted).
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Iterator, TypeVar
+
+from .metrics import counter
+from .offload import dumps, loads
+from .tracing import current_span
+
+CACHE_BACKEND      = os.getenv("CACHE_BACKEND", "memory")                # memory | sqlite | none
+CACHE_PATH         = os.getenv("CACHE_PATH", "cache.sqlite3")
+CACHE_MAX_BYTES    = int(os.getenv("CACHE_MAX_BYTES", str(256 << 20)))
+CACHE_MEMORY_ITEMS = int(os.getenv("CACHE_MEMORY_ITEMS", "256"))         # per namespace and process
+CACHE_LOCK_TIMEOUT = float(os.getenv("CACHE_LOCK_TIMEOUT", "120"))       # max wait for another worker
+
+# seconds; 0 disables a namespace
+CACHE_TTLS = {
+    "pds": float(os.getenv("CACHE_TTL_PDS", "3600")),
+    "llm": float(os.getenv("CACHE_TTL_LLM", "86400")),
+    "profile": float(os.getenv("CACHE_TTL_PROFILE", "86400")),
+}
+
+CACHE_REQUESTS = counter("beeai_cache_requests_total",
+                         "Cache lookups by namespace and result (hit, shared, coalesced, miss).")
+
+log = logging.getLogger("beeai_agents.cache")
+
+T = TypeVar("T")
+_MISS = object()
+
+
+class _Scope:
+    __slots__ = ("store",)
+
+    def __init__(self) -> None:
+        self.store = True
+
+
+_scope: ContextVar[_Scope | None] = ContextVar("cache_scope", default=None)
+_watch: ContextVar[_Scope | None] = ContextVar("cache_watch", default=None)
+_refresh: ContextVar[bool] = ContextVar("cache_refresh", default=False)
+
+
+def skip_store() -> None:
+    """
+    Don't cache what the enclosing get_or_compute() is producing (e.g. a
+    degraded answer), nor anything computed from it: the enclosing lookups
+    and callers that shared the computation are skipped too.
+    """
+    for scope in (_scope.get(), _watch.get()):
+        if scope is not None:
+            scope.store = False
+
+
+@contextmanager
+def watch_store() -> Iterator[_Scope]:
+    """`.store` turns False if anything in the block calls skip_store(), whether or not caching is on."""
+    scope = _Scope()
+    token = _watch.set(scope)
+    try:
+        yield scope
+    finally:
+        _watch.reset(token)
+
+
+@contextmanager
+def refresh_cache() -> Iterator[None]:
+    """Recompute (and re-store) everything looked up inside the block."""
+    token = _refresh.set(True)
+    try:
+        yield
+    finally:
+        _refresh.reset(token)
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Per-process LRU
+# ──────────────────────────────────────────────────────────────────────────────
+class MemoryLRU:
+    def __init__(self, max_items: int = CACHE_MEMORY_ITEMS):
+        self.max_items = max_items
+        self._items: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: str) -> Any:
+        item = self._items.get(key)
+        if item is None:
+            return _MISS
+        if item[0] < time.time():
+            del self._items[key]
+            return _MISS
+        self._items.move_to_end(key)
+        return item[1]
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        self._items[key] = (time.time() + ttl, value)
+        self._items.move_to_end(key)
+        while len(self._items) > self.max_items:
+            self._items.popitem(last=False)
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# SQLite store – one file per host, WAL so readers never block the writer
+# ──────────────────────────────────────────────────────────────────────────────
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY, value BLOB NOT NULL, expires REAL NOT NULL, size INTEGER NOT NULL, accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed);
+CREATE TABLE IF NOT EXISTS leases (key TEXT PRIMARY KEY, owner TEXT NOT NULL, expires REAL NOT NULL);
+"""
+
+
+class SQLiteStore:
+    """Blocking key → bytes store; call it from a worker thread."""
+
+    EVICT_EVERY = 64          # sets between size checks
+    TOUCH_AFTER = 60.0        # seconds before a read refreshes `accessed`
+
+    def __init__(self, path: str = CACHE_PATH, max_bytes: int = CACHE_MAX_BYTES):
+        self.path, self.max_bytes = path, max_bytes
+        self._local = threading.local()
+        self._sets = 0
+        self._conn().executescript(_SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)   # autocommit, explicit BEGIN
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> bytes | None:
+        now = time.time()
+        row = self._conn().execute("SELECT value, expires, accessed FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None or row[1] < now:
+            return None
+        if now - row[2] > self.TOUCH_AFTER:
+            self._conn().execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, key))
+        return row[0]
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        now = time.time()
+        self._conn().execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)",
+                             (key, value, now + ttl, len(value), now))
+        self._sets += 1
+        if self._sets % self.EVICT_EVERY == 0:
+            self.evict()
+
+    def evict(self) -> None:
+        conn = self._conn()
+        conn.execute("DELETE FROM entries WHERE expires < ?", (time.time(),))
+        conn.execute("DELETE FROM leases WHERE expires < ?", (time.time(),))
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        excess, victims = total - int(self.max_bytes * 0.9), []       # evict down to 90 %
+        for key, size in conn.execute("SELECT key, size FROM entries ORDER BY accessed"):
+            victims.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        conn.executemany("DELETE FROM entries WHERE key = ?", victims)
+
+    def acquire(self, key: str, owner: str, ttl: float) -> bool:
+        """Take the compute lease for `key` unless another live owner holds it."""
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT owner, expires FROM leases WHERE key = ?", (key,)).fetchone()
+            taken = row is None or row[0] == owner or row[1] <= time.time()
+            if taken:
+                conn.execute("INSERT OR REPLACE INTO leases VALUES (?, ?, ?)", (key, owner, time.time() + ttl))
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        return taken
+
+    def release(self, key: str, owner: str) -> None:
+        self._conn().execute("DELETE FROM leases WHERE key = ? AND owner = ?", (key, owner))
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Cache – one namespace (pds, llm, profile)
+# ──────────────────────────────────────────────────────────────────────────────
+class Cache:
+    def __init__(self, namespace: str, ttl: float, store: SQLiteStore | None):
+        self.namespace, self.ttl, self.store = namespace, ttl, store
+        self.memory = MemoryLRU()
+        self._inflight: dict[str, asyncio.Future] = {}
+
+    def key(self, parts: Any) -> str:
+        raw = json.dumps(parts, sort_keys=True, default=str, ensure_ascii=False).encode()
+        return f"{self.namespace}:{hashlib.sha256(raw).hexdigest()}"
+
+    def _count(self, result: str) -> None:
+        CACHE_REQUESTS.inc(namespace=self.namespace, result=result)
+        sp = current_span()
+        if sp is not None:
+            sp.set_attribute(f"cache.{self.namespace}", result)
+
+    async def get_or_compute(self, parts: Any, compute: Callable[[], Awaitable[T]]) -> T:
+        """Cached value for `parts`, else `await compute()` (stored unless skip_store() was called)."""
+        if self.ttl <= 0:
+            return await compute()
+        key = self.key(parts)
+        if not _refresh.get():
+            value = self.memory.get(key)
+            if value is not _MISS:
+                self._count("hit")
+                return value
+        flight = self._inflight.get(key)
+        if flight is not None:
+            self._count("coalesced")
+            try:
+                value, stored = await asyncio.shield(flight)
+            except asyncio.CancelledError:
+                if flight.cancelled() and not asyncio.current_task().cancelling():
+                    return await self.get_or_compute(parts, compute)      # the computing caller went away
+                raise
+            if not stored:
+                skip_store()
+            return value
+
+        flight = self._inflight[key] = asyncio.get_running_loop().create_future()
+        try:
+            value, stored = await self._load_or_compute(key, compute)
+        except asyncio.CancelledError:
+            flight.cancel()
+            raise
+        except BaseException as exc:
+            flight.set_exception(exc)
+            flight.exception()                                           # waiters re-raise; nobody else must
+            raise
+        else:
+            flight.set_result((value, stored))
+            if not stored:
+                skip_store()                                             # now in the enclosing lookup's scope
+            return value
+        finally:
+            del self._inflight[key]
+
+    async def _load_or_compute(self, key: str, compute: Callable[[], Awaitable[T]]) -> tuple[T, bool]:
+        if self.store is None:
+            self._count("miss")
+            return await self._compute(key, compute)
+
+        if not _refresh.get():
+            blob = await asyncio.to_thread(self.store.get, key)
+            if blob is not None:
+                return self._remember(key, loads(blob), "hit"), True
+        owner = uuid.uuid4().hex
+        deadline = time.monotonic() + CACHE_LOCK_TIMEOUT
+        delay = 0.05
+        while not await asyncio.to_thread(self.store.acquire, key, owner, CACHE_LOCK_TIMEOUT):
+            if time.monotonic() > deadline:
+                log.warning("cache lease for %s still held after %.0f s; computing anyway", key, CACHE_LOCK_TIMEOUT)
+                break
+            await asyncio.sleep(delay)                                   # another worker is computing it
+            delay = min(delay * 2, 1.0)
+            blob = await asyncio.to_thread(self.store.get, key)
+            if blob is not None:
+                return self._remember(key, loads(blob), "shared"), True
+        try:
+            self._count("miss")
+            return await self._compute(key, compute)
+        finally:
+            await asyncio.to_thread(self.store.release, key, owner)
+
+    async def _compute(self, key: str, compute: Callable[[], Awaitable[T]]) -> tuple[T, bool]:
+        """(value, whether it was stored)."""
+        scope = _Scope()
+        token = _scope.set(scope)
+        try:
+            value = await compute()
+        finally:
+            _scope.reset(token)
+        if scope.store:
+            self.memory.set(key, value, self.ttl)
+            if self.store is not None:
+                await asyncio.to_thread(lambda: self.store.set(key, dumps(value), self.ttl))
+        return value, scope.store
+
+    def _remember(self, key: str, value: Any, result: str) -> Any:
+        self._count(result)
+        self.memory.set(key, value, self.ttl)
+        return value
+
+
+_caches: dict[str, Cache] = {}
+_store: SQLiteStore | None = None
+_caches_lock = threading.Lock()
+
+
+def get_cache(namespace: str) -> Cache:
+    """The process-wide cache for `namespace`; its TTL is CACHE_TTLS[namespace] (0 when CACHE_BACKEND=none)."""
+    global _store
+    with _caches_lock:
+        if namespace not in _caches:
+            if CACHE_BACKEND == "sqlite" and _store is None:
+                _store = SQLiteStore()
+            ttl = CACHE_TTLS.get(namespace, 0.0) if CACHE_BACKEND != "none" else 0.0
+            _caches[namespace] = Cache(namespace, ttl, _store if CACHE_BACKEND == "sqlite" else None)
+        return _caches[namespace]
@@ -0,0 +1,315 @@
+# geo.py – address canonicalisation and proximity clustering
+#
+# Two passes turn a company's addresses into distinct sites:
+#   1. canonical key  – street / unit / city / region tokens standardised
+#                       ("1750 Tysons Blvd. Suite 1500" == "Ste 1500, 1750
+#                       Tysons Blvd"), PDS `standardcity` / `standardregion`
+#                       preferred when present; equal keys are one site
+#   2. proximity      – sites whose coordinates lie within GEO_CLUSTER_METERS
+#                       of each other (same country and ZIP) are merged when
+#                       their streets are compatible (same house number, one
+#                       street name within the other – across the whole
+#                       merged site, not just the pair), using a uniform grid so
+#                       only neighbouring cells are compared; distinct streets
+#                       geocoded to one ZIP centroid stay apart
+# NumPy vectorises the grid join when installed (the `perf` extra); the
+# pure-Python grid gives the same clusters.
+import math
+import os
+import re
+from functools import lru_cache
+from dataclasses import dataclass
+from typing import Iterable, Sequence
+
+from .records import Address
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+GEO_CLUSTER_METERS = float(os.getenv("GEO_CLUSTER_METERS", "30"))
+
+EARTH_RADIUS_M = 6_371_000.0
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Canonical tokens
+# ──────────────────────────────────────────────────────────────────────────────
+STREET_SUFFIXES = {
+    "STREET": "ST", "STR": "ST", "AVENUE": "AVE", "AV": "AVE", "BOULEVARD": "BLVD", "BOUL": "BLVD",
+    "ROAD": "RD", "DRIVE": "DR", "LANE": "LN", "COURT": "CT", "PLACE": "PL", "PARKWAY": "PKWY",
+    "HIGHWAY": "HWY", "SQUARE": "SQ", "TERRACE": "TER", "CIRCLE": "CIR", "PLAZA": "PLZ", "TRAIL": "TRL",
+    "EXPRESSWAY": "EXPY", "FREEWAY": "FWY", "TURNPIKE": "TPKE", "CENTER": "CTR", "CENTRE": "CTR",
+}
+DIRECTIONS = {
+    "NORTH": "N", "SOUTH": "S", "EAST": "E", "WEST": "W",
+    "NORTHEAST": "NE", "NORTHWEST": "NW", "SOUTHEAST": "SE", "SOUTHWEST": "SW",
+}
+UNIT_DESIGNATORS = {
+    "STE": "STE", "SUITE": "STE", "UNIT": "UNIT", "APT": "APT", "APARTMENT": "APT",
+    "FL": "FL", "FLR": "FL", "FLOOR": "FL", "RM": "RM", "ROOM": "RM", "BLDG": "BLDG", "BUILDING": "BLDG",
+    "DEPT": "DEPT", "#": "STE",
+}
+CITY_WORDS = {"SAINT": "ST", "SAINTE": "STE", "FORT": "FT", "MOUNT": "MT"}
+
+US_STATES = {
+    "ALABAMA": "AL", "ALASKA": "AK", "ARIZONA": "AZ", "ARKANSAS": "AR", "CALIFORNIA": "CA", "COLORADO": "CO",
+    "CONNECTICUT": "CT", "DELAWARE": "DE", "DISTRICT OF COLUMBIA": "DC", "FLORIDA": "FL", "GEORGIA": "GA",
+    "HAWAII": "HI", "IDAHO": "ID", "ILLINOIS": "IL", "INDIANA": "IN", "IOWA": "IA", "KANSAS": "KS",
+    "KENTUCKY": "KY", "LOUISIANA": "LA", "MAINE": "ME", "MARYLAND": "MD", "MASSACHUSETTS": "MA",
+    "MICHIGAN": "MI", "MINNESOTA": "MN", "MISSISSIPPI": "MS", "MISSOURI": "MO", "MONTANA": "MT",
+    "NEBRASKA": "NE", "NEVADA": "NV", "NEW HAMPSHIRE": "NH", "NEW JERSEY": "NJ", "NEW MEXICO": "NM",
+    "NEW YORK": "NY", "NORTH CAROLINA": "NC", "NORTH DAKOTA": "ND", "OHIO": "OH", "OKLAHOMA": "OK",
+    "OREGON": "OR", "PENNSYLVANIA": "PA", "RHODE ISLAND": "RI", "SOUTH CAROLINA": "SC", "SOUTH DAKOTA": "SD",
+    "TENNESSEE": "TN", "TEXAS": "TX", "UTAH": "UT", "VERMONT": "VT", "VIRGINIA": "VA", "WASHINGTON": "WA",
+    "WEST VIRGINIA": "WV", "WISCONSIN": "WI", "WYOMING": "WY", "PUERTO RICO": "PR",
+}
+
+_STREET_WORDS = {**DIRECTIONS, **STREET_SUFFIXES}
+_TOKEN = re.compile(r"[A-Z0-9]+|#")
+
+
+def _tokens(text: str) -> list[str]:
+    return _TOKEN.findall(text.upper())
+
+
+def canonical_street(line: str) -> tuple[tuple[str, ...], tuple[str, ...]]:
+    """(street tokens, sorted unit tokens) – suffixes / directions abbreviated, units split out."""
+    street: list[str] = []
+    units: list[str] = []
+    toks = _tokens(line)
+    last = len(toks) - 1
+    i = 0
+    while i <= last:
+        tok = toks[i]
+        unit = UNIT_DESIGNATORS.get(tok)
+        if unit is not None and i < last:
+            units.append(f"{unit} {toks[i + 1]}")
+            i += 2
+            continue
+        street.append(_STREET_WORDS.get(tok, tok))
+        i += 1
+    return tuple(street), tuple(sorted(units))
+
+
+@lru_cache(maxsize=4096)
+def _city(name: str) -> str:
+    return "".join(CITY_WORDS.get(t, t) for t in _tokens(name))
+
+
+def canonical_city(addr: Address) -> str:
+    return _city(addr.standard_city or addr.city)
+
+
+def canonical_region(addr: Address) -> str:
+    region = addr.region.upper()
+    if len(region) == 2 or not (addr.standard_region or region):
+        return region
+    name = " ".join(_tokens(addr.standard_region or region))
+    return US_STATES.get(name, name) if addr.country in ("US", "") else name
+
+
+def canonical_key(addr: Address, streets: dict[str, tuple] | None = None) -> tuple:
+    """(country, region, city, street, units); `streets` memoises canonical_street per line."""
+    if streets is None:
+        street, units = canonical_street(addr.line)
+    else:
+        parsed = streets.get(addr.line)
+        if parsed is None:
+            parsed = streets[addr.line] = canonical_street(addr.line)
+        street, units = parsed
+    return addr.country, canonical_region(addr), canonical_city(addr), street, units
+
+
+def _postal5(addr: Address) -> str:
+    return addr.postal.replace(" ", "").upper()[:5]
+
+
+def compatible_streets(a: tuple[str, ...], b: tuple[str, ...]) -> bool:
+    """
+    Canonical street tokens that can name one place: house numbers (a leading
+    token with a digit) don't differ, and one street name's tokens contain the
+    other's ("1750 TYSONS" / "1750 TYSONS BLVD"). A missing street only matches
+    another missing street.
+    """
+    if a == b:
+        return True
+    num_a = a[0] if a and any(c.isdigit() for c in a[0]) else ""
+    num_b = b[0] if b and any(c.isdigit() for c in b[0]) else ""
+    if num_a and num_b and num_a != num_b:
+        return False
+    name_a, name_b = set(a[1 if num_a else 0:]), set(b[1 if num_b else 0:])
+    return bool(name_a and name_b) and (name_a <= name_b or name_b <= name_a)
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Proximity pairs – uniform grid of `radius`-sized cells, neighbours only
+# ──────────────────────────────────────────────────────────────────────────────
+# half of the 3×3 neighbourhood: every unordered pair of cells is visited once
+_HALF_NEIGHBOURS = ((0, 0), (0, 1), (1, -1), (1, 0), (1, 1))
+_CELL_SPAN = 1 << 24
+
+
+def _project(lat: float, lon: float) -> tuple[float, float]:
+    """Local equirectangular metres – accurate at the scale of a cluster radius."""
+    phi = math.radians(lat)
+    return EARTH_RADIUS_M * math.radians(lon) * math.cos(phi), EARTH_RADIUS_M * phi
+
+
+def _pairs_python(points: Sequence[tuple[float, float]], blocks: Sequence[int], radius: float) -> list[tuple[int, int]]:
+    xy = [_project(lat, lon) for lat, lon in points]
+    cells: dict[tuple[int, int], list[int]] = {}
+    for i, (x, y) in enumerate(xy):
+        cells.setdefault((math.floor(x / radius), math.floor(y / radius)), []).append(i)
+    r2 = radius * radius
+    pairs = []
+    for (cx, cy), members in cells.items():
+        for dx, dy in _HALF_NEIGHBOURS:
+            others = cells.get((cx + dx, cy + dy))
+            if not others:
+                continue
+            same = dx == 0 and dy == 0
+            for a in members:
+                xa, ya = xy[a]
+                for b in others:
+                    if (same and b <= a) or blocks[a] != blocks[b]:
+                        continue
+                    if (xy[b][0] - xa) ** 2 + (xy[b][1] - ya) ** 2 <= r2:
+                        pairs.append((a, b))
+    return pairs
+
+
+def _pairs_numpy(points: Sequence[tuple[float, float]], blocks: Sequence[int], radius: float) -> list[tuple[int, int]]:
+    pts = np.asarray(points, dtype=np.float64)
+    blk = np.asarray(blocks, dtype=np.int64)
+    phi = np.radians(pts[:, 0])
+    x = EARTH_RADIUS_M * np.radians(pts[:, 1]) * np.cos(phi)
+    y = EARTH_RADIUS_M * phi
+    key = np.floor(x / radius).astype(np.int64) * _CELL_SPAN + np.floor(y / radius).astype(np.int64)
+    order = np.argsort(key, kind="stable")
+    sorted_key = key[order]
+    n = len(key)
+    idx = np.arange(n)
+    r2 = radius * radius
+    found_i, found_j = [], []
+    for dx, dy in _HALF_NEIGHBOURS:
+        target = key + dx * _CELL_SPAN + dy
+        lo = np.searchsorted(sorted_key, target, "left")
+        hi = np.searchsorted(sorted_key, target, "right")
+        count = hi - lo
+        total = int(count.sum())
+        if not total:
+            continue
+        i = np.repeat(idx, count)
+        # positions lo[i] .. hi[i]-1 for every i, flattened
+        pos = np.arange(total) - np.repeat(np.cumsum(count) - count, count) + np.repeat(lo, count)
+        j = order[pos]
+        keep = (blk[i] == blk[j]) & ((x[i] - x[j]) ** 2 + (y[i] - y[j]) ** 2 <= r2)
+        if dx == 0 and dy == 0:
+            keep &= i < j
+        found_i.append(i[keep])
+        found_j.append(j[keep])
+    if not found_i:
+        return []
+    return list(zip(np.concatenate(found_i).tolist(), np.concatenate(found_j).tolist()))
+
+
+def proximity_pairs(points: Sequence[tuple[float, float]], blocks: Sequence[int],
+                    radius: float = GEO_CLUSTER_METERS) -> list[tuple[int, int]]:
+    """Index pairs of points within `radius` metres of each other and in the same block."""
+    if len(points) < 2 or radius <= 0:
+        return []
+    if np is not None:
+        return _pairs_numpy(points, blocks, radius)
+    return _pairs_python(points, blocks, radius)
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Clustering
+# ──────────────────────────────────────────────────────────────────────────────
+@dataclass(slots=True)
+class Site:
+    rep: Address        # address shown for the site
+    size: int           # addresses merged into it
+
+
+def _find(parent: list[int], i: int) -> int:
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+def cluster_addresses(addrs: Iterable[Address], radius: float = GEO_CLUSTER_METERS) -> list[Site]:
+    """
+    Distinct sites, in order of first appearance. The representative is the
+    first verified address of a site, else its first address.
+    """
+    groups: dict[tuple, int] = {}
+    streets: dict[str, tuple] = {}         # re-listed addresses repeat the same lines
+    reps: list[Address] = []
+    rep_streets: list[tuple[str, ...]] = []
+    sizes: list[int] = []
+    for a in addrs:
+        key = canonical_key(a, streets)
+        g = groups.setdefault(key, len(reps))
+        if g == len(reps):
+            reps.append(a)
+            rep_streets.append(key[3])
+            sizes.append(0)
+        elif a.flag == "verified" and reps[g].flag != "verified":
+            reps[g] = a
+        sizes[g] += 1
+
+    # one point per group with coordinates; identical (point, block, street) entries collapse first
+    block_ids: dict[tuple[str, str], int] = {}
+    unique: dict[tuple[float, float, int, tuple[str, ...]], int] = {}
+    owners: list[list[int]] = []
+    for g, a in enumerate(reps):
+        if a.latitude is None or a.longitude is None:
+            continue
+        block = block_ids.setdefault((a.country, _postal5(a)), len(block_ids))
+        u = unique.setdefault((round(a.latitude, 5), round(a.longitude, 5), block, rep_streets[g]), len(owners))
+        if u == len(owners):
+            owners.append([])
+        owners[u].append(g)
+
+    parent = list(range(len(reps)))
+    # distinct canonical streets per root: a merge must keep every pair within the site compatible,
+    # or "1750 Tysons Blvd" ~ "Tysons Blvd" ~ "1800 Tysons Blvd" would chain two buildings together
+    site_streets: dict[int, list[tuple[str, ...]]] = {g: [street] for g, street in enumerate(rep_streets)}
+
+    def union(a: int, b: int) -> None:
+        ra, rb = _find(parent, a), _find(parent, b)
+        if ra == rb:
+            return
+        sa, sb = site_streets[ra], site_streets[rb]
+        if not all(compatible_streets(x, y) for x in sa for y in sb):
+            return
+        root, child = min(ra, rb), max(ra, rb)      # earliest group stays the root
+        parent[child] = root
+        site_streets[root] = list(dict.fromkeys(sa + sb))
+        del site_streets[child]
+
+    for members in owners:
+        for g in members[1:]:
+            union(members[0], g)
+    points = [(lat, lon) for lat, lon, _, _ in unique]
+    blocks = [block for _, _, block, _ in unique]
+    keys = [street for _, _, _, street in unique]
+    # a shared ZIP centroid (or a near one) is no evidence on its own that two streets are one site
+    for u, v in sorted(proximity_pairs(points, blocks, radius)):   # merging is greedy: fix the order
+        if compatible_streets(keys[u], keys[v]):            # cheap pair test before the per-site one
+            union(owners[u][0], owners[v][0])
+
+    sites: dict[int, Site] = {}
+    for g, a in enumerate(reps):
+        root = _find(parent, g)
+        site = sites.get(root)
+        if site is None:
+            sites[root] = Site(a, sizes[g])
+            continue
+        site.size += sizes[g]
+        if a.flag == "verified" and site.rep.flag != "verified":
+            site.rep = a
+    return list(sites.values())
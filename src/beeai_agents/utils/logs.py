@@ -0,0 +1,106 @@
+# logs.py – queue-based, non-blocking structured logging with request ids
+import atexit
+import copy
+import json
+import logging
+import os
+import queue
+import sys
+import uuid
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener
+
+LOG_LEVEL  = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json")          # json | text
+
+_request_id: ContextVar[str | None] = ContextVar("request_id", default=None)
+_listener: QueueListener | None = None
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Correlation ids – follow the asyncio task tree via contextvars
+# ──────────────────────────────────────────────────────────────────────────────
+def current_request_id() -> str | None:
+    return _request_id.get()
+
+
+def bind_request_id(request_id: str | None = None) -> str:
+    """Attach `request_id` (or a fresh one) to every log line of this task tree."""
+    request_id = request_id or uuid.uuid4().hex
+    _request_id.set(request_id)
+    return request_id
+
+
+class _RequestIdFilter(logging.Filter):
+    # runs on the producer side, so the id is read in the caller's context
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = _request_id.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        doc = {
+            "ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S") + f".{int(record.msecs):03d}",
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        if getattr(record, "request_id", None):
+            doc["request_id"] = record.request_id
+        if getattr(record, "span", None):
+            doc["span"] = record.span
+        if record.exc_text:
+            doc["exc"] = record.exc_text
+        return json.dumps(doc, ensure_ascii=False, default=str)
+
+
+class _EnqueueHandler(QueueHandler):
+    # merge args and render tracebacks on the producer side (tracebacks are not
+    # picklable and may change), but leave the final formatting to the listener
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = _plain.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+_plain = logging.Formatter()
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Setup – call once at process start; later calls are no-ops
+# ──────────────────────────────────────────────────────────────────────────────
+def configure_logging(level: str = LOG_LEVEL, fmt: str = LOG_FORMAT) -> None:
+    """
+    Route all logging through an in-memory queue; a background thread does the
+    formatting and the (blocking) write to stdout, so the event loop never waits
+    on I/O.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    sink = logging.StreamHandler(sys.stdout)
+    if fmt == "json":
+        sink.setFormatter(JsonFormatter())
+    else:
+        sink.setFormatter(logging.Formatter(
+            "%(asctime)s %(levelname)s %(name)s [%(request_id)s] :: %(message)s"))
+
+    q: queue.SimpleQueue = queue.SimpleQueue()
+    handler = _EnqueueHandler(q)
+    handler.addFilter(_RequestIdFilter())
+
+    root = logging.getLogger()
+    for h in list(root.handlers):
+        root.removeHandler(h)
+    root.addHandler(handler)
+    root.setLevel(level)
+
+    _listener = QueueListener(q, sink, respect_handler_level=False)
+    _listener.start()
+    atexit.register(_listener.stop)
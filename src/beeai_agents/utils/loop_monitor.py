@@ -0,0 +1,95 @@
+# loop_monitor.py – opt-in event-loop lag metric and blocking-call detector
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from .metrics import counter, histogram
+
+LOOP_MONITOR            = os.getenv("LOOP_MONITOR", "0") == "1"
+LOOP_PROBE_INTERVAL     = float(os.getenv("LOOP_PROBE_INTERVAL_MS", "100")) / 1000
+LOOP_BLOCK_THRESHOLD    = float(os.getenv("LOOP_BLOCK_THRESHOLD_MS", "250")) / 1000
+
+LOOP_LAG = histogram(
+    "beeai_event_loop_lag_seconds", "Extra delay of a timer callback beyond its scheduled time.",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+LOOP_BLOCKED = counter("beeai_event_loop_blocked_total", "Callbacks that held the loop longer than the threshold.")
+
+log = logging.getLogger("beeai_agents.loop_monitor")
+
+
+class LoopMonitor:
+    """
+    A probe task sleeps `interval` seconds in a loop and records how late it
+    wakes up (the loop lag). A watchdog thread watches the probe's heartbeat;
+    when it goes stale for longer than `threshold`, some callback is blocking
+    the loop, so the watchdog grabs the loop thread's current stack and logs it.
+    """
+
+    def __init__(self, interval: float = LOOP_PROBE_INTERVAL, threshold: float = LOOP_BLOCK_THRESHOLD):
+        self.interval = interval
+        self.threshold = threshold
+        self._heartbeat = time.monotonic()
+        self._loop_thread_id: int | None = None
+        self._probe: asyncio.Task | None = None
+        self._stop = threading.Event()
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+
+    def start(self) -> None:
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._probe = asyncio.get_running_loop().create_task(self._run_probe())
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        self._stop.set()
+        if self._probe is not None:
+            self._probe.cancel()
+            try:
+                await self._probe
+            except asyncio.CancelledError:
+                pass
+
+    async def _run_probe(self) -> None:
+        while True:
+            scheduled = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            LOOP_LAG.observe(max(0.0, now - scheduled))
+            self._heartbeat = now
+
+    def _watch(self) -> None:
+        reported_for: float | None = None
+        while not self._stop.wait(self.threshold / 4):
+            beat = self._heartbeat
+            stalled = time.monotonic() - beat - self.interval
+            if stalled < self.threshold or reported_for == beat:
+                continue
+            reported_for = beat                       # one report per stall
+            LOOP_BLOCKED.inc()
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = "".join(traceback.format_stack(frame)) if frame else "<no frame>"
+            log.warning("Event loop blocked for %.0f ms (threshold %.0f ms); loop thread stack:\n%s",
+                        stalled * 1000, self.threshold * 1000, stack)
+
+
+@asynccontextmanager
+async def monitor_event_loop(enabled: bool = LOOP_MONITOR) -> AsyncIterator[LoopMonitor | None]:
+    """Run a LoopMonitor for the lifetime of the block (no-op unless enabled)."""
+    if not enabled:
+        yield None
+        return
+    monitor = LoopMonitor()
+    monitor.start()
+    log.info("Event-loop monitor on (probe %.0f ms, threshold %.0f ms)",
+             monitor.interval * 1000, monitor.threshold * 1000)
+    try:
+        yield monitor
+    finally:
+        await monitor.stop()
@@ -0,0 +1,94 @@
+# metrics.py – tiny in-process metrics registry with Prometheus text export
+import threading
+from bisect import bisect_left
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_lock = threading.Lock()
+_registry: dict[str, "Counter | Histogram"] = {}
+
+
+def _label_key(labels: dict[str, str]) -> tuple[tuple[str, str], ...]:
+    return tuple(sorted(labels.items()))
+
+
+def _fmt_labels(key: tuple[tuple[str, str], ...], extra: str = "") -> str:
+    parts = [f'{k}="{v}"' for k, v in key]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help: str):
+        self.name, self.help = name, help
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = _label_key(labels)
+        with _lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> list[str]:
+        return [f"{self.name}{_fmt_labels(k)} {v}" for k, v in self._values.items()]
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name, self.help, self.buckets = name, help, buckets
+        self._values: dict[tuple, list] = {}     # key → [bucket counts…, sum, count]
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = _label_key(labels)
+        with _lock:
+            row = self._values.setdefault(key, [0] * len(self.buckets) + [0.0, 0])
+            idx = bisect_left(self.buckets, value)
+            if idx < len(self.buckets):
+                row[idx] += 1
+            row[-2] += value
+            row[-1] += 1
+
+    def render(self) -> list[str]:
+        lines = []
+        for key, row in self._values.items():
+            cumulative = 0
+            for bound, n in zip(self.buckets, row):
+                cumulative += n
+                le = f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{_fmt_labels(key, le)} {cumulative}")
+            le = 'le="+Inf"'
+            lines.append(f"{self.name}_bucket{_fmt_labels(key, le)} {row[-1]}")
+            lines.append(f"{self.name}_sum{_fmt_labels(key)} {row[-2]}")
+            lines.append(f"{self.name}_count{_fmt_labels(key)} {row[-1]}")
+        return lines
+
+
+def counter(name: str, help: str) -> Counter:
+    """Return the registered counter `name`, creating it on first use."""
+    with _lock:
+        if name not in _registry:
+            _registry[name] = Counter(name, help)
+        return _registry[name]
+
+
+def histogram(name: str, help: str, buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+    """Return the registered histogram `name`, creating it on first use."""
+    with _lock:
+        if name not in _registry:
+            _registry[name] = Histogram(name, help, buckets)
+        return _registry[name]
+
+
+def render_prometheus() -> str:
+    """Prometheus text exposition format (v0.0.4) for every registered metric."""
+    out: list[str] = []
+    with _lock:
+        for metric in _registry.values():
+            out.append(f"# HELP {metric.name} {metric.help}")
+            out.append(f"# TYPE {metric.name} {metric.kind}")
+            out.extend(metric.render())
+    return "\n".join(out) + "\n"
@@ -0,0 +1,217 @@
+# officers.py – ranking, entity resolution and chunking of a company's officers
+#
+# Big corporates list hundreds of directors, often the same person several
+# times. Records are resolved into one Person per individual (roles merged),
+# only the OFFICERS_MAX most relevant go to the model, and lists longer than
+# OFFICERS_CHUNK are summarised chunk by chunk in parallel and the partial
+# notes merged in one short call.
+import os
+import re
+import unicodedata
+from collections import defaultdict
+from dataclasses import dataclass, field
+from difflib import SequenceMatcher
+from functools import lru_cache
+from typing import Iterable, Sequence, TypeVar
+
+from .records import Director
+
+OFFICERS_MAX   = int(os.getenv("OFFICERS_MAX", "60"))
+OFFICERS_CHUNK = int(os.getenv("OFFICERS_CHUNK", "20"))
+
+# lower is more relevant; unknown relTypes rank after the listed ones
+REL_PRIORITY = {
+    "OFFICER_OF": 0, "EXECUTIVE_OF": 0, "DIRECTED_BY": 1, "MANAGED_BY": 2,
+    "OWNED_BY": 3, "MEMBER_OF": 4, "AGENT_OF": 6,
+}
+_UNKNOWN_PRIORITY = 5
+
+# short role labels for prompts; unknown relTypes are spelled out from the code
+ROLE_LABELS = {
+    "OFFICER_OF": "officer", "EXECUTIVE_OF": "executive", "DIRECTED_BY": "director", "MANAGED_BY": "manager",
+    "OWNED_BY": "owner", "MEMBER_OF": "member", "AGENT_OF": "registered agent",
+}
+
+
+def role_label(rel_type: str) -> str:
+    return ROLE_LABELS.get(rel_type) or rel_type.replace("_", " ").lower()
+
+T = TypeVar("T")
+
+
+def rank_officers(directors: Iterable[Director]) -> list[Director]:
+    """By relType priority, then most recently seen; ties keep PDS order."""
+    ranked = sorted(directors, key=lambda d: d.last_seen, reverse=True)     # stable
+    ranked.sort(key=lambda d: REL_PRIORITY.get(d.rel_type, _UNKNOWN_PRIORITY))
+    return ranked
+
+
+def chunked(items: Sequence[T], size: int = OFFICERS_CHUNK) -> list[Sequence[T]]:
+    """Split `items` into `size`-long chunks, spread evenly (no tiny tail chunk)."""
+    if size <= 0 or len(items) <= size:
+        return [items] if items else []
+    n = -(-len(items) // size)
+    step = -(-len(items) // n)
+    return [items[i:i + step] for i in range(0, len(items), step)]
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Entity resolution – one Person per real individual
+# ──────────────────────────────────────────────────────────────────────────────
+# Records are blocked on (surname, first initial) and (first name, surname
+# initial), so a new record is only compared with people already seen in its
+# blocks – first- or surname spelling variants, swapped name order and missing
+# DOBs still meet, and the work stays linear in the number of records.
+NAME_MATCH_RATIO = float(os.getenv("OFFICER_NAME_MATCH_RATIO", "0.85"))
+SURNAME_MATCH_RATIO = 0.8        # only tried when the given names agree exactly …
+SURNAME_MIN_LEN = 6              # … and both surnames are long enough for one edit to be a typo
+
+_HONORIFICS = {"MR", "MRS", "MS", "MISS", "DR", "PROF", "SIR", "JR", "SR", "II", "III", "IV", "ESQ", "PHD", "MD"}
+_NAME_TOKEN = re.compile(r"[A-Z]+")
+
+
+def _fold(text: str) -> str:
+    """Upper case, accents stripped ("Müller" → "MULLER")."""
+    return unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode().upper()
+
+
+@lru_cache(maxsize=8192)
+def split_name(name: str) -> tuple[str, str, str]:
+    """(first, middle, last) from a free-form name; "LAST, FIRST M" is understood."""
+    folded = _fold(name)
+    if "," in folded:
+        last_part, _, rest = folded.partition(",")
+        folded = f"{rest} {last_part}"
+    toks = [t for t in _NAME_TOKEN.findall(folded) if t not in _HONORIFICS]
+    if not toks:
+        return "", "", ""
+    if len(toks) == 1:
+        return "", "", toks[0]
+    return toks[0], " ".join(toks[1:-1]), toks[-1]
+
+
+def _name_parts(d: Director) -> tuple[str, str, str]:
+    if d.first_name and d.last_name:
+        return _fold(d.first_name).strip(), _fold(d.middle_name).strip(), _fold(d.last_name).strip()
+    return split_name(d.name)
+
+
+@lru_cache(maxsize=65536)
+def _similarity(a: str, b: str) -> float:
+    return SequenceMatcher(None, a, b).ratio()
+
+
+def _given_names_match(a: str, b: str) -> bool:
+    if not a or not b:
+        return True
+    if a == b:
+        return True
+    if len(a) == 1 or len(b) == 1:                       # initial vs full name
+        return a[0] == b[0]
+    return _similarity(a, b) >= NAME_MATCH_RATIO
+
+
+def _dob_match(a: str, b: str) -> bool:
+    if not a or not b:
+        return True
+    if len(a) >= 10 and len(b) >= 10:
+        return a[:10] == b[:10]
+    return a[:4] == b[:4]
+
+
+@dataclass(slots=True)
+class Person:
+    name: str                       # best display spelling seen
+    first: str
+    middle: str
+    last: str
+    date_of_birth: str = ""
+    roles: list[str] = field(default_factory=list)
+    records: int = 0
+
+    def matches(self, first: str, middle: str, last: str, dob: str) -> bool:
+        if not _dob_match(dob, self.date_of_birth):
+            return False
+        if last == self.last:
+            same_first = _given_names_match(first, self.first)
+        elif first == self.first and first and min(len(last), len(self.last)) >= SURNAME_MIN_LEN:
+            same_first = _similarity(last, self.last) >= SURNAME_MATCH_RATIO   # surname spelling variant
+        elif first == self.last and last == self.first:  # swapped order
+            same_first = True
+        else:
+            return False
+        return same_first and _given_names_match(middle[:1], self.middle[:1])
+
+    def absorb(self, d: Director, first: str, middle: str, last: str) -> None:
+        self.records += 1
+        if first == self.last and last == self.first and last != self.last:
+            first = last                                  # swapped order: keep our given name
+        if d.rel_type and d.rel_type not in self.roles:
+            self.roles.append(d.rel_type)
+        if d.date_of_birth and len(d.date_of_birth) > len(self.date_of_birth):
+            self.date_of_birth = d.date_of_birth
+        if len(first) > len(self.first):
+            self.first = first
+        if len(middle) > len(self.middle):
+            self.middle = middle
+        if d.name and _display_rank(d.name) > _display_rank(self.name):
+            self.name = d.name
+
+
+def _display_rank(name: str) -> tuple[bool, bool, bool]:
+    """Prefer "Jane A. Doe" over "DOE, JANE" and over "J. Doe"; ties keep the earlier spelling."""
+    given = name.split()[0].rstrip(".") if name.split() else ""
+    return "," not in name, not name.isupper(), len(given) > 1
+
+
+def _block_keys(first: str, last: str) -> list[tuple[str, str]]:
+    # (first, last initial) also equals the (surname, initial) key of the same
+    # name written in swapped order
+    keys = [(last, first[:1])]
+    if len(first) > 1:
+        keys.append((first, last[:1]))
+    return keys
+
+
+def resolve_officers(directors: Iterable[Director]) -> list[Person]:
+    """Merge records of the same individual; people keep the order of their first record."""
+    people: list[Person] = []
+    # block key → DOB year ("" = unknown) → people; a dated record only meets
+    # people of its year or of unknown DOB
+    index: dict[tuple[str, str], dict[str, list[int]]] = defaultdict(lambda: defaultdict(list))
+    person_keys: list[list[tuple[str, str]]] = []
+    for d in directors:
+        first, middle, last = _name_parts(d)
+        if not last:
+            people.append(Person(d.name, "", "", "", d.date_of_birth, [d.rel_type] if d.rel_type else [], 1))
+            person_keys.append([])
+            continue
+        keys = _block_keys(first, last)
+        year = d.date_of_birth[:4]
+        match = None
+        for key in keys:
+            block = index.get(key)
+            if not block:
+                continue
+            buckets = (block.get(year, ()), block.get("", ())) if year else block.values()
+            match = next((p for bucket in buckets for p in bucket
+                          if people[p].matches(first, middle, last, d.date_of_birth)), None)
+            if match is not None:
+                break
+        if match is None:
+            match = len(people)
+            people.append(Person(d.name, first, middle, last))
+            person_keys.append(keys)
+            for key in keys:
+                index[key][year].append(match)
+        else:
+            person = people[match]
+            if year and not person.date_of_birth:         # now dated: findable under its year too
+                for key in person_keys[match]:
+                    index[key][year].append(match)
+            if len(first) > 1 and len(person.first) == 1:  # initial → full given name: one more block
+                key = (first, last[:1])
+                person_keys[match].append(key)
+                index[key][person.date_of_birth[:4] or year].append(match)
+        people[match].absorb(d, first, middle, last)
+    return people
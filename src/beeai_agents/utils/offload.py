@@ -0,0 +1,97 @@
+# offload.py – run CPU-heavy decoding / post-processing off the event loop
+#
+#   OFFLOAD_EXECUTOR=auto     → each job on the pool its caller prefers (default)
+#   OFFLOAD_EXECUTOR=thread   → every job on a shared ThreadPoolExecutor
+#   OFFLOAD_EXECUTOR=process  → every job on a ProcessPoolExecutor ("spawn");
+#                               the work and its inputs / results must pickle
+#   OFFLOAD_EXECUTOR=none     → always run inline (historical behaviour)
+#
+# Pure-Python post-processing prefers threads: it drops the GIL every switch
+# interval, so the loop keeps running, and nothing is pickled. A single C-level
+# decode (json / orjson) holds the GIL throughout, so it only leaves the loop
+# in another process – worth it when the result sent back is small (projected).
+# Small jobs stay inline: a hop to an executor costs more than it saves.
+import asyncio
+import functools
+import json
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+
+from .metrics import histogram
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+OFFLOAD_EXECUTOR  = os.getenv("OFFLOAD_EXECUTOR", "auto")              # auto | thread | process | none
+OFFLOAD_WORKERS   = int(os.getenv("OFFLOAD_WORKERS", str(min(4, os.cpu_count() or 1))))
+OFFLOAD_MIN_BYTES = int(os.getenv("OFFLOAD_MIN_BYTES", str(1 << 20)))   # payloads to decode
+OFFLOAD_MIN_ITEMS = int(os.getenv("OFFLOAD_MIN_ITEMS", "2000"))         # rows to post-process
+
+OFFLOAD_SECONDS = histogram("beeai_offload_seconds", "Wall time of jobs run on the offload executor.")
+
+T = TypeVar("T")
+
+# ──────────────────────────────────────────────────────────────────────────────
+# JSON – orjson when installed (the `perf` extra), stdlib otherwise
+# ──────────────────────────────────────────────────────────────────────────────
+if orjson is not None:
+    JSON_DECODER = "orjson"
+    loads: Callable[[bytes | str], Any] = orjson.loads
+    dumps: Callable[[Any], bytes] = orjson.dumps
+else:
+    JSON_DECODER = "json"
+    loads = json.loads
+
+    def dumps(obj: Any) -> bytes:
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Executor – created on first use, shut down from the app lifespans
+# ──────────────────────────────────────────────────────────────────────────────
+_lock = threading.Lock()
+_executors: dict[str, Executor] = {}
+
+
+def get_executor(prefer: str = "thread") -> Executor | None:
+    kind = prefer if OFFLOAD_EXECUTOR == "auto" else OFFLOAD_EXECUTOR
+    if kind == "none":
+        return None
+    with _lock:
+        if kind not in _executors:
+            if kind == "process":
+                _executors[kind] = ProcessPoolExecutor(OFFLOAD_WORKERS,
+                                                       mp_context=multiprocessing.get_context("spawn"))
+            else:
+                _executors[kind] = ThreadPoolExecutor(OFFLOAD_WORKERS, thread_name_prefix="offload")
+        return _executors[kind]
+
+
+def shutdown_executor() -> None:
+    with _lock:
+        executors = list(_executors.values())
+        _executors.clear()
+    for executor in executors:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def run_cpu(fn: Callable[..., T], *args: Any, heavy: bool = True, prefer: str = "thread") -> T:
+    """
+    `fn(*args)` on an offload executor when `heavy`, inline otherwise.
+    Callers decide `heavy` from OFFLOAD_MIN_BYTES / OFFLOAD_MIN_ITEMS and
+    `prefer` ("thread" | "process") from the shape of the work.
+    """
+    executor = get_executor(prefer) if heavy else None
+    if executor is None:
+        return fn(*args)
+    started = time.perf_counter()
+    try:
+        return await asyncio.get_running_loop().run_in_executor(executor, functools.partial(fn, *args))
+    finally:
+        OFFLOAD_SECONDS.observe(time.perf_counter() - started, fn=getattr(fn, "__name__", "fn"))
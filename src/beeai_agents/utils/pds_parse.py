@@ -0,0 +1,200 @@
+# pds_parse.py – streaming, field-projected parsing of PDS search responses
+#
+# A search response is a large JSON document whose `result` array holds every
+# hit; the sections only read a handful of fields from the first Company hit.
+# In "stream" mode the body is fed chunk by chunk into an incremental parser
+# that materialises only those fields and stops reading as soon as the first
+# Company result is complete. Stopping early costs the pooled connection
+# (httpx closes a response that was not read to the end), so a tail of at
+# most PDS_DRAIN_BYTES on the wire is read off instead to keep it reusable.
+import os
+from sys import intern
+from typing import Any, Iterable
+
+import httpx
+
+from .offload import OFFLOAD_MIN_BYTES, loads, run_cpu
+
+try:
+    import ijson
+except ImportError:  # pragma: no cover - optional dependency
+    ijson = None
+
+PDS_PARSE_MODE  = os.getenv("PDS_PARSE_MODE", "stream")     # stream | full
+PDS_DRAIN_BYTES = int(os.getenv("PDS_DRAIN_BYTES", str(64 << 10)))   # unread tail worth reading to reuse the connection
+
+KEEP = None   # spec value: keep the whole subtree
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Projection – what the sections actually read
+# ──────────────────────────────────────────────────────────────────────────────
+ADDRESS_FIELDS = {
+    "addressLine", "Address_Line", "city", "City", "region", "State", "postal", "Zip",
+    "country", "Country", "country_alpha3", "suppress", "type", "flag", "uuid",
+    "standardcity", "standardregion", "latitude", "longitude", "Latitude", "Longitude",
+    "Street_Number", "Street_Name", "Unit_Type", "Unit_Number",
+}
+DIRECTOR_FIELDS = {
+    "kind", "uuid", "name", "firstName", "middleName", "lastName", "dateOfBirth", "relType",
+}
+PRIMARY_NAME_FIELDS = {"fullName", "firstName", "middleName", "lastName", "dateFirstSeen", "dateLastSeen"}
+IDENTIFIER_FIELDS = {"name", "authority", "idKey", "type"}
+
+COMPANY_SPEC: dict[str, Any] = {
+    "kind": KEEP, "id": KEEP, "uuid": KEEP, "name": KEEP,
+    "corporationType": KEEP, "statusDetail": KEEP, "established": KEEP,
+    "addresses": [dict.fromkeys(ADDRESS_FIELDS, KEEP)],
+    "directors": [{**dict.fromkeys(DIRECTOR_FIELDS, KEEP),
+                   "primaryName": dict.fromkeys(PRIMARY_NAME_FIELDS, KEEP)}],
+    "identifiers": [dict.fromkeys(IDENTIFIER_FIELDS, KEEP)],
+}
+SEARCH_SPEC: dict[str, Any] = {"result": [COMPANY_SPEC]}
+
+
+def project(value: Any, spec: Any) -> Any:
+    """Apply a projection spec to an already-decoded value."""
+    if spec is KEEP:
+        return value
+    if isinstance(spec, list):
+        return [project(v, spec[0]) for v in value] if isinstance(value, list) else value
+    if isinstance(value, dict):
+        return {k: project(v, spec[k]) for k, v in value.items() if k in spec}
+    return value
+
+
+def project_search(data: dict) -> dict:
+    """Non-streaming equivalent of the stream parser: first Company hit, projected."""
+    rec = next((r for r in data.get("result", []) if r.get("kind") == "Company"), None)
+    return {"result": [project(rec, COMPANY_SPEC)] if rec else []}
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Event sink – builds only the projected fields from ijson basic_parse events
+# ──────────────────────────────────────────────────────────────────────────────
+_SKIP = object()
+_DEPTH = {"start_map": 1, "start_array": 1, "end_map": -1, "end_array": -1}
+
+
+class _Projector:
+    def __init__(self, spec: Any):
+        self.root_spec = spec
+        self.root: Any = None
+        self.stack: list[list] = []        # [container, spec, pending map key]
+        self.skip = 0                      # depth inside an unwanted subtree
+        self.company: dict | None = None
+
+    def _child_spec(self) -> Any:
+        if not self.stack:
+            return self.root_spec
+        container, spec, key = self.stack[-1]
+        if spec is KEEP:
+            return KEEP
+        if isinstance(container, list):
+            return spec[0]
+        return spec.get(key, _SKIP)
+
+    def _put(self, value: Any) -> None:
+        if not self.stack:
+            self.root = value
+            return
+        container, _, key = self.stack[-1]
+        if isinstance(container, list):
+            container.append(value)
+        else:
+            container[key] = value
+
+    def send(self, item: tuple[str, Any]) -> None:
+        event, value = item
+        if self.skip:
+            self.skip += _DEPTH.get(event, 0)
+            return
+        if self.company is not None:
+            return                             # rest of the chunk after the hit
+        if event == "map_key":
+            self.stack[-1][2] = intern(value)  # share key strings like json.loads does
+            return
+        if event == "end_map" or event == "end_array":
+            container = self.stack.pop()[0]
+            # closed one `result` item → keep it only if it is the Company hit
+            if len(self.stack) == 2 and self.stack[-1][0] is self.root.get("result"):
+                if isinstance(container, dict) and container.get("kind") == "Company":
+                    self.company = container
+                else:
+                    self.stack[-1][0].pop()
+            return
+
+        spec = self._child_spec()
+        if spec is _SKIP:
+            if event == "start_map" or event == "start_array":
+                self.skip = 1
+            return
+        if event == "start_map" or event == "start_array":
+            container: Any = {} if event == "start_map" else []
+            self._put(container)
+            self.stack.append([container, spec, None])
+        else:
+            self._put(value)
+
+
+class StreamingCompanyParser:
+    """Feed raw body chunks; `feed` returns True once the Company hit is complete."""
+
+    def __init__(self):
+        self._sink = _Projector(SEARCH_SPEC)
+        self._coro = ijson.basic_parse_coro(self._sink, use_float=True)
+        self.bytes_read = 0
+
+    def feed(self, chunk: bytes) -> bool:
+        self.bytes_read += len(chunk)
+        self._coro.send(chunk)
+        return self._sink.company is not None
+
+    def result(self) -> dict:
+        if self._sink.company is None:
+            self._coro.close()                 # EOF – surfaces truncated / invalid JSON
+        company = self._sink.company
+        return {"result": [company] if company else []}
+
+
+def decode_search(body: bytes, projected: bool = True) -> dict:
+    """Whole-body decode (orjson when available), optionally projected – picklable for the offload pool."""
+    data = loads(body)
+    return project_search(data) if projected else data
+
+
+def parse_chunks(chunks: Iterable[bytes]) -> dict:
+    """Synchronous helper (benchmarks, snapshots): stream-parse an iterable of chunks."""
+    parser = StreamingCompanyParser()
+    for chunk in chunks:
+        if parser.feed(chunk):
+            break
+    return parser.result()
+
+
+async def read_search_response(resp: httpx.Response, mode: str = PDS_PARSE_MODE) -> tuple[dict, int]:
+    """
+    Decode a streamed PDS search response → (data, body bytes read).
+    "full" returns the whole document, as `resp.json()` used to.
+    """
+    if mode == "full":
+        # the whole document comes back, so it stays in this process (a thread, off the loop)
+        body = await resp.aread()
+        return await run_cpu(decode_search, body, False, heavy=len(body) >= OFFLOAD_MIN_BYTES), len(body)
+    if ijson is None:
+        # the projected result is small, so a large decode is worth a process hop
+        body = await resp.aread()
+        data = await run_cpu(decode_search, body, heavy=len(body) >= OFFLOAD_MIN_BYTES, prefer="process")
+        return data, len(body)
+
+    parser = StreamingCompanyParser()
+    chunks = resp.aiter_bytes()
+    async for chunk in chunks:
+        if parser.feed(chunk):
+            break                              # the rest of the body is not parsed …
+    # … but a short tail is still read off: a response read to the end hands its connection back to the pool,
+    # an unread one is closed (as is a chunked body of unknown length)
+    unread = int(resp.headers.get("content-length", -1)) - resp.num_bytes_downloaded
+    if 0 <= unread <= PDS_DRAIN_BYTES:                   # even 0: the iterator must see the end of the message
+        async for _ in chunks:
+            pass
+    return parser.result(), parser.bytes_read
@@ -0,0 +1,150 @@
+# profiling.py – guarded, rate-limited profiling of a single request
+import cProfile
+import hmac
+import io
+import os
+import pstats
+import re
+import threading
+import time
+from collections import deque
+from pathlib import Path
+
+from .tracing import Span
+
+PROFILE_TOKEN        = os.getenv("PROFILE_TOKEN")                 # unset → profiling disabled
+PROFILE_DIR          = Path(os.getenv("PROFILE_DIR", "profiles"))
+PROFILE_MAX_PER_HOUR = int(os.getenv("PROFILE_MAX_PER_HOUR", "6"))
+
+try:  # sampling profiler that follows one asyncio task tree and times each await
+    from pyinstrument import Profiler as _Pyinstrument
+except ImportError:  # pragma: no cover - optional dependency
+    _Pyinstrument = None
+
+
+class ProfileRejected(Exception):
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Guard – shared secret, sliding-window rate limit, one profile at a time
+# ──────────────────────────────────────────────────────────────────────────────
+_lock = threading.Lock()
+_recent: deque[float] = deque()
+_active = False
+
+
+def _admit(token: str) -> None:
+    global _active
+    if not PROFILE_TOKEN:
+        raise ProfileRejected(404, "Profiling is not enabled on this instance")
+    if not hmac.compare_digest(token.encode(), PROFILE_TOKEN.encode()):    # str only takes ASCII
+        raise ProfileRejected(403, "Invalid profile token")
+    now = time.monotonic()
+    with _lock:
+        while _recent and now - _recent[0] > 3600:
+            _recent.popleft()
+        if _active:
+            raise ProfileRejected(429, "Another request is being profiled")
+        if len(_recent) >= PROFILE_MAX_PER_HOUR:
+            raise ProfileRejected(429, "Profile rate limit reached")
+        _recent.append(now)
+        _active = True
+
+
+def _release() -> None:
+    global _active
+    with _lock:
+        _active = False
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Session
+# ──────────────────────────────────────────────────────────────────────────────
+class ProfileSession:
+    """
+    Profiles the awaiting task (and the tasks it spawns). With pyinstrument
+    installed, time spent in each `await` is attributed to the awaiting frame;
+    otherwise cProfile is used, which sees the whole thread.
+    """
+
+    def __init__(self, label: str, output: str):
+        self.label = re.sub(r"[^A-Za-z0-9_-]+", "_", label)[:80]
+        self.output = output
+        self.engine = "pyinstrument" if _Pyinstrument else "cprofile"
+        self._profiler = _Pyinstrument(async_mode="enabled") if _Pyinstrument else cProfile.Profile()
+        self._started = 0.0
+
+    def __enter__(self) -> "ProfileSession":
+        self._started = time.perf_counter()
+        if self.engine == "pyinstrument":
+            self._profiler.start()
+        else:
+            self._profiler.enable()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        try:
+            if self.engine == "pyinstrument":
+                self._profiler.stop()
+            else:
+                self._profiler.disable()
+        finally:
+            self.wall_ms = (time.perf_counter() - self._started) * 1000
+            _release()
+
+    def _text(self) -> str:
+        if self.engine == "pyinstrument":
+            return self._profiler.output_text(unicode=True, show_all=False)
+        buf = io.StringIO()
+        pstats.Stats(self._profiler, stream=buf).sort_stats("cumulative").print_stats(60)
+        return buf.getvalue()
+
+    def report(self, spans: list[Span]) -> dict:
+        """Inline report, or a pointer to the files written under PROFILE_DIR."""
+        timeline = sorted(
+            ({"name": s.name, "start_ms": s.start_ns / 1e6, "duration_ms": round(s.duration_ms, 2),
+              **{k: v for k, v in s.attributes.items() if k in ("section", "llm.model", "octagon.model")}}
+             for s in spans),
+            key=lambda row: row["start_ms"],
+        )
+        t0 = timeline[0]["start_ms"] if timeline else 0
+        for row in timeline:
+            row["start_ms"] = round(row["start_ms"] - t0, 2)
+
+        result = {"engine": self.engine, "wall_ms": round(self.wall_ms, 2), "awaits": timeline}
+        if self.output == "inline":
+            result["report"] = self._text()
+            return result
+
+        PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+        stem = PROFILE_DIR / f"{time.strftime('%Y%m%dT%H%M%S')}-{self.label}"
+        if self.engine == "pyinstrument":
+            path = stem.with_suffix(".html")
+            path.write_text(self._profiler.output_html(), encoding="utf-8")
+        else:
+            path = stem.with_suffix(".prof")
+            self._profiler.dump_stats(path)
+        stem.with_suffix(".txt").write_text(self._text(), encoding="utf-8")
+        result["path"] = str(path)
+        return result
+
+
+def start_profile(token: str | None, label: str, output: str = "file") -> ProfileSession | None:
+    """
+    Return a ProfileSession when the caller asked for one (`token` given) and is
+    allowed to have it; raise ProfileRejected otherwise.
+    """
+    if not token:
+        return None
+    if output not in ("file", "inline"):
+        raise ProfileRejected(400, "profile_output must be 'file' or 'inline'")
+    _admit(token)
+    try:
+        return ProfileSession(label, output)
+    except Exception:
+        _release()
+        raise
@@ -0,0 +1,170 @@
+# prompts.py – token-budgeted section prompts
+#
+# Input tokens drive most of the watsonx latency and cost. A section prompt is
+# built from short fixed instructions plus data blocks whose lines are already
+# compact and most-relevant first; the whole prompt is counted with a tokenizer
+# and, when it exceeds the section's budget, the least important blocks lose
+# their tail lines (replaced by a one-line count) until it fits. Loading the
+# tokenizer can download its vocabulary, so it only happens in load_tokenizer()
+# (warm-up, off the loop); until then tokens are counted as characters / 4.
+import logging
+import math
+import os
+import threading
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Callable, Sequence
+
+from .metrics import histogram
+from .tracing import current_span
+
+log = logging.getLogger("prompts")
+
+# tokenizer.json path or Hugging Face hub id (needs the `tokenizers` package),
+# e.g. ibm-granite/granite-3.0-8b-instruct; otherwise tiktoken's cl100k_base,
+# otherwise ~CHARS_PER_TOKEN characters per token
+PROMPT_TOKENIZER = os.getenv("PROMPT_TOKENIZER", "")
+CHARS_PER_TOKEN = 4.0
+
+PROMPT_BUDGET_DEFAULT = int(os.getenv("PROMPT_BUDGET_DEFAULT", "1500"))
+_DEFAULT_BUDGETS = {"key_officers": 1200, "key_addresses": 400, "octagon_holdings": 400}
+
+PROMPT_TOKENS = histogram(
+    "beeai_prompt_tokens", "Prompt size in tokens by section, before (untrimmed) and after budgeting (sent).",
+    buckets=(100, 250, 500, 1000, 2000, 4000, 8000, 16000, 32000),
+)
+
+
+def _parse_budgets(spec: str) -> dict[str, int]:
+    """"key_officers=1200,key_addresses=400" → dict; malformed entries are ignored."""
+    out: dict[str, int] = {}
+    for item in spec.split(","):
+        name, _, value = item.partition("=")
+        if name.strip() and value.strip().isdigit():
+            out[name.strip()] = int(value)
+    return out
+
+
+PROMPT_BUDGETS = {**_DEFAULT_BUDGETS, **_parse_budgets(os.getenv("PROMPT_BUDGETS", ""))}
+
+
+def budget_for(section: str) -> int:
+    return PROMPT_BUDGETS.get(section, PROMPT_BUDGET_DEFAULT)
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Token counting
+# ──────────────────────────────────────────────────────────────────────────────
+_FALLBACK: tuple[str, Callable[[str], int] | None] = ("chars/4", None)
+_encoder: tuple[str, Callable[[str], int] | None] | None = None        # set by load_tokenizer()
+_encoder_lock = threading.Lock()
+
+
+def _load_encoder() -> tuple[str, Callable[[str], int] | None]:
+    if PROMPT_TOKENIZER:
+        try:
+            from tokenizers import Tokenizer
+            tok = (Tokenizer.from_file(PROMPT_TOKENIZER) if os.path.exists(PROMPT_TOKENIZER)
+                   else Tokenizer.from_pretrained(PROMPT_TOKENIZER))
+            return PROMPT_TOKENIZER, lambda text: len(tok.encode(text, add_special_tokens=False).ids)
+        except Exception:
+            log.warning("Tokenizer %s unavailable; falling back", PROMPT_TOKENIZER, exc_info=True)
+    try:
+        import tiktoken
+        enc = tiktoken.get_encoding("cl100k_base")
+        return "tiktoken:cl100k_base", lambda text: len(enc.encode(text, disallowed_special=()))
+    except Exception:                     # not installed, or its vocabulary can't be fetched
+        return _FALLBACK
+
+
+def load_tokenizer() -> str:
+    """Load the tokenizer count_tokens() uses; blocking (it may download a vocabulary), so run it off the loop."""
+    global _encoder
+    with _encoder_lock:
+        if _encoder is None:
+            _encoder = _load_encoder()
+            count_tokens.cache_clear()    # drop the counts made with the fallback
+    return _encoder[0]
+
+
+def tokenizer_name() -> str:
+    return (_encoder or _FALLBACK)[0]
+
+
+@lru_cache(maxsize=8192)
+def count_tokens(text: str) -> int:
+    encode = (_encoder or _FALLBACK)[1]
+    return encode(text) if encode else math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Prompt builder
+# ──────────────────────────────────────────────────────────────────────────────
+@dataclass(slots=True)
+class Block:
+    """One titled data block; `lines` are most relevant first."""
+    title: str
+    lines: Sequence[str]
+    priority: int = 0          # higher is trimmed first
+    keep: int = 1              # lines never trimmed
+    omitted: int = 0           # items already left out by the caller
+    omitted_note: str = "({n} more not shown)"
+    _kept: list[str] = field(default_factory=list, repr=False)
+    _unique: int = field(default=0, repr=False)
+
+    def render(self) -> str:
+        hidden = self.omitted + self._unique - len(self._kept)
+        body = "\n".join(self._kept + ([self.omitted_note.format(n=hidden)] if hidden else []))
+        return f"### {self.title}\n{body}" if self.title else body
+
+
+@dataclass(slots=True)
+class BuiltPrompt:
+    text: str
+    tokens: int
+    untrimmed_tokens: int
+    dropped_lines: int
+
+
+def build_prompt(instructions: str, blocks: Sequence[Block], section: str, budget: int | None = None) -> BuiltPrompt:
+    """
+    Instructions + blocks, trimmed to `budget` (default: the section's) by
+    dropping tail lines of the highest-priority-number blocks first.
+    """
+    budget = budget_for(section) if budget is None else budget
+    for b in blocks:
+        b._kept = list(dict.fromkeys(b.lines))            # exact duplicates cost tokens for nothing
+        b._unique = len(b._kept)
+    text = _join(instructions, blocks)
+    untrimmed = tokens = count_tokens(text)
+    dropped = 0
+    if tokens > budget:
+        for b in sorted(blocks, key=lambda b: -b.priority):
+            excess = tokens - budget
+            # line costs are near-additive; drop enough of the tail in one go, then recount
+            while excess > 0 and len(b._kept) > b.keep:
+                excess -= count_tokens(b._kept.pop()) + 1
+                dropped += 1
+            text = _join(instructions, blocks)
+            tokens = count_tokens(text)
+            while tokens > budget and len(b._kept) > b.keep:
+                b._kept.pop()
+                dropped += 1
+                text = _join(instructions, blocks)
+                tokens = count_tokens(text)
+            if tokens <= budget:
+                break
+        else:
+            log.warning("%s prompt is %d tokens after trimming (budget %d)", section, tokens, budget)
+
+    PROMPT_TOKENS.observe(untrimmed, section=section, stage="untrimmed")
+    PROMPT_TOKENS.observe(tokens, section=section, stage="sent")
+    sp = current_span()
+    if sp is not None:
+        sp.set_attributes({"prompt.tokens": tokens, "prompt.tokens_untrimmed": untrimmed,
+                           "prompt.budget": budget, "prompt.dropped_lines": dropped})
+    return BuiltPrompt(text, tokens, untrimmed, dropped)
+
+
+def _join(instructions: str, blocks: Sequence[Block]) -> str:
+    return "\n\n".join([instructions.strip(), *(b.render() for b in blocks)])
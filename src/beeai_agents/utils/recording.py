@@ -0,0 +1,168 @@
+# recording.py – record / replay of upstream PDS, Octagon and LLM traffic
+#
+#   UPSTREAM_MODE=record  → call the real services and save every exchange
+#   UPSTREAM_MODE=replay  → serve saved exchanges, no network, original timing
+#                           scaled by REPLAY_TIME_SCALE (0 = instant)
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import re
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import httpx
+
+UPSTREAM_MODE     = os.getenv("UPSTREAM_MODE", "live")           # live | record | replay
+RECORDINGS_DIR    = Path(os.getenv("RECORDINGS_DIR", "recordings"))
+REPLAY_TIME_SCALE = float(os.getenv("REPLAY_TIME_SCALE", "1.0"))
+
+_SECRET_NAME = re.compile(r"(authorization|api[-_]?key|token|secret|password|cookie)", re.I)
+_SECRET_VALUE = re.compile(r"(Bearer\s+)\S+|\b(sk|wbjku)_[A-Za-z0-9_\-]{8,}")
+REDACTED = "***"
+
+
+class ReplayMiss(httpx.TransportError):
+    """No recording exists for a request made in replay mode."""
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Scrubbing – secrets never reach disk, and never become part of a key
+# ──────────────────────────────────────────────────────────────────────────────
+def scrub_text(text: str) -> str:
+    return _SECRET_VALUE.sub(lambda m: (m.group(1) or "") + REDACTED, text)
+
+
+def scrub_url(url: str) -> str:
+    parts = urlsplit(url)
+    query = [(k, REDACTED if _SECRET_NAME.search(k) else v) for k, v in parse_qsl(parts.query, keep_blank_values=True)]
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+def scrub_headers(headers: httpx.Headers | dict) -> dict[str, str]:
+    return {k: (REDACTED if _SECRET_NAME.search(k) else v) for k, v in headers.items()}
+
+
+def scrub_json(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {k: (REDACTED if _SECRET_NAME.search(k) else scrub_json(v)) for k, v in value.items()}
+    if isinstance(value, list):
+        return [scrub_json(v) for v in value]
+    if isinstance(value, str):
+        return scrub_text(value)
+    return value
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Cassette store – one JSON file per distinct request
+# ──────────────────────────────────────────────────────────────────────────────
+def _path(kind: str, key: Any) -> Path:
+    digest = hashlib.sha256(json.dumps(key, sort_keys=True, default=str).encode()).hexdigest()[:32]
+    return RECORDINGS_DIR / kind / f"{digest}.json"
+
+
+def _save(kind: str, key: Any, payload: dict) -> None:
+    path = _path(kind, key)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps({"kind": kind, "key": key, **payload}, indent=1, default=str), encoding="utf-8")
+    tmp.replace(path)
+
+
+def _load(kind: str, key: Any) -> dict | None:
+    path = _path(kind, key)
+    if not path.exists():
+        return None
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+async def _replay_delay(elapsed: float) -> None:
+    if REPLAY_TIME_SCALE > 0 and elapsed > 0:
+        await asyncio.sleep(elapsed * REPLAY_TIME_SCALE)
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# HTTP – transport wrapper for httpx (PDS, and Octagon via the OpenAI client)
+# ──────────────────────────────────────────────────────────────────────────────
+class RecordReplayTransport(httpx.AsyncBaseTransport):
+    def __init__(self, kind: str, mode: str = UPSTREAM_MODE, inner: httpx.AsyncBaseTransport | None = None):
+        self.kind = kind
+        self.mode = mode
+        self.inner = inner or httpx.AsyncHTTPTransport()
+
+    @staticmethod
+    def _key(request: httpx.Request) -> dict:
+        body = request.content
+        try:
+            body_key: Any = scrub_json(json.loads(body)) if body else None
+        except ValueError:
+            body_key = hashlib.sha256(body).hexdigest()
+        return {"method": request.method, "url": scrub_url(str(request.url)), "body": body_key}
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        await request.aread()
+        key = self._key(request)
+
+        if self.mode == "replay":
+            rec = _load(self.kind, key)
+            if rec is None:
+                raise ReplayMiss(f"No {self.kind} recording for {key['method']} {key['url']}", request=request)
+            await _replay_delay(rec["elapsed"])
+            return httpx.Response(
+                rec["response"]["status"],
+                headers=rec["response"]["headers"],
+                content=base64.b64decode(rec["response"]["body_b64"]),
+                request=request,
+            )
+
+        started = time.perf_counter()
+        response = await self.inner.handle_async_request(request)
+        raw = await response.aread()            # still content-encoded; httpx decodes later
+        elapsed = time.perf_counter() - started
+        if self.mode == "record":
+            _save(self.kind, key, {
+                "elapsed": elapsed,
+                "request": {"headers": scrub_headers(request.headers)},
+                "response": {"status": response.status_code, "headers": scrub_headers(response.headers),
+                             "body_b64": base64.b64encode(raw).decode()},
+            })
+        return httpx.Response(response.status_code, headers=response.headers, content=raw,
+                              request=request, extensions=response.extensions)
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
+
+
+def upstream_transport(kind: str) -> httpx.AsyncBaseTransport | None:
+    """Transport for an httpx client talking to `kind`; None in live mode."""
+    if UPSTREAM_MODE == "live":
+        return None
+    return RecordReplayTransport(kind)
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Generic calls – for SDK clients we can't hook at the HTTP layer (chat_model)
+# ──────────────────────────────────────────────────────────────────────────────
+async def recorded(kind: str, key: Any, call: Callable[[], Awaitable[dict]]) -> dict:
+    """
+    Run `call` (which must return a JSON-serialisable dict) under the current
+    UPSTREAM_MODE, keyed by `key`.
+    """
+    if UPSTREAM_MODE == "live":
+        return await call()
+
+    key = scrub_json(key)
+    if UPSTREAM_MODE == "replay":
+        rec = _load(kind, key)
+        if rec is None:
+            raise ReplayMiss(f"No {kind} recording for key {str(key)[:120]}")
+        await _replay_delay(rec["elapsed"])
+        return rec["result"]
+
+    started = time.perf_counter()
+    result = await call()
+    _save(kind, key, {"elapsed": time.perf_counter() - started, "result": result})
+    return result
@@ -0,0 +1,172 @@
+# records.py – compact, normalised Company / Address / Director records
+#
+# PDS rows are ~60-key dicts whose fields come under several aliases
+# (`addressLine` / `Address_Line`, `city` / `City`, `name` /
+# `primaryName.fullName`, …). They are converted once, right after the search
+# response is parsed, into slotted dataclasses with the aliases resolved;
+# everything downstream (dedupe, formatting, prompts, caches) reads attributes.
+import re
+import unicodedata
+from dataclasses import dataclass
+from sys import intern
+from typing import Any
+
+from .regions import alpha2
+
+
+def _str(value: Any) -> str:
+    return value.strip() if isinstance(value, str) else ""
+
+
+def _tok(value: Any) -> str:
+    """Short, highly repeated values (country, region, relType, …) share one string."""
+    return intern(value.strip()) if isinstance(value, str) else ""
+
+
+def _float(value: Any) -> float | None:
+    try:
+        return float(value) if value not in (None, "") else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _first(d: dict, *keys: str) -> Any:
+    for k in keys:
+        v = d.get(k)
+        if v:
+            return v
+    return None
+
+
+# legal-form words dropped from the end of a company name before comparing
+_LEGAL_SUFFIXES = {
+    "LLC", "LC", "INC", "INCORPORATED", "CORP", "CORPORATION", "CO", "COMPANY", "LTD", "LIMITED", "LP", "LLP",
+    "LLLP", "PLC", "PC", "PLLC", "PA", "GMBH", "AG", "SA", "SAS", "NV", "BV", "SRL", "SPA", "PTY", "OY", "AB",
+}
+_NAME_TOKEN = re.compile(r"[A-Z0-9]+")
+
+
+def canonical_name(name: str) -> str:
+    """“OneRep, L.L.C.” → “ONEREP”: upper-case ASCII words, legal-form suffixes and a leading “The” dropped."""
+    folded = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode().upper()
+    toks = _NAME_TOKEN.findall(folded.replace(".", "").replace("&", " AND "))
+    while len(toks) > 1 and toks[-1] in _LEGAL_SUFFIXES:
+        toks.pop()
+    if len(toks) > 1 and toks[0] == "THE":
+        toks = toks[1:]
+    return " ".join(toks)
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Address
+# ──────────────────────────────────────────────────────────────────────────────
+@dataclass(slots=True)
+class Address:
+    line: str
+    city: str
+    region: str
+    postal: str
+    country: str            # alpha-2, upper case ("" if unknown)
+    pretty: str             # “Street, City, ST, ZIP” (blanks skipped)
+    suppress: bool = False
+    standard_city: str = ""
+    standard_region: str = ""
+    type: str = ""
+    flag: str = ""
+    latitude: float | None = None
+    longitude: float | None = None
+    uuid: str = ""
+
+    @classmethod
+    def from_pds(cls, a: dict) -> "Address":
+        line = _str(_first(a, "addressLine", "Address_Line"))
+        city = _str(_first(a, "city", "City"))
+        region = _tok(_first(a, "region", "State"))
+        postal = _str(_first(a, "postal", "Zip"))
+        return cls(
+            line=line, city=city, region=region, postal=postal,
+            country=_tok(alpha2(_str(_first(a, "country", "Country")))),      # "USA" / "usa" → "US"
+            pretty=", ".join(filter(None, (line, city, region, postal))),
+            suppress=bool(a.get("suppress")),
+            standard_city=_str(a.get("standardcity")),
+            standard_region=_tok(a.get("standardregion")),
+            type=_tok(a.get("type")),
+            flag=_tok(a.get("flag")),
+            latitude=_float(_first(a, "latitude", "Latitude")),
+            longitude=_float(_first(a, "longitude", "Longitude")),
+            uuid=_str(a.get("uuid")),
+        )
+
+    @property
+    def is_us(self) -> bool:
+        return self.country == "US"
+
+    @property
+    def usable(self) -> bool:
+        """Not suppressed and has a real address line."""
+        return not self.suppress and bool(self.line) and "no address line" not in self.line.lower()
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Director / officer
+# ──────────────────────────────────────────────────────────────────────────────
+@dataclass(slots=True)
+class Director:
+    name: str
+    first_name: str = ""
+    middle_name: str = ""
+    last_name: str = ""
+    date_of_birth: str = ""
+    rel_type: str = ""
+    last_seen: str = ""     # ISO date, primaryName.dateLastSeen (or dateFirstSeen)
+    kind: str = ""
+    uuid: str = ""
+
+    @classmethod
+    def from_pds(cls, d: dict) -> "Director":
+        primary = d.get("primaryName") if isinstance(d.get("primaryName"), dict) else {}
+        return cls(
+            name=_str(d.get("name") or primary.get("fullName")),
+            first_name=_str(d.get("firstName") or primary.get("firstName")),
+            middle_name=_str(d.get("middleName") or primary.get("middleName")),
+            last_name=_str(d.get("lastName") or primary.get("lastName")),
+            date_of_birth=_str(d.get("dateOfBirth")),
+            rel_type=_tok(d.get("relType")),
+            last_seen=_str(primary.get("dateLastSeen") or primary.get("dateFirstSeen")),
+            kind=_tok(d.get("kind")),
+            uuid=_str(d.get("uuid")),
+        )
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Company
+# ──────────────────────────────────────────────────────────────────────────────
+@dataclass(slots=True)
+class Company:
+    name: str
+    id: int | None = None
+    uuid: str = ""
+    corporation_type: str = ""
+    status_detail: str = ""
+    established: str = ""
+    addresses: tuple[Address, ...] = ()
+    directors: tuple[Director, ...] = ()
+
+    @classmethod
+    def from_pds(cls, rec: dict) -> "Company":
+        return cls(
+            name=_str(rec.get("name")),
+            id=rec.get("id"),
+            uuid=_str(rec.get("uuid")),
+            corporation_type=_tok(rec.get("corporationType")),
+            status_detail=_tok(rec.get("statusDetail")),
+            established=_str(rec.get("established")),
+            addresses=tuple(Address.from_pds(a) for a in rec.get("addresses") or () if a and isinstance(a, dict)),
+            directors=tuple(Director.from_pds(d) for d in rec.get("directors") or () if d and isinstance(d, dict)),
+        )
+
+    @classmethod
+    def from_search(cls, data: dict) -> "Company | None":
+        """First `Company` hit of a PDS search response, or None."""
+        rec = next((r for r in data.get("result", []) if r.get("kind") == "Company"), None)
+        return cls.from_pds(rec) if rec else None
@@ -0,0 +1,91 @@
+# regions.py – bundled ISO-3166 alpha-2 / alpha-3 → world-region index
+#
+# Replaces asking the LLM to group country codes into continents: the
+# international footprint is aggregated here and the prompt only gets the
+# per-region counts.
+from collections import Counter
+from typing import Iterable
+
+OTHER = "Other"
+
+# region → "A2:A3" pairs (ISO-3166-1; regions follow common analyst groupings)
+_TABLE = {
+    "North America": "US:USA CA:CAN BM:BMU GL:GRL PM:SPM UM:UMI",
+    "Latin America & Caribbean": (
+        "AI:AIA AG:ATG AR:ARG AW:ABW BS:BHS BB:BRB BZ:BLZ BO:BOL BQ:BES BR:BRA VG:VGB KY:CYM CL:CHL CO:COL "
+        "CR:CRI CU:CUB CW:CUW DM:DMA DO:DOM EC:ECU SV:SLV FK:FLK GF:GUF GD:GRD GP:GLP GT:GTM GY:GUY HT:HTI "
+        "HN:HND JM:JAM MQ:MTQ MX:MEX MS:MSR NI:NIC PA:PAN PY:PRY PE:PER PR:PRI BL:BLM KN:KNA LC:LCA MF:MAF "
+        "VC:VCT SX:SXM SR:SUR TT:TTO TC:TCA VI:VIR UY:URY VE:VEN GS:SGS BV:BVT"
+    ),
+    "Europe": (
+        "AX:ALA AL:ALB AD:AND AM:ARM AT:AUT AZ:AZE BY:BLR BE:BEL BA:BIH BG:BGR HR:HRV CY:CYP CZ:CZE DK:DNK "
+        "EE:EST FO:FRO FI:FIN FR:FRA GE:GEO DE:DEU GI:GIB GR:GRC GG:GGY HU:HUN IS:ISL IE:IRL IM:IMN IT:ITA "
+        "JE:JEY LV:LVA LI:LIE LT:LTU LU:LUX MT:MLT MD:MDA MC:MCO ME:MNE NL:NLD MK:MKD NO:NOR PL:POL PT:PRT "
+        "RO:ROU RU:RUS SM:SMR RS:SRB SK:SVK SI:SVN ES:ESP SJ:SJM SE:SWE CH:CHE UA:UKR GB:GBR VA:VAT"
+    ),
+    "Middle East": "AE:ARE BH:BHR IR:IRN IQ:IRQ IL:ISR JO:JOR KW:KWT LB:LBN OM:OMN PS:PSE QA:QAT SA:SAU SY:SYR "
+                   "TR:TUR YE:YEM",
+    "Africa": (
+        "DZ:DZA AO:AGO BJ:BEN BW:BWA BF:BFA BI:BDI CV:CPV CM:CMR CF:CAF TD:TCD KM:COM CG:COG CD:COD CI:CIV "
+        "DJ:DJI EG:EGY GQ:GNQ ER:ERI SZ:SWZ ET:ETH GA:GAB GM:GMB GH:GHA GN:GIN GW:GNB KE:KEN LS:LSO LR:LBR "
+        "LY:LBY MG:MDG MW:MWI ML:MLI MR:MRT MU:MUS YT:MYT MA:MAR MZ:MOZ NA:NAM NE:NER NG:NGA RE:REU RW:RWA "
+        "SH:SHN ST:STP SN:SEN SC:SYC SL:SLE SO:SOM ZA:ZAF SS:SSD SD:SDN TZ:TZA TG:TGO TN:TUN UG:UGA EH:ESH "
+        "ZM:ZMB ZW:ZWE IO:IOT"
+    ),
+    "Asia-Pacific": (
+        "AF:AFG AS:ASM AU:AUS BD:BGD BT:BTN BN:BRN KH:KHM CN:CHN CX:CXR CC:CCK CK:COK FJ:FJI PF:PYF GU:GUM "
+        "HM:HMD HK:HKG IN:IND ID:IDN JP:JPN KZ:KAZ KI:KIR KP:PRK KR:KOR KG:KGZ LA:LAO MO:MAC MY:MYS MV:MDV "
+        "MH:MHL FM:FSM MN:MNG MM:MMR NR:NRU NP:NPL NC:NCL NZ:NZL NU:NIU NF:NFK MP:MNP PK:PAK PW:PLW PG:PNG "
+        "PH:PHL PN:PCN WS:WSM SG:SGP SB:SLB LK:LKA TW:TWN TJ:TJK TH:THA TL:TLS TK:TKL TO:TON TM:TKM TV:TUV "
+        "UZ:UZB VU:VUT VN:VNM WF:WLF"
+    ),
+    "Antarctica": "AQ:ATA TF:ATF",
+}
+
+REGIONS = tuple(_TABLE)
+
+ALPHA3: dict[str, str] = {}            # alpha-2 → alpha-3
+ALPHA2: dict[str, str] = {}            # alpha-2 and alpha-3 → alpha-2
+REGION_OF: dict[str, str] = {}         # alpha-2 and alpha-3 → region
+for _region, _pairs in _TABLE.items():
+    for _pair in _pairs.split():
+        _a2, _a3 = _pair.split(":")
+        ALPHA3[_a2] = _a3
+        ALPHA2[_a2] = ALPHA2[_a3] = _a2
+        REGION_OF[_a2] = REGION_OF[_a3] = _region
+REGION_OF["UK"] = REGION_OF["GB"]       # common non-ISO spelling in source data
+ALPHA2["UK"] = "GB"
+
+
+def alpha2(code: str) -> str:
+    """The alpha-2 code for an alpha-2 / alpha-3 code (unknown codes upper-cased as they are)."""
+    code = code.strip().upper() if code else ""
+    return ALPHA2.get(code, code)
+
+
+def region_of(code: str) -> str:
+    """World region of an alpha-2 / alpha-3 country code; OTHER when unknown."""
+    return REGION_OF.get(code.strip().upper(), OTHER) if code else OTHER
+
+
+def region_counts(codes: Iterable[str]) -> dict[str, tuple[int, int]]:
+    """
+    Per-region (sites, distinct countries) for one country code per site,
+    largest region first.
+    """
+    sites: Counter[str] = Counter()
+    countries: dict[str, set[str]] = {}
+    for code in codes:
+        region = region_of(code)
+        sites[region] += 1
+        countries.setdefault(region, set()).add(alpha2(code))          # GB and GBR are one country
+    return {r: (n, len(countries[r])) for r, n in sorted(sites.items(), key=lambda kv: (-kv[1], kv[0]))}
+
+
+def footprint_summary(counts: dict[str, tuple[int, int]]) -> str:
+    """“Europe: 12 sites in 5 countries; Asia-Pacific: 1 site in 1 country” (or "None")."""
+    parts = [
+        f"{region}: {n} site{'s' if n != 1 else ''} in {c} countr{'ies' if c != 1 else 'y'}"
+        for region, (n, c) in counts.items()
+    ]
+    return "; ".join(parts) or "None"
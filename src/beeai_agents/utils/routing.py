@@ -0,0 +1,178 @@
+# routing.py – per-section chat-model routing with latency-aware fallback
+#
+#   MODEL_ROUTES="key_addresses=watsonx:ibm/granite-3-2b-instruct,octagon_holdings=…"
+#       → the model a section tries first (default: CHAT_MODEL)
+#   ROUTE_SMALL_MODEL=watsonx:ibm/granite-3-2b-instruct
+#       → sections without a route send prompts of ≤ ROUTE_SMALL_MAX_TOKENS to it
+#
+# CHAT_MODEL always ends the route as the fallback. A call that fails, or that
+# runs past ROUTE_TIMEOUT seconds while a fallback is left, moves on to the
+# next model. A model that failed ROUTE_MAX_FAILURES times in a row, or whose
+# recent latency (EWMA) is above ROUTE_SLOW_SECONDS, is skipped for
+# ROUTE_COOLDOWN seconds. Every decision is counted (beeai_model_routes_total)
+# and every attempt timed per model (beeai_llm_call_seconds). Latency is only
+# what an attempt spends inside model_call(), so cache hits leave health alone.
+import asyncio
+import logging
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Iterator, TypeVar
+
+from .metrics import counter, histogram
+from .prompts import count_tokens
+from .tracing import current_span
+
+ROUTE_SMALL_MODEL      = os.getenv("ROUTE_SMALL_MODEL", "")
+ROUTE_SMALL_MAX_TOKENS = int(os.getenv("ROUTE_SMALL_MAX_TOKENS", "400"))
+ROUTE_TIMEOUT          = float(os.getenv("ROUTE_TIMEOUT", "30"))          # seconds, only while a fallback is left
+ROUTE_SLOW_SECONDS     = float(os.getenv("ROUTE_SLOW_SECONDS", "20"))     # EWMA latency that marks a model slow
+ROUTE_MAX_FAILURES     = int(os.getenv("ROUTE_MAX_FAILURES", "3"))
+ROUTE_COOLDOWN         = float(os.getenv("ROUTE_COOLDOWN", "60"))
+EWMA_ALPHA = 0.2
+
+
+def _parse_routes(spec: str) -> dict[str, str]:
+    """"key_addresses=watsonx:ibm/granite-3-2b-instruct,…" → {section: model}."""
+    out: dict[str, str] = {}
+    for item in spec.split(","):
+        section, _, model = item.partition("=")
+        if section.strip() and model.strip():
+            out[section.strip()] = model.strip()
+    return out
+
+
+MODEL_ROUTES = _parse_routes(os.getenv("MODEL_ROUTES", ""))
+
+ROUTES = counter("beeai_model_routes_total",
+                 "Model routing decisions by section, model and reason "
+                 "(section_route, short_prompt, default, fallback_error, fallback_timeout, skipped_unhealthy).")
+CALL_SECONDS = histogram("beeai_llm_call_seconds", "Chat-model attempt duration by section, model and outcome.",
+                         buckets=(0.25, 0.5, 1, 2, 4, 8, 16, 32, 64))
+
+log = logging.getLogger("beeai_agents.routing")
+
+T = TypeVar("T")
+
+
+@dataclass(slots=True)
+class Route:
+    models: list[str]           # in order of preference; the last one is CHAT_MODEL
+    reason: str                 # section_route | short_prompt | default
+
+
+def plan_route(section: str, prompt: str, default: str) -> Route:
+    """The models to try for one call of `section`."""
+    if section in MODEL_ROUTES:
+        first, reason = MODEL_ROUTES[section], "section_route"
+    elif ROUTE_SMALL_MODEL and count_tokens(prompt) <= ROUTE_SMALL_MAX_TOKENS:
+        first, reason = ROUTE_SMALL_MODEL, "short_prompt"
+    else:
+        return Route([default], "default")
+    return Route([first, default] if first != default else [default], reason)
+
+
+def route_models(default: str) -> list[str]:
+    """Every model a route can use (for warm-up)."""
+    return list(dict.fromkeys([default, *MODEL_ROUTES.values(), *([ROUTE_SMALL_MODEL] if ROUTE_SMALL_MODEL else [])]))
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Model health – consecutive failures and recent latency, per process
+# ──────────────────────────────────────────────────────────────────────────────
+class _Health:
+    __slots__ = ("model", "ewma", "failures", "down_until")
+
+    def __init__(self, model: str) -> None:
+        self.model = model
+        self.ewma: float | None = None
+        self.failures = 0
+        self.down_until = 0.0
+
+    def available(self) -> bool:
+        return time.monotonic() >= self.down_until
+
+    def succeeded(self, seconds: float) -> None:
+        self.failures = 0
+        self.ewma = seconds if self.ewma is None else EWMA_ALPHA * seconds + (1 - EWMA_ALPHA) * self.ewma
+        if self.ewma > ROUTE_SLOW_SECONDS:
+            self._cool_down("slow")
+
+    def failed(self) -> None:
+        self.failures += 1
+        if self.failures >= ROUTE_MAX_FAILURES:
+            self._cool_down("failing")
+
+    def _cool_down(self, why: str) -> None:
+        self.down_until = time.monotonic() + ROUTE_COOLDOWN
+        self.failures, self.ewma = 0, None                   # start afresh after the cooldown
+        log.warning("model %s is %s; skipping it for %.0f s", self.model, why, ROUTE_COOLDOWN)
+
+
+_health: dict[str, _Health] = {}
+
+
+def _health_of(model: str) -> _Health:
+    h = _health.get(model)
+    if h is None:
+        h = _health[model] = _Health(model)
+    return h
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Fallback
+# ──────────────────────────────────────────────────────────────────────────────
+_model_seconds: ContextVar[list[float] | None] = ContextVar("route_model_seconds", default=None)
+
+
+@contextmanager
+def model_call() -> Iterator[None]:
+    """Wrap the part of an attempt that reaches the model; only that time counts towards its health."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = _model_seconds.get()
+        if seconds is not None:
+            seconds.append(time.perf_counter() - started)
+
+
+async def call_with_fallback(route: Route, section: str, attempt: Callable[[str], Awaitable[T]]) -> tuple[T, str]:
+    """`await attempt(model)` along the route → (result, model that answered); the last model's error propagates."""
+    reason = route.reason
+    tried: list[str] = []
+    for i, model in enumerate(route.models):
+        last = i == len(route.models) - 1
+        health = _health_of(model)
+        if not last and not health.available():
+            ROUTES.inc(section=section, model=model, reason="skipped_unhealthy")
+            reason = "skipped_unhealthy"
+            continue
+        ROUTES.inc(section=section, model=model, reason=reason)
+        tried.append(model)
+        reached: list[float] = []                           # model_call() time of this attempt
+        started, token = time.perf_counter(), _model_seconds.set(reached)
+        try:
+            result = await (attempt(model) if last else asyncio.wait_for(attempt(model), ROUTE_TIMEOUT))
+        except Exception as exc:
+            health.failed()
+            outcome = "timeout" if isinstance(exc, asyncio.TimeoutError) else "error"
+            CALL_SECONDS.observe(time.perf_counter() - started, section=section, model=model, outcome=outcome)
+            if last:
+                raise
+            log.warning("%s: %s %s; falling back", section, model,
+                        f"took over {ROUTE_TIMEOUT:.0f} s" if outcome == "timeout" else f"failed: {exc!r}")
+            reason = f"fallback_{outcome}"
+            continue
+        finally:
+            _model_seconds.reset(token)
+        if reached:                                         # not answered from the cache
+            health.succeeded(sum(reached))
+            CALL_SECONDS.observe(sum(reached), section=section, model=model, outcome="ok")
+        sp = current_span()
+        if sp is not None:
+            sp.set_attributes({"route.reason": reason, "route.model": model, "route.attempts": len(tried)})
+        return result, model
+    raise RuntimeError("empty route")                       # the last model is never skipped
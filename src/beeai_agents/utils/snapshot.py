@@ -0,0 +1,271 @@
+# snapshot.py – local indexed snapshot of PDS Company records
+#
+#   python -m beeai_agents.utils.snapshot ingest records.jsonl dump.json …
+#   SNAPSHOT_PATH=companies.sqlite3  → fetch_company_data_from_pds() answers
+#                                      from the snapshot first
+#
+# Records (rec_dump.json shape; one per file, a JSON array, a search response
+# {"result": […]} or JSON Lines) are stored projected to the fields the
+# sections read (pds_parse.COMPANY_SPEC) in one SQLite file, indexed by uuid,
+# by the canonical form of the company and alias names, and by identifier
+# value. A lookup only considers records with an address in (or written back
+# from a live search of) one of the requested jurisdictions; one younger than
+# SNAPSHOT_MAX_AGE is served without touching PDS. Misses and stale records
+# fall back to a live search, whose result is written back
+# (SNAPSHOT_WRITE_BACK).
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+from functools import partial
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from .metrics import counter
+from .offload import dumps, loads
+from .pds_parse import COMPANY_SPEC, project
+from .records import canonical_name
+from .tracing import span
+
+SNAPSHOT_PATH       = os.getenv("SNAPSHOT_PATH", "")                         # empty → no snapshot
+SNAPSHOT_MAX_AGE    = float(os.getenv("SNAPSHOT_MAX_AGE", str(7 * 86400)))   # seconds; 0 → never stale
+SNAPSHOT_WRITE_BACK = os.getenv("SNAPSHOT_WRITE_BACK", "1") == "1"
+
+SNAPSHOT_LOOKUPS = counter("beeai_snapshot_lookups_total", "Snapshot lookups by result (hit, stale, miss).")
+
+log = logging.getLogger("beeai_agents.snapshot")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS companies (
+    uuid TEXT PRIMARY KEY, id INTEGER, name TEXT NOT NULL, regions TEXT NOT NULL,
+    record BLOB NOT NULL, ingested REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS companies_id ON companies (id);
+CREATE TABLE IF NOT EXISTS names (canonical TEXT NOT NULL, uuid TEXT NOT NULL, PRIMARY KEY (canonical, uuid));
+CREATE INDEX IF NOT EXISTS names_uuid ON names (uuid);
+CREATE TABLE IF NOT EXISTS identifiers (
+    value TEXT NOT NULL, authority TEXT NOT NULL, uuid TEXT NOT NULL, PRIMARY KEY (value, uuid)
+);
+CREATE INDEX IF NOT EXISTS identifiers_uuid ON identifiers (uuid);
+"""
+
+
+def _key(rec: dict) -> str:
+    return str(rec.get("uuid") or f"id:{rec.get('id')}")
+
+
+class SnapshotStore:
+    """Blocking store; call it from a worker thread (one connection per thread)."""
+
+    def __init__(self, path: str | Path):
+        self.path = str(path)
+        self._local = threading.local()
+        self._conn().executescript(_SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    # ── writing ───────────────────────────────────────────────────────────────
+    def ingest(self, records: Iterable[dict], batch: int = 1000, now: float | None = None,
+               regions: Iterable[str] = ()) -> int:
+        """Upsert Company records, also filed under `regions` (e.g. the state searched); returns how many."""
+        regions = frozenset(regions)
+        conn, stored, pending = self._conn(), 0, []
+        for rec in records:
+            if not isinstance(rec, dict) or rec.get("kind", "Company") != "Company" or not rec.get("name"):
+                continue
+            pending.append(rec)
+            if len(pending) >= batch:
+                stored += self._write(conn, pending, now, regions)
+                pending = []
+        if pending:
+            stored += self._write(conn, pending, now, regions)
+        return stored
+
+    def _write(self, conn: sqlite3.Connection, records: list[dict], now: float | None, extra: frozenset[str]) -> int:
+        now = time.time() if now is None else now
+        rows, names, idents, renamed, reidentified = [], [], [], [], []
+        for rec in records:
+            key = _key(rec)
+            regions = extra | {str(a.get("region") or a.get("State") or "").upper() for a in rec.get("addresses") or ()
+                               if isinstance(a, dict)}
+            rows.append((key, rec.get("id"), rec["name"], " ".join(sorted(filter(None, regions))),
+                         dumps(project(rec, COMPANY_SPEC)), now))
+            aliases = [rec["name"], *(n.get("name") for n in rec.get("names") or () if isinstance(n, dict))]
+            names += [(c, key) for c in {canonical_name(a) for a in aliases if a} if c]
+            idents += [(str(i["name"]), str(i.get("authority") or ""), key) for i in rec.get("identifiers") or ()
+                       if isinstance(i, dict) and i.get("name")]
+            # a projected search hit has no alias list; keep the aliases a full record brought
+            if "names" in rec:
+                renamed.append((key,))
+            if "identifiers" in rec:
+                reidentified.append((key,))
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany("DELETE FROM names WHERE uuid = ?", renamed)
+            conn.executemany("DELETE FROM identifiers WHERE uuid = ?", reidentified)
+            conn.executemany("INSERT OR REPLACE INTO companies VALUES (?, ?, ?, ?, ?, ?)", rows)
+            conn.executemany("INSERT OR IGNORE INTO names VALUES (?, ?)", names)
+            conn.executemany("INSERT OR IGNORE INTO identifiers VALUES (?, ?, ?)", idents)
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        return len(rows)
+
+    def analyze(self) -> None:
+        """Refresh the query planner's statistics (after a bulk load)."""
+        self._conn().execute("ANALYZE")
+
+    # ── reading ───────────────────────────────────────────────────────────────
+    def find(self, company_name: str, states: Iterable[str] = ()) -> tuple[dict, float] | None:
+        """
+        (projected record, ingested at) for a company or alias name, among
+        records filed under one of `states` (any record when none are given),
+        the earliest-listed state first, then the newest. A record without
+        any region can't be placed and is never returned for states.
+        """
+        rows = self._conn().execute(
+            "SELECT c.record, c.ingested, c.regions FROM names n JOIN companies c ON c.uuid = n.uuid"
+            " WHERE n.canonical = ?", (canonical_name(company_name),)).fetchall()
+        order = {s: i for i, s in enumerate(states)}
+        if order:
+            ranked = [(min(order[r] for r in listed), -row[1], row) for row in rows
+                      if (listed := [r for r in row[2].split() if r in order])]
+        else:
+            ranked = [(0, -row[1], row) for row in rows]
+        if not ranked:
+            return None
+        record, ingested, _ = min(ranked, key=lambda r: r[:2])[2]
+        return loads(record), ingested
+
+    def by_uuid(self, uuid: str) -> dict | None:
+        row = self._conn().execute("SELECT record FROM companies WHERE uuid = ?", (uuid,)).fetchone()
+        return loads(row[0]) if row else None
+
+    def by_identifier(self, value: str) -> list[dict]:
+        rows = self._conn().execute(
+            "SELECT c.record FROM identifiers i JOIN companies c ON c.uuid = i.uuid WHERE i.value = ?", (value,))
+        return [loads(r[0]) for r in rows]
+
+    def count(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM companies").fetchone()[0]
+
+
+_store: SnapshotStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_snapshot() -> SnapshotStore | None:
+    """The SNAPSHOT_PATH store, opened on first use (None when no snapshot is configured)."""
+    global _store
+    if SNAPSHOT_PATH and _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = SnapshotStore(SNAPSHOT_PATH)
+    return _store
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Serving
+# ──────────────────────────────────────────────────────────────────────────────
+async def snapshot_search(company_name: str, states: tuple[str, ...]) -> dict | None:
+    """A search-shaped {"result": [record]} from a fresh snapshot record, else None."""
+    store = get_snapshot()
+    if store is None:
+        return None
+    with span("pds.snapshot", {"pds.company": company_name}) as sp:
+        found = await asyncio.to_thread(store.find, company_name, states)
+        if found is None:
+            result = "miss"
+        else:
+            age = time.time() - found[1]
+            sp.set_attribute("snapshot.age_s", round(age))
+            result = "stale" if SNAPSHOT_MAX_AGE and age > SNAPSHOT_MAX_AGE else "hit"
+        sp.set_attribute("snapshot.result", result)
+        SNAPSHOT_LOOKUPS.inc(result=result)
+        return {"result": [found[0]]} if result == "hit" else None
+
+
+async def snapshot_write_back(data: dict, states: tuple[str, ...]) -> None:
+    """Store the Company hit of a live search of `states` (best effort)."""
+    store = get_snapshot()
+    if store is None or not SNAPSHOT_WRITE_BACK:
+        return
+    recs = [r for r in data.get("result", []) if isinstance(r, dict) and r.get("kind") == "Company"][:1]
+    if recs:
+        try:
+            # a one-state search found it there, whatever its addresses say; a fan-out can't tell which state did
+            await asyncio.to_thread(partial(store.ingest, recs, regions=states if len(states) == 1 else ()))
+        except sqlite3.Error:
+            log.warning("snapshot write-back failed", exc_info=True)
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Ingestion CLI
+# ──────────────────────────────────────────────────────────────────────────────
+def read_records(path: Path) -> Iterator[dict]:
+    """Company records from a JSON Lines file, a JSON array, a search response or a single record."""
+    with open(path, "rb") as fh:
+        if path.suffix in {".jsonl", ".ndjson"}:
+            for line in fh:
+                if line.strip():
+                    yield from read_document(loads(line))
+        else:
+            yield from read_document(loads(fh.read()))
+
+
+def read_document(doc: object) -> Iterator[dict]:
+    if isinstance(doc, list):
+        for item in doc:
+            yield from read_document(item)
+    elif isinstance(doc, dict):
+        if isinstance(doc.get("result"), list) and "name" not in doc:
+            yield from read_document(doc["result"])
+        else:
+            yield doc
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Manage the local PDS Company snapshot.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    ingest = sub.add_parser("ingest", help="load Company records into the snapshot")
+    ingest.add_argument("files", nargs="+", type=Path)
+    ingest.add_argument("--db", default=SNAPSHOT_PATH or "companies.sqlite3", help="snapshot file (SNAPSHOT_PATH)")
+    lookup = sub.add_parser("lookup", help="print the stored record for a name, uuid or identifier")
+    lookup.add_argument("query")
+    lookup.add_argument("--db", default=SNAPSHOT_PATH or "companies.sqlite3")
+    args = parser.parse_args(argv)
+
+    store = SnapshotStore(args.db)
+    if args.command == "ingest":
+        started, total = time.perf_counter(), 0
+        for path in args.files:
+            n = store.ingest(read_records(path))
+            total += n
+            print(f"{path}: {n} companies")
+        store.analyze()
+        print(f"{total} companies ingested into {args.db} in {time.perf_counter() - started:.1f} s "
+              f"({store.count()} stored)")
+    else:
+        found = store.find(args.query)
+        hits = [found[0]] if found else ([r] if (r := store.by_uuid(args.query)) else store.by_identifier(args.query))
+        json.dump(hits, sys.stdout, indent=2, ensure_ascii=False)
+        print()
+        if not hits:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
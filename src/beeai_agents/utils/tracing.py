@@ -0,0 +1,181 @@
+# tracing.py – lightweight OpenTelemetry-compatible spans for the agent pipeline
+import json
+import logging
+import os
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from importlib import import_module
+from typing import Any, Iterator, Protocol
+
+# console | file | none | "package.module:ExporterClass"
+TRACE_EXPORTER = os.getenv("TRACE_EXPORTER", "console")
+TRACE_FILE = os.getenv("TRACE_FILE", "traces.jsonl")
+SERVICE_NAME = os.getenv("OTEL_SERVICE_NAME", "beeai-agents")
+
+_trace_log = logging.getLogger("beeai_agents.trace")
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Span – field names follow the OTLP/JSON encoding so a collector's file
+# receiver (or any OTLP tooling) can ingest the exported lines unchanged
+# ──────────────────────────────────────────────────────────────────────────────
+class Span:
+    __slots__ = ("name", "trace_id", "span_id", "parent_span_id", "start_ns", "end_ns", "attributes", "status")
+
+    def __init__(self, name: str, trace_id: str, parent_span_id: str | None, attributes: dict[str, Any]):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_span_id = parent_span_id
+        self.start_ns = time.time_ns()
+        self.end_ns: int | None = None
+        self.attributes = dict(attributes)
+        self.status = "OK"
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def set_attributes(self, attributes: dict[str, Any]) -> None:
+        self.attributes.update(attributes)
+
+    def add(self, key: str, amount: int | float = 1) -> None:
+        """Increment a numeric attribute (e.g. retry or call counters)."""
+        self.attributes[key] = self.attributes.get(key, 0) + amount
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end_ns if self.end_ns is not None else time.time_ns()
+        return (end - self.start_ns) / 1e6
+
+    def to_otlp(self) -> dict[str, Any]:
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_span_id or "",
+            "name": self.name,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns or 0),
+            "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in self.attributes.items()],
+            "status": {"code": "STATUS_CODE_ERROR" if self.status == "ERROR" else "STATUS_CODE_OK"},
+            "resource": {"service.name": SERVICE_NAME},
+        }
+
+
+def _otlp_value(value: Any) -> dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Exporters – pluggable; defaults never need a running collector
+# ──────────────────────────────────────────────────────────────────────────────
+class SpanExporter(Protocol):
+    def export(self, span: Span) -> None: ...
+
+
+class NoopSpanExporter:
+    def export(self, span: Span) -> None:
+        pass
+
+
+class ConsoleSpanExporter:
+    """One log record per finished span on the (queue-backed) `beeai_agents.trace` logger."""
+
+    def export(self, span: Span) -> None:
+        if _trace_log.isEnabledFor(logging.INFO):
+            _trace_log.info("span %s %.1f ms", span.name, span.duration_ms, extra={"span": span.to_otlp()})
+
+
+class FileSpanExporter:
+    """Append finished spans as JSON lines to `path`."""
+
+    def __init__(self, path: str = TRACE_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        line = json.dumps(span.to_otlp(), separators=(",", ":")) + "\n"
+        with self._lock, open(self.path, "a", encoding="utf-8") as fh:
+            fh.write(line)
+
+
+def _exporter_from_env(name: str) -> SpanExporter:
+    if name == "none":
+        return NoopSpanExporter()
+    if name == "file":
+        return FileSpanExporter(TRACE_FILE)
+    if name == "console":
+        return ConsoleSpanExporter()
+    module_name, _, attr = name.partition(":")
+    return getattr(import_module(module_name), attr)()
+
+
+_exporter: SpanExporter = _exporter_from_env(TRACE_EXPORTER)
+
+
+def set_exporter(exporter: SpanExporter) -> None:
+    """Swap the active exporter (e.g. from a benchmark harness)."""
+    global _exporter
+    _exporter = exporter
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Context – the active span follows the asyncio task tree via contextvars
+# ──────────────────────────────────────────────────────────────────────────────
+_current: ContextVar[Span | None] = ContextVar("current_span", default=None)
+_collected: ContextVar[list[Span] | None] = ContextVar("collected_spans", default=None)
+
+
+def current_span() -> Span | None:
+    return _current.get()
+
+
+@contextmanager
+def collect_spans() -> Iterator[list[Span]]:
+    """Additionally keep every span finished inside the block (and its tasks) in a list."""
+    spans: list[Span] = []
+    token = _collected.set(spans)
+    try:
+        yield spans
+    finally:
+        _collected.reset(token)
+
+
+@contextmanager
+def span(name: str, attributes: dict[str, Any] | None = None) -> Iterator[Span]:
+    """
+    Open a child of the current span (or a new trace root) for the duration of
+    the block. Exceptions mark the span as errored and are re-raised.
+    """
+    parent = _current.get()
+    sp = Span(
+        name,
+        trace_id=parent.trace_id if parent else secrets.token_hex(16),
+        parent_span_id=parent.span_id if parent else None,
+        attributes=attributes or {},
+    )
+    token = _current.set(sp)
+    try:
+        yield sp
+    except BaseException as exc:
+        sp.status = "ERROR"
+        sp.set_attribute("exception.type", type(exc).__name__)
+        raise
+    finally:
+        sp.end_ns = time.time_ns()
+        _current.reset(token)
+        collected = _collected.get()
+        if collected is not None:
+            collected.append(sp)
+        try:
+            _exporter.export(sp)
+        except Exception:
+            pass  # tracing must never break a request
@@ -0,0 +1,92 @@
+# usage.py – per-section / per-request token and call accounting
+import os
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from typing import Iterator
+
+from .metrics import counter
+
+# list prices – override per contract; 0 disables the cost estimate
+WATSONX_COST_PER_1K_INPUT  = float(os.getenv("WATSONX_COST_PER_1K_INPUT", "0.0002"))
+WATSONX_COST_PER_1K_OUTPUT = float(os.getenv("WATSONX_COST_PER_1K_OUTPUT", "0.0002"))
+OCTAGON_COST_PER_CALL      = float(os.getenv("OCTAGON_COST_PER_CALL", "0"))
+
+LLM_TOKENS = counter("beeai_llm_tokens_total", "LLM tokens by section, model and kind (prompt/completion).")
+LLM_CALLS = counter("beeai_llm_calls_total", "LLM calls by section and model.")
+OCTAGON_CALLS = counter("beeai_octagon_calls_total", "Octagon gateway calls by section and model.")
+COST = counter("beeai_estimated_cost_usd_total", "Estimated spend in USD by section and provider.")
+
+
+@dataclass
+class SectionUsage:
+    llm_calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    octagon_calls: int = 0
+    octagon_tokens: int = 0
+    cost_usd: float = 0.0
+
+
+@dataclass
+class UsageLedger:
+    """Everything one profile spent, keyed by section name."""
+    sections: dict[str, SectionUsage] = field(default_factory=dict)
+
+    def section(self, name: str) -> SectionUsage:
+        return self.sections.setdefault(name, SectionUsage())
+
+    def totals(self) -> SectionUsage:
+        total = SectionUsage()
+        for s in self.sections.values():
+            for k, v in asdict(s).items():
+                setattr(total, k, getattr(total, k) + v)
+        return total
+
+    def to_dict(self) -> dict:
+        return {
+            "sections": {name: asdict(s) for name, s in self.sections.items()},
+            "total": asdict(self.totals()),
+        }
+
+
+_ledger: ContextVar[UsageLedger | None] = ContextVar("usage_ledger", default=None)
+
+
+@contextmanager
+def track_usage() -> Iterator[UsageLedger]:
+    """Collect usage of every LLM / Octagon call made inside the block."""
+    ledger = UsageLedger()
+    token = _ledger.set(ledger)
+    try:
+        yield ledger
+    finally:
+        _ledger.reset(token)
+
+
+def record_llm(section: str, model: str, prompt_tokens: int, completion_tokens: int) -> None:
+    cost = (prompt_tokens * WATSONX_COST_PER_1K_INPUT + completion_tokens * WATSONX_COST_PER_1K_OUTPUT) / 1000
+    LLM_CALLS.inc(section=section, model=model)
+    LLM_TOKENS.inc(prompt_tokens, section=section, model=model, kind="prompt")
+    LLM_TOKENS.inc(completion_tokens, section=section, model=model, kind="completion")
+    COST.inc(cost, section=section, provider="watsonx")
+
+    ledger = _ledger.get()
+    if ledger is not None:
+        s = ledger.section(section)
+        s.llm_calls += 1
+        s.prompt_tokens += prompt_tokens
+        s.completion_tokens += completion_tokens
+        s.cost_usd += cost
+
+
+def record_octagon(section: str, model: str, tokens: int = 0) -> None:
+    OCTAGON_CALLS.inc(section=section, model=model)
+    COST.inc(OCTAGON_COST_PER_CALL, section=section, provider="octagon")
+
+    ledger = _ledger.get()
+    if ledger is not None:
+        s = ledger.section(section)
+        s.octagon_calls += 1
+        s.octagon_tokens += tokens
+        s.cost_usd += OCTAGON_COST_PER_CALL
@@ -1,9 +1,28 @@
-import os, httpx
+import asyncio, os, re, threading, weakref, httpx
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator, Sequence, TypeVar
 from tenacity import retry, wait_exponential, stop_after_attempt, retry_if_exception_type
 
-from beeai_framework.backend.chat import ChatModel
 from acp_sdk.server import Server
 
+if TYPE_CHECKING:
+    from beeai_framework.backend.chat import ChatModel
+
+from .tracing import span, current_span
+from .usage import record_llm
+from .recording import recorded, upstream_transport
+from .pds_parse import PDS_PARSE_MODE, read_search_response
+from .records import Address, Company, Director, canonical_name
+from .geo import US_STATES, cluster_addresses
+from .officers import Person, rank_officers, resolve_officers, role_label
+from .offload import OFFLOAD_MIN_ITEMS, run_cpu
+from .cache import get_cache, skip_store
+from .wire import accept_encoding
+from .batching import LLM_BATCH, loop_batcher
+from .routing import call_with_fallback, model_call, plan_route
+from .snapshot import snapshot_search, snapshot_write_back
+
 from dotenv import load_dotenv
 load_dotenv()
 
@@ -13,85 +32,381 @@ WATSONX_API_KEY=os.getenv("WATSONX_APIKEY")
 
 server = Server()
 
-chat_model = ChatModel.from_name("watsonx:ibm/granite-3-8b-instruct",
-                                 {
-            "project_id": WATSONX_PROJECT_ID,
-             "api_key": WATSONX_API_KEY,
-             "base_url": WATSONX_URL,
-             })
-    
+T = TypeVar("T")
+
+# any beeai "provider:model" name; non-watsonx providers read their own env
+# (e.g. openai:<model> with OPENAI_API_BASE for the benchmark fakes)
+CHAT_MODEL = os.getenv("CHAT_MODEL", "watsonx:ibm/granite-3-8b-instruct")
+
+CHAT_MODEL_ID = CHAT_MODEL.partition(":")[2] or CHAT_MODEL     # what ChatModel.model_id reports
+
+
+def model_id(name: str) -> str:
+    """"watsonx:ibm/granite-3-8b-instruct" → "ibm/granite-3-8b-instruct"."""
+    return name.partition(":")[2] or name
+
+
+# Chat backends are built on first use: importing one pulls in litellm and
+# openai (~1.5 s), which a cold instance should not pay before it can listen.
+_chat_models: "dict[str, ChatModel]" = {}
+_chat_model_lock = threading.Lock()
+
+
+def get_chat_model(name: str = CHAT_MODEL) -> "ChatModel":
+    """The shared chat model `name` (default CHAT_MODEL), constructed (imports included) on the first call."""
+    model = _chat_models.get(name)
+    if model is None:
+        with _chat_model_lock:
+            model = _chat_models.get(name)
+            if model is None:
+                from beeai_framework.backend.chat import ChatModel
+                model = _chat_models[name] = ChatModel.from_name(name,
+                                                  {
+                    "project_id": WATSONX_PROJECT_ID,
+                    "api_key": WATSONX_API_KEY,
+                    "base_url": WATSONX_URL,
+                    } if name.startswith("watsonx:") else None)
+    return model
+
+
+async def chat_model(name: str = CHAT_MODEL) -> "ChatModel":
+    """get_chat_model() without blocking the event loop on the first, importing call."""
+    return _chat_models.get(name) or await asyncio.to_thread(get_chat_model, name)
+
+
+def preload_chat_model() -> None:
+    """Start building the chat model in the background (e.g. while the server starts listening)."""
+    if CHAT_MODEL not in _chat_models:
+        threading.Thread(target=get_chat_model, name="chat-model-preload", daemon=True).start()
 
 # ──────────────────────────────────────────────────────────────────────────────
-# Helper – prettify one address dict → single-line string
+# Helper – one traced LLM call → plain text
 # ──────────────────────────────────────────────────────────────────────────────
-def format_addr(addr: dict) -> str:
+async def _complete(prompt: str, name: str = CHAT_MODEL) -> dict:
+    from beeai_framework.backend.message import UserMessage
+    model = await chat_model(name)
+    response = await model.create(messages=[UserMessage(prompt)])
+    usage = response.usage
+    return {
+        "text": response.get_text_content(),
+        "prompt_tokens": usage.prompt_tokens if usage else 0,
+        "completion_tokens": usage.completion_tokens if usage else 0,
+    }
+
+
+async def _complete_item(item: tuple[str, str]) -> dict:
+    return await _complete(*item)
+
+
+async def complete(prompt: str, name: str = CHAT_MODEL) -> dict:
+    """One call to chat model `name`, through the loop's micro-batcher when LLM_BATCH=1."""
+    if LLM_BATCH:
+        return await loop_batcher(_complete_item).submit((prompt, name))
+    return await _complete(prompt, name)
+
+
+async def generate(prompt: str, section: str) -> str:
+    """
+    Send a single user prompt to the section's routed chat model (falling back
+    to CHAT_MODEL) and return the text reply (cached per model + prompt).
+    """
+    route = plan_route(section, prompt, CHAT_MODEL)
+    cache = get_cache("llm")
+    with span("watsonx.generate", {"section": section, "llm.model": model_id(route.models[0]),
+                                   "llm.prompt_chars": len(prompt)}) as sp:
+        # each attempt is cached under its own model, so a fallback's reply is never served for the primary
+        async def attempt(name: str) -> dict:
+            async def call() -> dict:
+                with model_call():
+                    result = await recorded("llm", {"model": model_id(name), "prompt": prompt},
+                                            lambda: complete(prompt, name))
+                sp.set_attributes({
+                    "llm.prompt_tokens": result["prompt_tokens"],
+                    "llm.completion_tokens": result["completion_tokens"],
+                })
+                record_llm(section, model_id(name), result["prompt_tokens"], result["completion_tokens"])
+                return result
+
+            return await cache.get_or_compute((model_id(name), prompt), call)
+
+        result, name = await call_with_fallback(route, section, attempt)
+        sp.set_attribute("llm.model", model_id(name))
+        return result["text"]
+
+
+async def generate_map_reduce(
+    chunks: Sequence[T],
+    map_prompt: Callable[[T], str],
+    reduce_prompt: Callable[[list[str]], str],
+    section: str,
+) -> str:
+    """Summarise every chunk concurrently, then merge the partial notes in one call."""
+    with span("llm.map_reduce", {"section": section, "map.chunks": len(chunks)}):
+        partials = await asyncio.gather(*(generate(map_prompt(chunk), section) for chunk in chunks))
+        return await generate(reduce_prompt(list(partials)), section)
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Helper – prettify one address record → single-line string
+# ──────────────────────────────────────────────────────────────────────────────
+def format_addr(addr: Address) -> str:
     """Return “Street, City, ST, ZIP” (skip blanks)."""
-    # print("address inside format_addr func======>: ", addr)
-    parts = [
-        addr.get("addressLine") or addr.get("Address_Line"),
-        addr.get("city") or addr.get("City"),
-        addr.get("region") or addr.get("State"),
-        addr.get("postal") or addr.get("Zip"),
-    ]
-    return ", ".join(filter(None, parts))
+    return addr.pretty
+
+def dedupe_addresses(addrs: Iterable[Address]) -> list[Address]:
+    """
+    One representative per distinct site (canonical street / unit / city /
+    region, then coordinates within GEO_CLUSTER_METERS), first site first;
+    suppressed rows and rows without an address line are skipped.
+    """
+    return [site.rep for site in cluster_addresses(a for a in addrs if a.usable)]
 
 # ──────────────────────────────────────────────────────────────────────────────
 # NEW agent – returns a paragraph titled **Key Officers**
 # ──────────────────────────────────────────────────────────────────────────────
-def format_officer(director: dict) -> str:
+def format_officer(director: Director) -> str:
     """
     Produce a single-line representation:
-    “<full name> (first seen 2020, relType DIRECTED_BY)”   — tweak as you like
+    “<full name>, born <dob> – Directed By”
     """
-    name = (
-        director.get("name")
-        or director.get("primaryName", {}).get("fullName")
-        or "Unnamed individual"
-    )
-    dob = director.get("dateOfBirth")
-    dob_str = f", born {dob}" if dob else ""
-    rel = director.get("relType") or ""
-    return f"{name}{dob_str} – {rel.replace('_', ' ').title()}"
+    name = director.name or "Unnamed individual"
+    dob_str = f", born {director.date_of_birth}" if director.date_of_birth else ""
+    return f"{name}{dob_str} – {director.rel_type.replace('_', ' ').title()}"
+
+
+def format_person(person: Person) -> str:
+    """Compact prompt line with every role the person holds: “Jane Doe (b. 1970) – officer, registered agent”."""
+    name = person.name or "Unnamed individual"
+    dob_str = f" (b. {person.date_of_birth})" if person.date_of_birth else ""
+    roles = ", ".join(map(role_label, person.roles))
+    return f"{name}{dob_str} – {roles}" if roles else f"{name}{dob_str}"
+
+
+def collect_officers(directors: Iterable[Director]) -> list[str]:
+    """One line per resolved individual (roles merged), most relevant first."""
+    return list(dict.fromkeys(format_person(p) for p in resolve_officers(rank_officers(directors))))
 
-    
 # ──────────────────────────────────────────────────────────────────────────────
 # Helper – fetch from PDS
 # ──────────────────────────────────────────────────────────────────────────────
+PDS_URL = os.getenv("PDS_URL", "https://api.rel8ed.to").rstrip("/")
+
 # 20 s read timeout; 10 s connect timeout
 PDS_TIMEOUT = httpx.Timeout(40.0)
+PDS_MAX_CONNECTIONS = int(os.getenv("PDS_MAX_CONNECTIONS", "20"))
+
+# one pooled client per event loop, so TLS connections are reused across searches
+_pds_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+
+
+def pds_client() -> httpx.AsyncClient:
+    """The running loop's shared PDS client, created on first use."""
+    loop = asyncio.get_running_loop()
+    client = _pds_clients.get(loop)
+    if client is None or client.is_closed:
+        client = _pds_clients[loop] = httpx.AsyncClient(
+            timeout=PDS_TIMEOUT,
+            transport=upstream_transport("pds"),
+            limits=httpx.Limits(max_connections=PDS_MAX_CONNECTIONS, max_keepalive_connections=PDS_MAX_CONNECTIONS),
+        )
+    return client
+
+
+async def close_pds_client() -> None:
+    client = _pds_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+def _count_retry(retry_state) -> None:
+    sp = current_span()
+    if sp is not None:
+        sp.set_attribute("retry.count", retry_state.attempt_number)
+
 
 RETRY_POLICY  = dict(
     wait      = wait_exponential(multiplier=0.5, max=8),
     stop      = stop_after_attempt(3),
     retry     = retry_if_exception_type((httpx.ReadTimeout, httpx.ReadError)),
+    before_sleep = _count_retry,
     reraise   = True,
 )
-@retry(**RETRY_POLICY)
+
+
+# comma-separated state / province codes, or "auto": every U.S. jurisdiction,
+# the usual registration states first
+PDS_JURISDICTIONS = os.getenv("PDS_JURISDICTIONS", "NY")
+PDS_FANOUT = int(os.getenv("PDS_FANOUT", "4"))          # concurrent searches per lookup
+PDS_MAX_JURISDICTIONS = int(os.getenv("PDS_MAX_JURISDICTIONS", "16"))   # per explicit list ("auto" aside)
+
+_AUTO_FIRST = ("DE", "NY", "CA", "TX", "FL", "NV", "NJ", "IL", "MA", "WA", "GA", "VA", "PA", "CO", "NC", "OH")
+AUTO_JURISDICTIONS = _AUTO_FIRST + tuple(sorted(set(US_STATES.values()) - set(_AUTO_FIRST)))
+
+_jurisdictions: ContextVar[str | Sequence[str] | None] = ContextVar("pds_jurisdictions", default=None)
+
+
+_JURISDICTION_CODE = re.compile(r"[A-Z0-9]{2,3}")
+
+
+def parse_jurisdictions(value: object) -> str | tuple[str, ...] | None:
+    """
+    A jurisdictions value from a client or the environment → "auto", ordered
+    de-duplicated codes, or None; ValueError unless it is "auto" or a list (or
+    comma-separated string) of at most PDS_MAX_JURISDICTIONS 2–3 letter codes.
+    """
+    if value is None:
+        return None
+    if isinstance(value, str):
+        if value.strip().lower() == "auto":
+            return "auto"
+        value = value.split(",")
+    if not isinstance(value, (list, tuple)) or not all(isinstance(v, str) for v in value):
+        raise ValueError('jurisdictions must be "auto" or a list of state / province codes')
+    codes = tuple(dict.fromkeys(v.strip().upper() for v in value if v.strip()))
+    bad = [c for c in codes if not _JURISDICTION_CODE.fullmatch(c)]
+    if bad:
+        raise ValueError(f"invalid jurisdiction code(s): {', '.join(map(repr, bad[:5]))}")
+    if len(codes) > PDS_MAX_JURISDICTIONS:
+        raise ValueError(f'at most {PDS_MAX_JURISDICTIONS} jurisdictions (or "auto") per request')
+    return codes or None
+
+
+@contextmanager
+def pds_jurisdictions(value: str | Sequence[str] | None) -> Iterator[None]:
+    """Searches inside the block use `value` (None keeps PDS_JURISDICTIONS); ValueError if it is malformed."""
+    token = _jurisdictions.set(parse_jurisdictions(value))
+    try:
+        yield
+    finally:
+        _jurisdictions.reset(token)
+
+
+def resolve_jurisdictions(value: str | Sequence[str] | None = None) -> tuple[str, ...]:
+    """Argument, else the request's, else PDS_JURISDICTIONS → ordered, de-duplicated codes."""
+    codes = parse_jurisdictions(value or _jurisdictions.get() or PDS_JURISDICTIONS)
+    return AUTO_JURISDICTIONS if codes == "auto" else codes or ("NY",)
+
+
+def is_confident_match(company_name: str, data: dict) -> bool:
+    """The first Company hit has the searched name (case, punctuation and legal form aside)."""
+    rec = next((r for r in data.get("result", []) if r.get("kind") == "Company"), None)
+    return rec is not None and canonical_name(rec.get("name") or "") == canonical_name(company_name)
+
+
 async def fetch_company_data_from_pds(
     company_name: str,
-    state: str = "NY",
+    jurisdictions: str | Sequence[str] | None = None,
 ) -> dict:
+    """
+    Search every jurisdiction concurrently (at most PDS_FANOUT in flight) and
+    return the first confident match, cancelling the searches still pending;
+    without one, the hit from the earliest-listed jurisdiction that had any.
+    Results are cached (and concurrent identical searches shared). With a
+    snapshot (SNAPSHOT_PATH), a fresh stored record is served instead and
+    live results are written back to it.
+    """
+    states = resolve_jurisdictions(jurisdictions)
+    if (data := await snapshot_search(company_name, states)) is not None:
+        return data
+    return await get_cache("pds").get_or_compute((company_name, states), lambda: _search_live(company_name, states))
+
+
+async def _search_live(company_name: str, states: tuple[str, ...]) -> dict:
+    data = await _search_states(company_name, states)
+    await snapshot_write_back(data, states)
+    return data
+
+
+async def _search_states(company_name: str, states: tuple[str, ...]) -> dict:
+    if len(states) == 1:
+        return await _search_state(company_name, states[0])
+
+    with span("pds.fanout", {"pds.company": company_name, "pds.jurisdictions": len(states),
+                             "pds.fanout.limit": PDS_FANOUT}) as sp:
+        gate = asyncio.Semaphore(PDS_FANOUT)
+
+        async def search(state: str) -> tuple[str, dict]:
+            async with gate:
+                return state, await _search_state(company_name, state)
+
+        tasks = [asyncio.create_task(search(state)) for state in states]
+        rank = {state: i for i, state in enumerate(states)}
+        best: tuple[str, dict] | None = None
+        confident = False
+        errors: list[BaseException] = []
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                try:
+                    state, data = await next_done
+                except Exception as exc:                 # one jurisdiction failing doesn't fail the lookup
+                    errors.append(exc)
+                    continue
+                if is_confident_match(company_name, data):
+                    best, confident = (state, data), True
+                    sp.set_attribute("pds.confident", True)
+                    break
+                has_company = any(r.get("kind") == "Company" for r in data.get("result", []))
+                if has_company and (best is None or rank[state] < rank[best[0]]):
+                    best = state, data
+        finally:
+            pending = [t for t in tasks if not t.done()]
+            for t in pending:
+                t.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            sp.set_attributes({"pds.fanout.cancelled": len(pending), "pds.fanout.errors": len(errors)})
+
+        if len(errors) == len(states):
+            raise errors[0]
+        if errors and not confident:
+            skip_store()                                 # a failed jurisdiction may have held the match
+        if best is not None:
+            sp.set_attribute("pds.state", best[0])
+            return best[1]
+        return {"result": []}
+
+
+async def _search_state(company_name: str, state: str) -> dict:
+    with span("pds.search", {"pds.company": company_name, "pds.state": state, "retry.count": 0}):
+        return await _search_pds(company_name, state)
+
+
+async def fetch_company(company_name: str, jurisdictions: str | Sequence[str] | None = None) -> Company | None:
+    """PDS search → first Company hit as a normalised record (None if absent)."""
+    data = await fetch_company_data_from_pds(company_name, jurisdictions)
+    rows = sum(len(r.get("addresses") or ()) + len(r.get("directors") or ()) for r in data.get("result", []))
+    with span("pds.to_records", {"offload": rows >= OFFLOAD_MIN_ITEMS}) as sp:
+        company = await run_cpu(Company.from_search, data, heavy=rows >= OFFLOAD_MIN_ITEMS)
+        if company is not None:
+            sp.set_attributes({"pds.addresses": len(company.addresses), "pds.directors": len(company.directors)})
+        return company
+
+
+@retry(**RETRY_POLICY)
+async def _search_pds(company_name: str, state: str) -> dict:
     token = os.getenv(
         "PDS_TOKEN",
         "Bearer xeWiXeVqMwAB39wrg/HG4fFFA6bZtkf0vIT8kczVRAbyHqqXHkqTub481r/HvtLqC4",
     )
-    url = (
-        "https://api.rel8ed.to/companies/search?"
-        f"searchType=graphOnly&companyName={company_name}&stateProvince={state}"
-    )
+    url = f"{PDS_URL}/companies/search"
+    # values go through params= so a name or code can't add query parameters of its own
+    params = {"searchType": "graphOnly", "companyName": company_name, "stateProvince": state}
     headers = {
         "Authorization": token,
         "Accept": "application/json",
+        "Accept-Encoding": accept_encoding(),
         "Content-Type": "application/json",
     }
-    async with httpx.AsyncClient(timeout=PDS_TIMEOUT) as client:
-        resp = await client.post(url, headers=headers)
+    async with pds_client().stream("POST", url, params=params, headers=headers) as resp:
         resp.raise_for_status()
-        return resp.json()
+        data, body_size = await read_search_response(resp)
+    current_span().set_attributes({
+        "http.status_code": resp.status_code,
+        "http.response.body.size": body_size,
+        "http.response.body.wire_size": resp.num_bytes_downloaded,
+        "http.response.content_encoding": resp.headers.get("content-encoding", "identity"),
+        "pds.parse_mode": PDS_PARSE_MODE,
+    })
+    return data
 
-def is_us(addr: dict) -> bool:
-    """
-    Return True if the raw PDS address is in the United States.
-    PDS stores country codes in `country` (alpha-2) or sometimes `Country`.
-    """
-    return (addr.get("country") or addr.get("Country")) == "US"
+def is_us(addr: Address) -> bool:
+    """Return True if the address is in the United States."""
+    return addr.is_us
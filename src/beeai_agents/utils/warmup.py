@@ -0,0 +1,116 @@
+# warmup.py – startup warm-up and readiness
+#
+# A new instance otherwise makes its first /query pay for importing the model
+# backend, TLS handshakes to PDS / watsonx / Octagon, the watsonx token
+# exchange and loading the tokenizer. warm_up() does all of that right after
+# startup (steps run concurrently, each under a `warmup.<step>` span) and
+# readiness is only reported once it has finished. A failed step is logged and
+# listed, but does not keep the instance unready.
+import asyncio
+import logging
+import os
+import time
+from typing import Awaitable, Callable
+
+from .metrics import histogram
+from .recording import UPSTREAM_MODE
+from .tracing import span
+
+WARMUP         = os.getenv("WARMUP", "1") == "1"
+WARMUP_CANARY  = os.getenv("WARMUP_CANARY", "1") == "1"         # one tiny generation (authenticates the model)
+WARMUP_TIMEOUT = float(os.getenv("WARMUP_TIMEOUT", "30"))       # seconds per step
+
+WARMUP_SECONDS = histogram("beeai_warmup_seconds", "Duration of each startup warm-up step.")
+
+log = logging.getLogger("beeai_agents.warmup")
+
+_state: dict = {"status": "starting", "steps": {}}
+_background: set[asyncio.Task] = set()                   # referenced until done
+
+
+def readiness() -> dict:
+    """{"status": "starting" | "warming" | "ready", "steps": {step: {"ms": …, "error"?: …}}}."""
+    return _state
+
+
+def is_ready() -> bool:
+    return _state["status"] == "ready"
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Steps
+# ──────────────────────────────────────────────────────────────────────────────
+async def _chat_model() -> None:
+    from .cache import refresh_cache
+    from .routing import route_models
+    from .utils import CHAT_MODEL, chat_model, generate
+    # imports the backends off the loop; routed models too
+    await asyncio.gather(*(chat_model(name) for name in route_models(CHAT_MODEL)))
+    if WARMUP_CANARY:
+        with refresh_cache():                            # a cached reply would skip the round trip
+            await generate("Reply with the single word OK.", section="warmup")
+
+
+async def _pds() -> None:
+    from .utils import PDS_URL, pds_client
+    await pds_client().head(PDS_URL)                     # any status: the pooled connection is what counts
+
+
+async def _octagon() -> None:
+    from ..agents.shareholders import get_octagon_client
+    client = await asyncio.to_thread(get_octagon_client)  # imports openai off the loop
+    from openai import APIStatusError
+    try:
+        await client.models.list()
+    except APIStatusError:
+        pass                                             # any answer means the connection is open
+
+
+async def _local() -> None:
+    from ..agent import section_agents
+    from .offload import get_executor
+    from .prompts import load_tokenizer
+    section_agents()
+    get_executor("thread")
+    await asyncio.to_thread(load_tokenizer)             # loads (maybe downloads) the tokenizer vocabulary
+
+
+def _steps() -> dict[str, Callable[[], Awaitable[None]]]:
+    steps = {"local": _local, "chat_model": _chat_model}
+    if UPSTREAM_MODE != "replay":                         # replayed upstreams have nothing to connect to
+        steps.update(pds=_pds, octagon=_octagon)
+    return steps
+
+
+async def _run_step(name: str, step: Callable[[], Awaitable[None]]) -> None:
+    started = time.perf_counter()
+    result: dict = {}
+    try:
+        with span(f"warmup.{name}"):
+            await asyncio.wait_for(step(), WARMUP_TIMEOUT)
+    except Exception as exc:
+        log.warning("warm-up step %s failed: %r", name, exc)
+        result["error"] = repr(exc)
+    elapsed = time.perf_counter() - started
+    WARMUP_SECONDS.observe(elapsed, step=name)
+    _state["steps"][name] = {"ms": round(elapsed * 1000, 1), **result}
+
+
+async def warm_up() -> dict:
+    """Run every warm-up step (WARMUP=0 skips them) and mark the instance ready."""
+    if WARMUP:
+        _state["status"] = "warming"
+        started = time.perf_counter()
+        with span("warmup"):
+            await asyncio.gather(*(_run_step(name, step) for name, step in _steps().items()))
+        log.info("warm-up finished in %.0f ms", (time.perf_counter() - started) * 1000)
+    else:
+        from .prompts import load_tokenizer
+        from .utils import preload_chat_model
+        preload_chat_model()
+        # prompts are counted as characters / 4 until the tokenizer has loaded in the background
+        task = asyncio.create_task(asyncio.to_thread(load_tokenizer))
+        _background.add(task)
+        task.add_done_callback(_background.discard)
+    _state["status"] = "ready"
+    return _state
@@ -0,0 +1,123 @@
+# wire.py – compression and serialization on the wire
+#
+# Upstream: PDS searches advertise every content coding this process can
+# decode (zstd / br need the `zstandard` / `brotli` packages, which httpx also
+# uses to decode them; gzip always works).
+#
+# Downstream: /query answers are encoded with orjson when installed (msgpack
+# for clients that send `Accept: application/msgpack`) and compressed with the
+# best coding the client accepts once the body is at least
+# WIRE_COMPRESS_MIN_BYTES.
+import gzip
+import os
+import re
+import time
+from typing import Any, Callable
+
+from .metrics import histogram
+from .offload import JSON_DECODER, dumps
+
+try:
+    import brotli
+except ImportError:                       # optional – `pip install .[wire]`
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+WIRE_COMPRESS_MIN_BYTES = int(os.getenv("WIRE_COMPRESS_MIN_BYTES", "1024"))
+WIRE_GZIP_LEVEL         = int(os.getenv("WIRE_GZIP_LEVEL", "6"))
+WIRE_BROTLI_QUALITY     = int(os.getenv("WIRE_BROTLI_QUALITY", "5"))     # 11 is far slower for little gain
+WIRE_ZSTD_LEVEL         = int(os.getenv("WIRE_ZSTD_LEVEL", "3"))
+
+MSGPACK_TYPES = ("application/msgpack", "application/x-msgpack", "application/vnd.msgpack")
+
+RESPONSE_BYTES = histogram(
+    "beeai_response_bytes", "Encoded /query response size by format and content coding.",
+    buckets=(1_000, 4_000, 16_000, 64_000, 256_000, 1_000_000),
+)
+ENCODE_SECONDS = histogram(
+    "beeai_response_encode_seconds", "Time to serialize and compress a /query response.",
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05),
+)
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Content codings – preference order when the client rates them equally
+# ──────────────────────────────────────────────────────────────────────────────
+def _codecs() -> dict[str, Callable[[bytes], bytes]]:
+    codecs: dict[str, Callable[[bytes], bytes]] = {}
+    if zstandard is not None:
+        compressor = zstandard.ZstdCompressor(level=WIRE_ZSTD_LEVEL)
+        codecs["zstd"] = compressor.compress
+    if brotli is not None:
+        codecs["br"] = lambda data: brotli.compress(data, quality=WIRE_BROTLI_QUALITY)
+    codecs["gzip"] = lambda data: gzip.compress(data, compresslevel=WIRE_GZIP_LEVEL, mtime=0)
+    return codecs
+
+
+CODECS = _codecs()
+
+
+def accept_encoding() -> str:
+    """Accept-Encoding value for upstream requests: everything we can decode."""
+    return ", ".join([*CODECS, "deflate"])
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    return CODECS[encoding](data)
+
+
+_TOKEN = re.compile(r"\s*([^\s;,]+)\s*(?:;\s*q\s*=\s*([0-9.]+))?\s*")
+
+
+def negotiate_encoding(header: str | None) -> str | None:
+    """The best coding in CODECS the client accepts, None for identity."""
+    if not header:
+        return None
+    weights: dict[str, float] = {}
+    for item in header.split(","):
+        m = _TOKEN.fullmatch(item)
+        if m:
+            try:
+                weights[m.group(1).lower()] = float(m.group(2)) if m.group(2) else 1.0
+            except ValueError:
+                continue
+    star = weights.get("*", 0.0)
+    ranked = [(weights.get(name, star), -i, name) for i, name in enumerate(CODECS)]
+    q, _, name = max(ranked)
+    return name if q > 0 else None
+
+
+def wants_msgpack(accept: str | None) -> bool:
+    return msgpack is not None and bool(accept) and any(t in accept.lower() for t in MSGPACK_TYPES)
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Response encoding
+# ──────────────────────────────────────────────────────────────────────────────
+def encode_body(obj: Any, accept: str | None, accept_encoding_header: str | None) -> tuple[bytes, dict[str, str]]:
+    """Serialize (and maybe compress) `obj` → (body, headers) for the client's Accept / Accept-Encoding."""
+    started = time.perf_counter()
+    if wants_msgpack(accept):
+        fmt, media_type, body = "msgpack", "application/msgpack", msgpack.packb(obj, use_bin_type=True)
+    else:
+        fmt, media_type, body = JSON_DECODER, "application/json", dumps(obj)
+    headers = {"content-type": media_type, "vary": "Accept, Accept-Encoding"}
+    encoding = negotiate_encoding(accept_encoding_header) if len(body) >= WIRE_COMPRESS_MIN_BYTES else None
+    if encoding:
+        body = compress(body, encoding)
+        headers["content-encoding"] = encoding
+    ENCODE_SECONDS.observe(time.perf_counter() - started, format=fmt, encoding=encoding or "identity")
+    RESPONSE_BYTES.observe(len(body), format=fmt, encoding=encoding or "identity")
+    return body, headers
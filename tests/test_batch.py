@@ -0,0 +1,33 @@
+import json
+
+from beeai_agents.batch import Journal, read_companies, read_journal
+
+
+def test_journal_recovers_from_a_torn_line(tmp_path):
+    path = tmp_path / "profiles.jsonl"
+    path.write_text(json.dumps({"company": "Acme", "status": "ok"}) + "\n"
+                    + json.dumps({"company": "Globex", "status": "error"}) + "\n"
+                    + '{"company": "Initech", "sta', encoding="utf-8")      # killed mid-write
+    journal = Journal(path)
+    assert journal.done == {"Acme"}
+    journal.append({"company": "Initech", "status": "ok"})
+    journal.close()
+    assert [(e["company"], e["status"]) for e in read_journal(path)] == [
+        ("Acme", "ok"), ("Globex", "error"), ("Initech", "ok")]
+    assert Journal(path).done == {"Acme", "Initech"}
+
+
+def test_the_last_journal_entry_wins(tmp_path):
+    path = tmp_path / "profiles.jsonl"
+    path.write_text("".join(json.dumps(e) + "\n" for e in [
+        {"company": "Acme", "status": "ok"}, {"company": "Acme", "status": "degraded"},
+        {"company": "Globex", "status": "error"}, {"company": "Globex", "status": "ok"}]), encoding="utf-8")
+    assert Journal(path).done == {"Globex"}
+
+
+def test_read_companies(tmp_path):
+    (tmp_path / "list.txt").write_text("# watchlist\nAcme\n\n  Globex \nAcme\n", encoding="utf-8")
+    (tmp_path / "list.csv").write_text("ticker,company\nACME,Acme\nGBX,Globex\n", encoding="utf-8")
+    (tmp_path / "list.json").write_text('["Acme", "Globex"]', encoding="utf-8")
+    for name in ("list.txt", "list.csv", "list.json"):
+        assert read_companies(tmp_path / name) == ["Acme", "Globex"], name
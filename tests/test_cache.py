@@ -0,0 +1,105 @@
+import asyncio
+
+from beeai_agents.utils.cache import Cache, SQLiteStore, skip_store, watch_store
+
+
+def counting(value="v", delay=0.01, degraded=False):
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(delay)
+        if degraded:
+            skip_store()
+        return value
+
+    return compute, calls
+
+
+def test_concurrent_lookups_share_one_computation():
+    cache = Cache("t", 60, None)
+    compute, calls = counting()
+
+    async def main():
+        return await asyncio.gather(*(cache.get_or_compute("k", compute) for _ in range(5)))
+
+    assert asyncio.run(main()) == ["v"] * 5
+    assert len(calls) == 1
+    assert asyncio.run(cache.get_or_compute("k", compute)) == "v" and len(calls) == 1     # now a hit
+
+
+def test_a_failed_computation_reaches_every_waiter_and_is_not_cached():
+    cache = Cache("t", 60, None)
+
+    async def boom():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream down")
+
+    async def main():
+        return await asyncio.gather(*(cache.get_or_compute("k", boom) for _ in range(3)), return_exceptions=True)
+
+    assert [type(r) for r in asyncio.run(main())] == [RuntimeError] * 3
+    compute, calls = counting()
+    assert asyncio.run(cache.get_or_compute("k", compute)) == "v" and len(calls) == 1
+
+
+def test_skip_store_reaches_enclosing_lookups_and_coalesced_callers():
+    inner, outer = Cache("inner", 60, None), Cache("outer", 60, None)
+    search, search_calls = counting("hits", degraded=True)
+    outer_calls = []
+
+    def section(name):
+        async def build():
+            outer_calls.append(name)
+            return name + ":" + await inner.get_or_compute("search", search)
+        return build
+
+    async def main():
+        # both sections share the one (degraded) search; neither they nor it are stored
+        return await asyncio.gather(outer.get_or_compute("a", section("a")), outer.get_or_compute("b", section("b")))
+
+    assert asyncio.run(main()) == ["a:hits", "b:hits"]
+    assert len(search_calls) == 1
+    asyncio.run(main())
+    assert len(search_calls) == 2 and outer_calls == ["a", "b", "a", "b"]
+
+
+def test_watch_store_sees_skip_store_with_caching_off():
+    cache = Cache("t", 0, None)
+    degraded, _ = counting(degraded=True)
+    fine, _ = counting()
+
+    async def run(compute):
+        with watch_store() as outcome:
+            await cache.get_or_compute("k", compute)
+        return outcome.store
+
+    assert asyncio.run(run(fine)) is True
+    assert asyncio.run(run(degraded)) is False
+
+
+def test_sqlite_store_is_shared_between_caches(tmp_path):
+    store = SQLiteStore(str(tmp_path / "cache.sqlite3"))
+    first, second = Cache("t", 60, store), Cache("t", 60, store)       # two worker processes, in effect
+    compute, calls = counting({"rows": [1, 2]})
+    assert asyncio.run(first.get_or_compute("k", compute)) == {"rows": [1, 2]}
+    assert asyncio.run(second.get_or_compute("k", compute)) == {"rows": [1, 2]}
+    assert len(calls) == 1
+
+    degraded, degraded_calls = counting(degraded=True)
+    asyncio.run(first.get_or_compute("d", degraded))
+    asyncio.run(second.get_or_compute("d", degraded))
+    assert len(degraded_calls) == 2
+
+
+def test_sqlite_leases(tmp_path):
+    store = SQLiteStore(str(tmp_path / "cache.sqlite3"))
+    assert store.acquire("k", "a", 60)
+    assert store.acquire("k", "a", 60)                  # the owner may renew
+    assert not store.acquire("k", "b", 60)
+    store.release("k", "b")                             # not b's to release
+    assert not store.acquire("k", "b", 60)
+    store.release("k", "a")
+    assert store.acquire("k", "b", 60)
+    assert store.acquire("expired", "a", -1) and store.acquire("expired", "b", 60)
+
@@ -0,0 +1,49 @@
+from beeai_agents.utils.geo import cluster_addresses
+from beeai_agents.utils.records import Address
+
+TYSONS = (38.92, -77.23)
+
+
+def addr(line: str, lat: float | None = TYSONS[0], lon: float | None = TYSONS[1], flag: str = "") -> Address:
+    return Address(line, "Vienna", "VA", "22182", "US", line, flag=flag, latitude=lat, longitude=lon)
+
+
+def sizes(sites) -> list[tuple[str, int]]:
+    return [(s.rep.line, s.size) for s in sites]
+
+
+def test_canonical_variants_are_one_site():
+    sites = cluster_addresses([addr("1750 Tysons Blvd. Suite 1500"), addr("Ste 1500, 1750 Tysons Boulevard")])
+    assert sizes(sites) == [("1750 Tysons Blvd. Suite 1500", 2)]
+
+
+def test_verified_address_represents_the_site():
+    sites = cluster_addresses([addr("1750 Tysons Blvd"), addr("1750 Tysons Blvd Ste 100", flag="verified")])
+    assert sizes(sites) == [("1750 Tysons Blvd Ste 100", 2)]
+
+
+def test_nearby_compatible_streets_merge():
+    sites = cluster_addresses([addr("1750 Tysons Blvd"), addr("1750 Tysons", TYSONS[0] + 0.0001, TYSONS[1])])
+    assert len(sites) == 1 and sites[0].size == 2
+
+
+def test_distinct_streets_on_one_zip_centroid_stay_apart():
+    sites = cluster_addresses([addr("1750 Tysons Blvd"), addr("8000 Towers Crescent Dr"), addr("1751 Tysons Blvd")])
+    assert [s.size for s in sites] == [1, 1, 1]
+
+
+def test_far_apart_points_stay_apart():
+    sites = cluster_addresses([addr("1750 Tysons Blvd"), addr("1750 Tysons Blvd Ste 2", TYSONS[0] + 0.01, TYSONS[1])])
+    assert [s.size for s in sites] == [1, 1]
+
+
+def test_a_bare_street_does_not_chain_two_buildings():
+    lines = ["1750 Tysons Blvd", "Tysons Blvd", "1800 Tysons Blvd"]
+    for order in (lines, lines[::-1], [lines[1], lines[0], lines[2]]):
+        sites = cluster_addresses([addr(line) for line in order])
+        assert sorted(s.size for s in sites) == [1, 2], order      # the bare street joins one building only
+
+
+def test_addresses_without_coordinates_only_merge_by_key():
+    sites = cluster_addresses([addr("1750 Tysons Blvd", None, None), addr("1750 Tysons", None, None)])
+    assert [s.size for s in sites] == [1, 1]
@@ -0,0 +1,13 @@
+from beeai_agents.utils import prompts
+
+
+def test_counts_fall_back_until_the_tokenizer_is_loaded(monkeypatch):
+    monkeypatch.setattr(prompts, "_encoder", None)
+    monkeypatch.setattr(prompts, "_load_encoder", lambda: ("words", lambda text: len(text.split())))
+    prompts.count_tokens.cache_clear()
+    text = "one two three four five six seven eight"
+    assert prompts.tokenizer_name() == "chars/4"
+    assert prompts.count_tokens(text) == 10                   # never loads the tokenizer itself
+    assert prompts.load_tokenizer() == "words"
+    assert prompts.count_tokens(text) == 8                    # earlier fallback counts are dropped
+    prompts.count_tokens.cache_clear()
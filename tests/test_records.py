@@ -0,0 +1,11 @@
+from beeai_agents.utils.records import Address
+
+
+def test_country_codes_are_alpha2():
+    for raw in ("US", "us", "USA", " usa "):
+        addr = Address.from_pds({"addressLine": "1 Main St", "country": raw})
+        assert addr.country == "US" and addr.is_us, raw
+    assert Address.from_pds({"Country": "GBR"}).country == "GB"
+    assert Address.from_pds({"country": "UK"}).country == "GB"
+    assert Address.from_pds({"country": "XYZ"}).country == "XYZ"                 # unknown codes kept
+    assert Address.from_pds({}).country == ""
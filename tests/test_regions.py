@@ -0,0 +1,14 @@
+from beeai_agents.utils.regions import alpha2, footprint_summary, region_counts, region_of
+
+
+def test_alpha2_and_alpha3_codes_are_one_country():
+    counts = region_counts(["GB", "GBR", "uk", "FR", "DE", "DEU", "JP", "jpn"])
+    assert counts == {"Europe": (6, 3), "Asia-Pacific": (2, 1)}
+    assert footprint_summary(counts) == "Europe: 6 sites in 3 countries; Asia-Pacific: 2 sites in 1 country"
+
+
+def test_unknown_codes():
+    assert region_of("ZZ") == region_of("") == "Other"
+    assert alpha2(" zzz ") == "ZZZ"
+    assert region_counts(["ZZ", "ZZ", "FR"]) == {"Other": (2, 1), "Europe": (1, 1)}
+    assert footprint_summary({}) == "None"
@@ -0,0 +1,34 @@
+import asyncio
+
+from beeai_agents.utils import routing
+from beeai_agents.utils.routing import Route, call_with_fallback, model_call
+
+
+def test_only_calls_that_reach_the_model_update_its_health(monkeypatch):
+    monkeypatch.setattr(routing, "_health", {})
+    route = Route(["small", "big"], "short_prompt")
+
+    async def cached(model: str) -> str:
+        return "hit"
+
+    async def called(model: str) -> str:
+        with model_call():
+            await asyncio.sleep(0.01)
+        return "reply"
+
+    assert asyncio.run(call_with_fallback(route, "test", cached)) == ("hit", "small")
+    assert routing._health_of("small").ewma is None
+    asyncio.run(call_with_fallback(route, "test", called))
+    assert routing._health_of("small").ewma >= 0.01
+
+
+def test_a_failing_model_falls_back(monkeypatch):
+    monkeypatch.setattr(routing, "_health", {})
+
+    async def attempt(model: str) -> str:
+        if model == "small":
+            raise RuntimeError("down")
+        return "reply"
+
+    assert asyncio.run(call_with_fallback(Route(["small", "big"], "short_prompt"), "test", attempt)) == ("reply", "big")
+    assert routing._health_of("small").failures == 1
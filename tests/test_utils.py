@@ -0,0 +1,39 @@
+import pytest
+
+from beeai_agents.utils import utils
+from beeai_agents.utils.utils import parse_jurisdictions
+
+
+@pytest.mark.parametrize("value, expected", [
+    (None, None),
+    ("auto", "auto"),
+    (" AUTO ", "auto"),
+    ("ny, ca,NY", ("NY", "CA")),
+    (["on", "QC"], ("ON", "QC")),
+    ("", None),
+    ([], None),
+])
+def test_parse_jurisdictions(value, expected):
+    assert parse_jurisdictions(value) == expected
+
+
+@pytest.mark.parametrize("value", [
+    "N",                            # too short
+    "NEWY",                         # too long
+    "NY,C A",
+    "NY;CA",
+    ["NY", 1],
+    {"NY": 1},
+    42,
+])
+def test_parse_jurisdictions_rejects(value):
+    with pytest.raises(ValueError):
+        parse_jurisdictions(value)
+
+
+def test_parse_jurisdictions_caps_the_list(monkeypatch):
+    monkeypatch.setattr(utils, "PDS_MAX_JURISDICTIONS", 2)
+    assert parse_jurisdictions("NY,CA,ny") == ("NY", "CA")
+    with pytest.raises(ValueError, match="at most 2"):
+        parse_jurisdictions("NY,CA,TX")
+    assert parse_jurisdictions("auto") == "auto"